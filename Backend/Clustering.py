@@ -1,37 +1,88 @@
-from sklearn.cluster import DBSCAN
 import numpy as np
+import os
 
-def get_clusters(complaints):
-    if not complaints: return []
-
-    # 1. Extract coordinates [[lat, lon], [lat, lon]...]
-    coords = np.array([[c['latitude'], c['longitude']] for c in complaints])
-    
-    # 2. Run DBSCAN
-    # eps=0.001 is approx 100 meters. min_samples=1 (every point is at least its own cluster)
-    db = DBSCAN(eps=0.001, min_samples=1).fit(coords)
-    labels = db.labels_
-
-    clusters = []
-    unique_labels = set(labels)
-
-    for label in unique_labels:
-        # Get all complaints in this specific cluster
-        cluster_points = [complaints[i] for i, l in enumerate(labels) if l == label]
-        
-        # Calculate Cluster Intelligence
-        avg_lat = sum(p['latitude'] for p in cluster_points) / len(cluster_points)
-        avg_lon = sum(p['longitude'] for p in cluster_points) / len(cluster_points)
-        max_severity = max(p['ai_score'] for p in cluster_points)
-        count = len(cluster_points)
-
-        clusters.append({
-            "lat": avg_lat,
-            "lon": avg_lon,
-            "severity": max_severity,
-            "count": count,
-            # Weighted Triage Logic: Mapping to Newspaper-defined non-verbal signals
-            "color": "#EF4444" if max_severity >= 7.5 else "#F59E0B" if max_severity >= 4.0 else "#10B981"
-        })
-    
-    return clusters
\ No newline at end of file
+EARTH_RADIUS_M = 6371008.8
+
+# Metric-correct mode: set CLUSTER_EPS_METERS (e.g. 100) to cluster on the sphere
+# with a haversine BallTree instead of raw lat/lon degrees.
+CLUSTER_EPS_METERS = float(os.getenv("CLUSTER_EPS_METERS", 0)) or None
+CLUSTER_ALGORITHM = os.getenv("CLUSTER_ALGORITHM", "auto")
+CLUSTER_N_JOBS = int(os.getenv("CLUSTER_N_JOBS", -1))
+
+# Columnar layout fetched straight from SQL (no per-row dicts)
+CLUSTER_DTYPE = np.dtype([("latitude", "f8"), ("longitude", "f8"), ("ai_score", "f8")])
+
+def severity_color(max_severity):
+    # Weighted Triage Logic: Mapping to Newspaper-defined non-verbal signals
+    return "#EF4444" if max_severity >= 7.5 else "#F59E0B" if max_severity >= 4.0 else "#10B981"
+
+def rows_to_columns(rows):
+    """(latitude, longitude, ai_score) tuples from a SQL fetch -> structured array."""
+    return np.array([(lat, lon, score or 0.0) for lat, lon, score in rows], dtype=CLUSTER_DTYPE)
+
+def _as_columns(complaints):
+    """Accepts a structured array, a {column: values} mapping or the legacy list of dicts."""
+    if isinstance(complaints, np.ndarray) and complaints.dtype.names:
+        cols = complaints
+    elif isinstance(complaints, dict):
+        cols = {k: np.asarray(v, dtype=float) for k, v in complaints.items()}
+    else:
+        cols = rows_to_columns((c['latitude'], c['longitude'], c['ai_score']) for c in complaints)
+    return (
+        np.asarray(cols['latitude'], dtype=float),
+        np.asarray(cols['longitude'], dtype=float),
+        np.asarray(cols['ai_score'], dtype=float)
+    )
+
+def aggregate_clusters(labels, lat, lon, severity):
+    """
+    Vectorized group-by over the DBSCAN label array: O(points + clusters).
+    bincount gives counts and coordinate sums, maximum.at the per-cluster max severity.
+    """
+    bins = labels - labels.min()            # DBSCAN labels are -1 (noise) .. k-1
+    counts = np.bincount(bins)
+    sum_lat = np.bincount(bins, weights=lat)
+    sum_lon = np.bincount(bins, weights=lon)
+    max_sev = np.full(len(counts), -np.inf)
+    np.maximum.at(max_sev, bins, severity)
+
+    keep = counts > 0
+    counts, max_sev = counts[keep], max_sev[keep]
+    avg_lat, avg_lon = sum_lat[keep] / counts, sum_lon[keep] / counts
+
+    return [
+        {
+            "lat": float(avg_lat[i]),
+            "lon": float(avg_lon[i]),
+            "severity": float(max_sev[i]),
+            "count": int(counts[i]),
+            "color": severity_color(max_sev[i])
+        }
+        for i in range(len(counts))
+    ]
+
+def get_clusters(complaints, eps_meters=CLUSTER_EPS_METERS, algorithm=CLUSTER_ALGORITHM, n_jobs=CLUSTER_N_JOBS,
+                 eps_degrees=0.001):
+    if complaints is None or len(complaints) == 0: return []
+
+    # 1. Extract coordinate columns
+    lat, lon, severity = _as_columns(complaints)
+    if lat.size == 0: return []
+    coords = np.column_stack((lat, lon))
+
+    # 2. Run DBSCAN. min_samples=1 (every point is at least its own cluster)
+    # sklearn is imported on first use: it alone costs ~2s of API cold start
+    from sklearn.cluster import DBSCAN
+    if eps_meters:
+        # Great-circle radius: eps in radians on the unit sphere, BallTree neighbour search
+        db = DBSCAN(
+            eps=eps_meters / EARTH_RADIUS_M, min_samples=1, metric='haversine',
+            algorithm='ball_tree' if algorithm == 'auto' else algorithm, n_jobs=n_jobs
+        ).fit(np.radians(coords))
+    else:
+        # Legacy degree mode: eps=0.001 is ~111m in latitude but only ~111m * cos(lat) in longitude
+        # (map tiles pass a coarser eps_degrees at low zoom)
+        db = DBSCAN(eps=eps_degrees, min_samples=1, algorithm=algorithm, n_jobs=n_jobs).fit(coords)
+
+    # 3. Calculate Cluster Intelligence (centroid, max severity, count) per label
+    return aggregate_clusters(db.labels_, lat, lon, severity)
@@ -0,0 +1,32 @@
+# bench_batch_detection.py
+# Sequential run_ai_detection vs run_ai_detection_batch against the offline stub model.
+# Run from Backend/:  python benchmarks/bench_batch_detection.py [n_images] [latency_ms]
+import os
+import sys
+import time
+
+N_IMAGES = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+LATENCY_MS = sys.argv[2] if len(sys.argv) > 2 else "250"
+
+# Must be set before detective is imported: no network, simulated inference latency
+os.environ["DETECTOR_BACKEND"] = "stub"
+os.environ["DETECTOR_STUB_LATENCY_MS"] = LATENCY_MS
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import detective
+
+if __name__ == "__main__":
+    paths = [f"uploads/monsoon_{i}.jpg" for i in range(N_IMAGES)]
+
+    start = time.perf_counter()
+    for p in paths:
+        detective.run_ai_detection(p)
+    sequential = time.perf_counter() - start
+
+    print(f"{N_IMAGES} images, {LATENCY_MS}ms simulated inference")
+    print(f"  sequential            {sequential:6.2f}s  {N_IMAGES / sequential:7.1f} img/s")
+    for workers in (4, 8, 16):
+        start = time.perf_counter()
+        detective.run_ai_detection_batch(paths, max_workers=workers)
+        batched = time.perf_counter() - start
+        print(f"  batch max_workers={workers:<3} {batched:6.2f}s  {N_IMAGES / batched:7.1f} img/s")
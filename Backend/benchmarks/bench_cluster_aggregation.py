@@ -0,0 +1,51 @@
+# bench_cluster_aggregation.py
+# Post-DBSCAN aggregation: legacy per-label Python loop vs vectorized bincount/maximum.at.
+# Run from Backend/:  python benchmarks/bench_cluster_aggregation.py
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Clustering import aggregate_clusters, severity_color
+
+def legacy_aggregate(labels, complaints):
+    """The original get_clusters loop: O(clusters x points)."""
+    clusters = []
+    for label in set(labels):
+        cluster_points = [complaints[i] for i, l in enumerate(labels) if l == label]
+        max_severity = max(p['ai_score'] for p in cluster_points)
+        clusters.append({
+            "lat": sum(p['latitude'] for p in cluster_points) / len(cluster_points),
+            "lon": sum(p['longitude'] for p in cluster_points) / len(cluster_points),
+            "severity": max_severity,
+            "count": len(cluster_points),
+            "color": severity_color(max_severity)
+        })
+    return clusters
+
+def make_points(n, rng):
+    lat = 19.0 + rng.random(n) * 0.3
+    lon = 72.8 + rng.random(n) * 0.3
+    severity = rng.random(n) * 10
+    labels = rng.integers(-1, max(n // 20, 1), n)   # ~20 points per cluster + noise
+    return labels, lat, lon, severity
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(42)
+    print(f"{'points':>10} {'vectorized (s)':>15} {'ns/point':>10} {'legacy (s)':>12}")
+    for n in (10_000, 100_000, 1_000_000):
+        labels, lat, lon, severity = make_points(n, rng)
+        vec = timed(aggregate_clusters, labels, lat, lon, severity)
+
+        legacy = "skipped"
+        if n <= 10_000:  # quadratic: 1M points would take hours
+            rows = [{"latitude": a, "longitude": b, "ai_score": c} for a, b, c in zip(lat, lon, severity)]
+            legacy = f"{timed(legacy_aggregate, list(labels), rows):.3f}"
+
+        print(f"{n:>10} {vec:>15.3f} {vec / n * 1e9:>10.1f} {legacy:>12}")
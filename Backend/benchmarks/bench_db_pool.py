@@ -0,0 +1,46 @@
+# bench_db_pool.py
+# Per-request sqlite3.connect() vs the pooled connections in db.py, on a typical
+# handler query (system_config lookup + 50 complaints by ward).
+# Run from Backend/:  python benchmarks/bench_db_pool.py [iterations]
+import os
+import sys
+import time
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import db
+
+def seed(path, n=20000):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE complaints (id INTEGER PRIMARY KEY, ward_zone TEXT, ai_score REAL, description TEXT)")
+    conn.execute("CREATE INDEX idx_ward ON complaints(ward_zone)")
+    conn.execute("CREATE TABLE system_config (administrative_scope TEXT)")
+    conn.execute("INSERT INTO system_config VALUES ('Municipal')")
+    conn.executemany("INSERT INTO complaints (ward_zone, ai_score, description) VALUES (?, ?, ?)",
+                     [(f"Ward {i % 40}", (i % 100) / 10, "pothole near school") for i in range(n)])
+    conn.commit()
+    conn.close()
+
+def handler(conn):
+    conn.execute("SELECT administrative_scope FROM system_config LIMIT 1").fetchone()
+    conn.execute("SELECT * FROM complaints WHERE ward_zone = ? ORDER BY ai_score DESC LIMIT 50", ("Ward 7",)).fetchall()
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[int(len(samples) * p)] * 1e6
+
+if __name__ == "__main__":
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed(path)
+        for name, open_conn in (("sqlite3.connect per request", sqlite3.connect), ("db.connect (pooled)", db.connect)):
+            samples = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                conn = open_conn(path)
+                handler(conn)
+                conn.close()
+                samples.append(time.perf_counter() - start)
+            print(f"{name:<30} p50 {percentile(samples, 0.5):7.1f} us   p99 {percentile(samples, 0.99):7.1f} us")
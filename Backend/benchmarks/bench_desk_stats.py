@@ -0,0 +1,48 @@
+# bench_desk_stats.py
+# Desk dashboard stats: three COUNT(*) queries on "ai_category LIKE '%domain%'" vs one
+# SUM(CASE ...) pass over the (ward_zone, category_code, status) index (desk_stats.py).
+# Run from Backend/:  python benchmarks/bench_desk_stats.py [rows]
+import os
+import sys
+import time
+import random
+import sqlite3
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from desk_stats import init_category_codes, desk_counts
+
+CATEGORIES = ["Roads & Infrastructure", "Water Supply", "Electricity/Power", "Sanitation & Waste", "General Inquiry"]
+
+def seed(path, n):
+    conn = sqlite3.connect(path)
+    conn.execute('''CREATE TABLE complaints (id INTEGER PRIMARY KEY, ward_zone TEXT, ai_category TEXT,
+                    ai_score REAL, status TEXT, resolved_at TEXT, deadline_at TEXT)''')
+    conn.execute("CREATE INDEX idx_complaints_ward ON complaints(ward_zone)")
+    conn.execute("CREATE INDEX idx_complaints_status ON complaints(status)")
+    conn.executemany("INSERT INTO complaints (ward_zone, ai_category, ai_score, status, resolved_at, deadline_at) VALUES (?, ?, ?, ?, ?, ?)",
+                     [(f"Ward {random.randrange(40)}", random.choice(CATEGORIES), random.uniform(1, 10),
+                       random.choice(["verified", "assigned", "resolved", "pending"]),
+                       "2026-01-02", random.choice(["2026-01-01", "2026-01-03"])) for _ in range(n)])
+    init_category_codes(conn.cursor())
+    conn.commit()
+    return conn
+
+def legacy(conn, ward, domain):
+    term = f"%{domain}%"
+    return tuple(conn.execute(sql, (ward, term)).fetchone()[0] for sql in (
+        "SELECT COUNT(*) FROM complaints WHERE ward_zone=? AND ai_category LIKE ? AND status IN ('verified', 'assigned', 'resolved')",
+        "SELECT COUNT(*) FROM complaints WHERE ward_zone=? AND ai_category LIKE ? AND status = 'resolved' AND resolved_at <= deadline_at",
+        "SELECT COUNT(*) FROM complaints WHERE ward_zone=? AND ai_category LIKE ? AND ai_score >= 8.0 AND status != 'resolved'"))
+
+if __name__ == "__main__":
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = seed(os.path.join(tmp, "bench.db"), rows)
+        queries = [(f"Ward {random.randrange(40)}", random.choice(["Roads", "Water", "Sanitation"])) for _ in range(200)]
+        assert all(legacy(conn, w, d) == desk_counts(conn, w, d) for w, d in queries[:20])
+        for name, fn in (("3x COUNT + LIKE", legacy), ("SUM(CASE) + category_code", desk_counts)):
+            start = time.perf_counter()
+            for ward, domain in queries:
+                fn(conn, ward, domain)
+            print(f"{name:<28} {(time.perf_counter() - start) / len(queries) * 1e3:7.2f} ms / request")
@@ -0,0 +1,54 @@
+# bench_haversine_clustering.py
+# Legacy degree-space DBSCAN (eps=0.001) vs metric-correct haversine BallTree (eps in metres).
+# Run from Backend/:  python benchmarks/bench_haversine_clustering.py [n_points]
+import os
+import sys
+import time
+import numpy as np
+from sklearn.cluster import DBSCAN
+from sklearn.metrics import adjusted_rand_score
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from Clustering import EARTH_RADIUS_M
+
+EPS_METERS = 100.0
+
+def seeded_points(n, center_lat, center_lon, rng):
+    """Complaint-like data: dense hotspots (70%) on top of city-wide background noise (30%)."""
+    n_hot = int(n * 0.7)
+    centers = np.column_stack((
+        center_lat + rng.uniform(-0.15, 0.15, 400),
+        center_lon + rng.uniform(-0.15, 0.15, 400)
+    ))
+    hot = centers[rng.integers(0, len(centers), n_hot)] + rng.normal(0, 0.0015, (n_hot, 2))
+    background = np.column_stack((
+        center_lat + rng.uniform(-0.25, 0.25, n - n_hot),
+        center_lon + rng.uniform(-0.25, 0.25, n - n_hot)
+    ))
+    return np.vstack((hot, background))
+
+def run(coords, mode, n_jobs):
+    start = time.perf_counter()
+    if mode == "degrees":
+        labels = DBSCAN(eps=0.001, min_samples=1, n_jobs=n_jobs).fit(coords).labels_
+    else:
+        labels = DBSCAN(
+            eps=EPS_METERS / EARTH_RADIUS_M, min_samples=1, metric="haversine",
+            algorithm="ball_tree", n_jobs=n_jobs
+        ).fit(np.radians(coords)).labels_
+    return labels, time.perf_counter() - start
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(7)
+    for city, (clat, clon) in {"Mumbai (19N)": (19.07, 72.87), "Srinagar (34N)": (34.08, 74.80)}.items():
+        coords = seeded_points(n, clat, clon, rng)
+        # Effective east-west radius of the legacy degree eps at this latitude
+        ew_radius = np.radians(0.001) * EARTH_RADIUS_M * np.cos(np.radians(clat))
+        print(f"\n{city}: {n} points | legacy eps ~{np.radians(0.001) * EARTH_RADIUS_M:.0f}m N-S, "
+              f"{ew_radius:.0f}m E-W | haversine eps {EPS_METERS:.0f}m everywhere")
+        ref, _ = run(coords, "haversine", -1)
+        for mode, n_jobs in (("degrees", None), ("haversine", None), ("haversine", -1)):
+            labels, secs = run(coords, mode, n_jobs)
+            print(f"  {mode:>9} n_jobs={str(n_jobs):>4}  {secs:7.2f}s  "
+                  f"clusters={len(set(labels)):>7}  ARI vs metric-correct={adjusted_rand_score(ref, labels):.3f}")
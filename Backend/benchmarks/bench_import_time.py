@@ -0,0 +1,41 @@
+# bench_import_time.py
+# Cold-start guard: wall time of `import takeimage` in a fresh interpreter, plus the
+# slowest modules from `python -X importtime`. Importing must not touch the network,
+# build the AI model or initialize databases (that happens in the FastAPI lifespan).
+# Run from Backend/:  python benchmarks/bench_import_time.py [budget_seconds]
+import os
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BUDGET_SECONDS = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+
+def cold_import(runs=3):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", "import takeimage"], cwd=BACKEND_DIR, check=True)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def slowest_modules(top=10):
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import takeimage"],
+        cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = [part.strip() for part in line[len("import time:"):].split("|")]
+        rows.append((int(cumulative_us), int(self_us), name))
+    return sorted(rows, reverse=True)[:top]
+
+if __name__ == "__main__":
+    best = cold_import()
+    print(f"import takeimage: {best:.2f}s (budget {BUDGET_SECONDS:.1f}s)")
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for cumulative, self_us, name in slowest_modules():
+        print(f"{cumulative / 1000:>14.1f} {self_us / 1000:>9.1f}  {name}")
+    sys.exit(0 if best <= BUDGET_SECONDS else 1)
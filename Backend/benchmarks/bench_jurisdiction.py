@@ -0,0 +1,54 @@
+# bench_jurisdiction.py
+# Local ward lookup: STR R-tree + ray casting vs a linear scan over every polygon.
+# Uses a synthetic grid of wards (real boundaries come from WARD_BOUNDARIES_PATH).
+# Run from Backend/:  python benchmarks/bench_jurisdiction.py [grid_side] [n_points]
+import os
+import sys
+import json
+import time
+import random
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from jurisdiction import JurisdictionResolver, load_boundaries
+
+CELL_DEG = 0.005
+
+def synthetic_wards(side, lat0=19.0, lon0=72.8):
+    """side x side wards; each is a pentagon (notched top) so ray casting is exercised."""
+    features = []
+    for i in range(side):
+        for k in range(side):
+            x0, y0 = lon0 + i * CELL_DEG, lat0 + k * CELL_DEG
+            ring = [[x0, y0], [x0 + CELL_DEG, y0], [x0 + CELL_DEG, y0 + CELL_DEG],
+                    [x0 + CELL_DEG / 2, y0 + CELL_DEG * 0.8], [x0, y0 + CELL_DEG], [x0, y0]]
+            features.append({"type": "Feature", "properties": {"name": f"Ward {i}-{k}"},
+                             "geometry": {"type": "Polygon", "coordinates": [ring]}})
+    return {"type": "FeatureCollection", "features": features}
+
+if __name__ == "__main__":
+    side = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    n = int(sys.argv[2]) if len(sys.argv) > 2 else 20000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "wards.geojson")
+        with open(path, "w") as f:
+            json.dump(synthetic_wards(side), f)
+        resolver = JurisdictionResolver(path, os.path.join(tmp, "cache.db"))
+        polygons = load_boundaries(path)
+
+    random.seed(7)
+    span = side * CELL_DEG
+    points = [(19.0 + random.random() * span, 72.8 + random.random() * span) for _ in range(n)]
+
+    start = time.perf_counter()
+    indexed = [resolver.local(lat, lon) for lat, lon in points]
+    t_index = time.perf_counter() - start
+
+    start = time.perf_counter()
+    linear = [next((p.name for p in polygons if p.contains(lon, lat)), None) for lat, lon in points]
+    t_linear = time.perf_counter() - start
+
+    assert indexed == linear, "R-tree lookup disagrees with linear scan"
+    print(f"{len(polygons)} wards, {n} points")
+    print(f"STR R-tree : {t_index / n * 1e6:8.1f} us/point")
+    print(f"Linear scan: {t_linear / n * 1e6:8.1f} us/point")
@@ -0,0 +1,97 @@
+# bench_keywords.py
+# Legacy any(k in text ...) substring scans vs the compiled keyword engine (keywords.py)
+# over synthetic complaint descriptions, with the default vocabulary and with a large
+# per-deployment one (substring scans grow with every keyword, the engine does not).
+# Also lists descriptions whose verdict changed vs the old hard-coded lists
+# (mostly in-word false positives such as "light" in "flight").
+# Run from Backend/:  python benchmarks/bench_keywords.py [n_descriptions]
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from keywords import KeywordMatcher, load_vocabulary
+
+FRAGMENTS = [
+    "huge pothole on the main road", "water leaking from the pipeline since 3 days",
+    "street light not working, area is dark", "garbage not collected, bad smell",
+    "accident happened near the bridge", "kachra jamla ahe", "flight of stairs broken near school",
+    "wires hanging low, risk of electric shock", "sewage overflowing into the lane",
+    "badminton court gate stuck", "child injured after falling in drain", "electricity cut every evening",
+    "the playground needs cleaning", "pani yet nahi", "roadside vendors blocking footpath",
+]
+
+def legacy(desc_lower, ai_label):
+    """The pre-engine STEP C / STEP D logic from priortize.py."""
+    if any(k in ai_label or k in desc_lower for k in ["pothole", "road", "crack", "bridge"]):
+        category = "Roads & Infrastructure"
+    elif any(k in ai_label or k in desc_lower for k in ["water", "leak", "pipe", "flood", "sewage", "leakage"]):
+        category = "Water Supply"
+    elif any(k in ai_label or k in desc_lower for k in ["electric", "power", "light", "wire", "current"]):
+        category = "Electricity/Power"
+    elif any(k in ai_label or k in desc_lower for k in ["garbage", "trash", "waste", "kachra", "smell"]):
+        category = "Sanitation & Waste"
+    else:
+        category = "General Inquiry"
+    if any(w in desc_lower for w in ["accident", "injury", "deadly", "hospital", "emergency", "shock", "falling"]):
+        return category, "Dangerous", 7
+    if any(w in desc_lower for w in ["bad", "problem", "dark", "smell", "waste", "stuck", "leakage"]):
+        return category, "Moderate", 4
+    return category, "Neutral", 1
+
+def substring_scanner(vocabulary):
+    """The legacy any(k in text) pattern, generalized to a whole vocabulary."""
+    categories = [(c["name"], [k.rstrip("*") for k in c["keywords"]]) for c in vocabulary["categories"]]
+    urgency = [(u["level"], u["bonus"], [k.rstrip("*") for k in u["keywords"]]) for u in vocabulary["urgency"]]
+
+    def scan(desc_lower, ai_label):
+        category = next((name for name, words in categories
+                         if any(k in ai_label or k in desc_lower for k in words)), "General Inquiry")
+        for level, bonus, words in urgency:
+            if any(k in desc_lower for k in words):
+                return category, level, bonus
+        return category, "Neutral", 1
+    return scan
+
+def large_vocabulary(extra_per_entry=100):
+    """Defaults + synthetic transliterations, like a deployment with a big local word list."""
+    vocabulary = load_vocabulary("")
+    rng = random.Random(0)
+    for entry in vocabulary["categories"] + vocabulary["urgency"]:
+        entry["keywords"].extend(
+            "".join(rng.choice("aeiouknrstvdgbhjlm") for _ in range(rng.randint(4, 8)))
+            for _ in range(extra_per_entry)
+        )
+    return vocabulary
+
+def timed(fn, descriptions, labels):
+    start = time.perf_counter()
+    results = [fn(d, l) for d, l in zip(descriptions, labels)]
+    return results, time.perf_counter() - start
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    random.seed(42)
+    descriptions = [
+        ". ".join(random.sample(FRAGMENTS, random.randint(1, 3))) for _ in range(n)
+    ]
+    labels = [random.choice(["pothole", "none", "garbage_pile"]) for _ in range(n)]
+
+    old, t_old = timed(legacy, descriptions, labels)
+    print(f"{n} descriptions")
+    print(f"{'Hard-coded legacy lists':<40}{t_old:6.2f}s  ({t_old / n * 1e6:.1f} us each)")
+
+    for name, vocabulary in (("default", load_vocabulary("")), ("large", large_vocabulary())):
+        size = sum(len(e["keywords"]) for e in vocabulary["categories"] + vocabulary["urgency"])
+        _, t_scan = timed(substring_scanner(vocabulary), descriptions, labels)
+        engine, t_engine = timed(KeywordMatcher(vocabulary).classify, descriptions, labels)
+        print(f"{f'Substring scans, {name} ({size} keywords)':<40}{t_scan:6.2f}s  ({t_scan / n * 1e6:.1f} us each)")
+        print(f"{f'Compiled engine, {name} ({size} keywords)':<40}{t_engine:6.2f}s  ({t_engine / n * 1e6:.1f} us each)")
+        if name == "default":
+            new = engine
+
+    changed = {(d, l, o, c) for d, l, o, c in zip(descriptions, labels, old, new) if o != c}
+    print(f"Verdicts changed vs legacy lists: {sum(o != c for o, c in zip(old, new))}; examples:")
+    for d, l, o, c in sorted(changed)[:5]:
+        print(f"  [{l}] {d!r}\n      legacy={o}  engine={c}")
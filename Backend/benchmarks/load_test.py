@@ -0,0 +1,146 @@
+# load_test.py
+# Mixed-traffic load test against the real app (uvicorn, in-process, temp databases):
+#   60% desk inbox, 30% heatmap (half viewport / R*Tree, half precomputed clusters),
+#   10% complaint submission, plus a /health probe measuring event-loop responsiveness.
+# Reports throughput and p50 / p95 latency per concurrency level. With blocking sqlite3
+# calls inside async handlers every request queues behind the running query and /health
+# latency tracks the slowest route; with the DB thread executor it stays flat.
+# Run from Backend/:  python benchmarks/load_test.py [seconds_per_level] [levels, e.g. 1,8,32,64]
+import os
+import sys
+import time
+import random
+import sqlite3
+import asyncio
+import tempfile
+import threading
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+PORT = 8765
+WARDS = [f"Ward {i}" for i in range(20)]
+CATEGORIES = ["Roads & Infrastructure", "Water Supply", "Electricity/Power", "Sanitation & Waste"]
+
+
+def setup_environment(tmp):
+    """Config is read at import time: point everything at the temp dir first."""
+    os.chdir(tmp)
+    os.makedirs("uploads", exist_ok=True)
+    os.environ.setdefault("DETECTOR_BACKEND", "stub")
+    os.environ["DATABASE_PATH"] = os.path.join(tmp, "grievance.db")
+    os.environ["GOVT_DB_PATH"] = os.path.join(tmp, "government.db")
+    os.environ["UPLOAD_STORE_DIR"] = os.path.join(tmp, "uploads", "cas")
+
+
+def seed(n=20000):
+    import takeimage
+    takeimage.init_db()
+    conn = sqlite3.connect(os.environ["DATABASE_PATH"])
+    rows = []
+    for i in range(n):
+        lat, lon = 19.2 + random.random() * 0.1, 73.0 + random.random() * 0.1
+        rows.append((takeimage.encrypt_data(f"Citizen {i}"), takeimage.encrypt_data("9876543210"),
+                     "en", "pothole near the school gate", "Seed", lat, lon,
+                     random.choice(WARDS), random.choice(CATEGORIES), round(random.uniform(1, 10), 1),
+                     random.choice(["verified", "verified", "assigned", "resolved"])))
+    conn.executemany('''
+        INSERT INTO complaints (full_name, phone_number, language, description, location,
+            latitude, longitude, ward_zone, ai_category, ai_score, status)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''', rows)
+    conn.commit()  # R*Tree triggers index the open rows
+    conn.close()
+
+
+def start_server():
+    import uvicorn
+    import takeimage
+    server = uvicorn.Server(uvicorn.Config(takeimage.app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * p), len(samples) - 1)] * 1000 if samples else 0.0
+
+
+async def run_level(client, concurrency, seconds, token):
+    import takeimage
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = {"inbox": [], "heatmap": [], "submit": [], "health": []}
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    counter = iter(range(10 ** 9))
+
+    async def one_request():
+        nonlocal errors
+        roll = random.random()
+        ward = random.choice(WARDS)
+        start = time.perf_counter()
+        if roll < 0.6:
+            kind = "inbox"
+            r = await client.get("/api/v1/desk/inbox", params={"ward": ward, "domain": "Roads"})
+        elif roll < 0.9:
+            kind = "heatmap"
+            params = {"ward": ward, "category": "Roads"}
+            if roll < 0.75:
+                lat, lon = 19.2 + random.random() * 0.08, 73.0 + random.random() * 0.08
+                params.update(min_lat=lat, min_lon=lon, max_lat=lat + 0.02, max_lon=lon + 0.02)
+            r = await client.get("/get-heatmap", params=params, headers=headers)
+        else:
+            kind = "submit"
+            email = f"load{next(counter)}@test.local"
+            takeimage.auth_context[email] = {"verified": True}  # OTP step is out of scope here
+            r = await client.post("/submit-complaint", data={
+                "full_name": "Load Test", "phone_number": "9876543210", "email": email,
+                "language": "en", "description": "garbage not collected", "location": "Load",
+                "latitude": 18.0 + random.random(), "longitude": 72.0 + random.random(),
+                "ward_zone": ward,
+            }, files={"file": ("load.jpg", os.urandom(2048), "image/jpeg")})
+        latencies[kind].append(time.perf_counter() - start)
+        if r.status_code >= 500 and r.status_code != 503:  # 503 = triage back-pressure, by design
+            errors += 1
+
+    async def user():
+        while time.perf_counter() < deadline:
+            await one_request()
+
+    async def probe():
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await client.get("/health")
+            latencies["health"].append(time.perf_counter() - start)
+            await asyncio.sleep(0.05)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe(), *(user() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    done = sum(len(v) for k, v in latencies.items() if k != "health")
+    print(f"concurrency {concurrency:>3}: {done / elapsed:7.1f} req/s   errors {errors}")
+    for kind, samples in latencies.items():
+        print(f"    {kind:<8} n={len(samples):<6} p50 {percentile(samples, 0.5):8.1f} ms   "
+              f"p95 {percentile(samples, 0.95):8.1f} ms")
+
+
+async def main(seconds, levels):
+    import httpx
+    import takeimage
+    token = takeimage.create_access_token({"sub": "loadtest@test.local"})
+    limits = httpx.Limits(max_connections=max(levels) + 1)
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{PORT}", limits=limits, timeout=60) as client:
+        for concurrency in levels:
+            await run_level(client, concurrency, seconds, token)
+
+
+if __name__ == "__main__":
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10
+    levels = [int(c) for c in sys.argv[2].split(",")] if len(sys.argv) > 2 else [1, 8, 32, 64]
+    with tempfile.TemporaryDirectory() as tmp:
+        setup_environment(tmp)
+        seed()
+        server = start_server()
+        asyncio.run(main(seconds, levels))
+        server.should_exit = True
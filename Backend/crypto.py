@@ -0,0 +1,120 @@
+# crypto.py
+# --- UNIFIED PII ENCRYPTION (AES-256-GCM + legacy Fernet) ---
+# takeimage.py wrote AES-GCM hex while desk_routes decrypted through detective.py's Fernet
+# path, so the desk inbox showed raw ciphertext. One module now owns both:
+#   - encrypt_data: AES-256-GCM, nonce || ciphertext as hex (unchanged storage format)
+#   - decrypt_data: AES-GCM hex, legacy Fernet tokens ("gAAAAA...") and plain seed text
+#   - cipher objects are built once per key and cached
+#   - DecryptMemo: bounded per-request memo; decrypt_many dedupes a page in one pass
+#   - list endpoints return masked values or opaque handles ("full_name:42");
+#     POST /api/v1/complaints/reveal decrypts only the rows actually rendered
+import os
+import re
+from functools import lru_cache
+
+from cryptography.exceptions import InvalidTag
+from cryptography.fernet import Fernet, InvalidToken
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY", "32-bytes-of-sovereign-intelligence-key!")
+PII_MEMO_SIZE = int(os.getenv("PII_MEMO_SIZE", 1024))
+PII_FIELDS = ("full_name", "phone_number")
+
+_NONCE_BYTES = 12
+_HEX_RE = re.compile(r"[0-9a-f]+")
+_FERNET_PREFIX = "gAAAAA"  # Fernet version byte 0x80, base64
+
+
+@lru_cache(maxsize=None)
+def _aesgcm(key):
+    # Ensure 32 bytes for AES-256
+    return AESGCM(key.encode().ljust(32)[0:32])
+
+
+@lru_cache(maxsize=None)
+def _fernet(key):
+    """Legacy dashboards used ENCRYPTION_KEY as a Fernet key; None when it is not one."""
+    try:
+        return Fernet(key.encode())
+    except (ValueError, TypeError):
+        return None
+
+
+def encrypt_data(data: str) -> str:
+    """Industrial-Grade AES-256-GCM Encryption"""
+    nonce = os.urandom(_NONCE_BYTES)
+    ciphertext = _aesgcm(ENCRYPTION_KEY).encrypt(nonce, data.encode(), None)
+    return (nonce.hex() + ciphertext.hex())
+
+
+def decrypt_data(value: str) -> str:
+    """
+    AES-GCM hex or legacy Fernet token -> plaintext.
+    Values that are neither (unencrypted seed data) or fail to decrypt are returned as-is.
+    """
+    if not value:
+        return value
+    if len(value) > 2 * _NONCE_BYTES and _HEX_RE.fullmatch(value):
+        try:
+            data_bytes = bytes.fromhex(value)
+            return _aesgcm(ENCRYPTION_KEY).decrypt(data_bytes[:_NONCE_BYTES], data_bytes[_NONCE_BYTES:], None).decode()
+        except (InvalidTag, ValueError):
+            return value
+    if value.startswith(_FERNET_PREFIX):
+        fernet = _fernet(ENCRYPTION_KEY)
+        if fernet:
+            try:
+                return fernet.decrypt(value.encode()).decode()
+            except InvalidToken:
+                pass
+    return value # Fallback for unencrypted seed data
+
+
+def mask_phone(phone: str) -> str:
+    """DATA MASKING: Only last 3 digits visible (None when there is no number)"""
+    if not phone:
+        return None
+    phone = str(phone)
+    return ("*" * (len(phone) - 3)) + phone[-3:] if len(phone) >= 3 else phone
+
+
+def pii_handle(field, complaint_id):
+    """Opaque stand-in for a PII column in list responses."""
+    return f"{field}:{complaint_id}"
+
+
+def parse_handle(handle):
+    """"full_name:42" -> ("full_name", 42); ValueError for anything else."""
+    field, _, complaint_id = handle.partition(":")
+    if field not in PII_FIELDS:
+        raise ValueError(handle)
+    return field, int(complaint_id)
+
+
+class DecryptMemo:
+    """Per-request memo of decrypted values, bounded so one request cannot grow it unchecked."""
+
+    def __init__(self, limit=PII_MEMO_SIZE):
+        self.limit = limit
+        self._values = {}
+
+    def decrypt(self, value):
+        plain = self._values.get(value)
+        if plain is None:
+            plain = decrypt_data(value)
+            if len(self._values) < self.limit:
+                self._values[value] = plain
+        return plain
+
+    def decrypt_many(self, values):
+        """Batch form: each distinct ciphertext of the batch is decrypted once."""
+        unique = {v: self.decrypt(v) for v in dict.fromkeys(values)}
+        return [unique[v] for v in values]
+
+
+def decrypt_memo():
+    """FastAPI dependency: a fresh memo per request."""
+    return DecryptMemo()
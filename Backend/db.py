@@ -0,0 +1,242 @@
+# db.py
+# --- SHARED SQLITE ACCESS LAYER ---
+# Handlers used to sqlite3.connect() on every request (often twice), paying file open,
+# schema parse and PRAGMA defaults each time, with an empty statement cache.
+#   - One bounded pool per database file; connections are reused across requests/threads
+#   - PRAGMAs applied once per connection (configure): WAL, synchronous=NORMAL,
+#     mmap_size, cache_size, busy_timeout
+#   - Statement cache (cached_statements) survives between requests
+#   - db.connect(path) is a drop-in for sqlite3.connect(path): close() / `with` return
+#     the connection to its pool instead of closing it
+#   - FastAPI dependencies: Depends(grievance_db) / Depends(government_db) for sync routes
+#   - Async routes await run() / fetchone() / fetchall() / execute(): the query runs on a
+#     dedicated DB thread executor, so a slow query never blocks the event loop
+#   - The executor draws from its own per-file pool of DB_THREADS connections; connect() and
+#     the sync dependencies (triage threads, SLA scheduler, caches) share the other one, so
+#     background work holding connections can never starve the async routes
+import os
+import queue
+import asyncio
+import sqlite3
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")   # Complaints & core data
+GOVT_DB = os.getenv("GOVT_DB_PATH", "government.db")          # Officers, auth, system_config
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+DB_CACHE_KB = int(os.getenv("DB_CACHE_KB", 16000))
+DB_STATEMENT_CACHE = int(os.getenv("DB_STATEMENT_CACHE", 256))
+DB_THREADS = int(os.getenv("DB_THREADS", DB_POOL_SIZE))
+
+
+def configure(conn):
+    """Per-connection PRAGMAs (journal_mode=WAL is persistent, the rest are per connection)."""
+    conn.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    conn.execute(f"PRAGMA cache_size=-{DB_CACHE_KB}")
+    return conn
+
+
+class ConnectionPool:
+    """Bounded LIFO pool (most recently used = warmest page cache) for one database file."""
+
+    def __init__(self, path, size=DB_POOL_SIZE, timeout=DB_POOL_TIMEOUT, role="shared"):
+        self.path = path
+        self.role = role
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.LifoQueue()
+        self._lock = threading.Lock()
+        self._created = 0
+
+    def _new(self):
+        conn = sqlite3.connect(
+            self.path, timeout=DB_BUSY_TIMEOUT_MS / 1000,
+            check_same_thread=False,  # Handed between request threads, never used concurrently
+            cached_statements=DB_STATEMENT_CACHE
+        )
+        return configure(conn)
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                create = True
+            else:
+                create = False
+        if create:
+            try:
+                return self._new()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self.timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError(f"Connection pool exhausted for {self.path}")
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()  # Never hand out a connection with someone else's open transaction
+            conn.row_factory = None
+        except sqlite3.Error:
+            # Broken connection: drop it and free its slot
+            with self._lock:
+                self._created -= 1
+            return
+        self._idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def stats(self):
+        return {"path": self.path, "role": self.role, "size": self.size,
+                "open": self._created, "idle": self._idle.qsize()}
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(path, role="shared"):
+    """role="shared": connect() / dependencies; role="executor": the async DB threads only."""
+    pool = _pools.get((path, role))
+    if pool is None:
+        with _pools_lock:
+            pool = _pools.get((path, role))
+            if pool is None:
+                size = DB_THREADS if role == "executor" else DB_POOL_SIZE
+                pool = _pools[(path, role)] = ConnectionPool(path, size, role=role)
+    return pool
+
+
+class PooledConnection:
+    """
+    sqlite3.Connection stand-in returned by connect(): everything is delegated, except that
+    close() and the end of a `with` block give the connection back to the pool.
+    """
+
+    __slots__ = ("_conn", "_pool")
+
+    def __init__(self, pool):
+        object.__setattr__(self, "_pool", pool)
+        object.__setattr__(self, "_conn", pool.acquire())
+
+    def __getattr__(self, name):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is None:
+            raise sqlite3.ProgrammingError("Cannot operate on a closed database.")
+        return getattr(conn, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._conn, name, value)  # e.g. conn.row_factory = sqlite3.Row
+
+    def close(self):
+        conn = object.__getattribute__(self, "_conn")
+        if conn is not None:
+            object.__setattr__(self, "_conn", None)
+            self._pool.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # sqlite3 semantics (commit / rollback), then back to the pool
+        if self._conn is not None:
+            if exc_type is None:
+                self._conn.commit()
+            else:
+                self._conn.rollback()
+        self.close()
+        return False
+
+    def __del__(self):
+        # Handlers that raise before close() still return their connection
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def connect(path=DATABASE_PATH):
+    """Drop-in for sqlite3.connect(path) backed by the per-file pool."""
+    return PooledConnection(get_pool(path))
+
+
+# --- ASYNC ACCESS (dedicated DB thread executor) ---
+# One connection per DB thread in the executor's own pool: a DB thread never waits for a
+# connection, however many the triage / SLA / cache threads hold in the shared pool
+_executor = ThreadPoolExecutor(max_workers=DB_THREADS, thread_name_prefix="db")
+
+
+def _call(path, fn, args, row_factory):
+    with get_pool(path, "executor").connection() as conn:
+        if row_factory is not None:
+            conn.row_factory = row_factory
+        try:
+            result = fn(conn, *args)
+            if conn.in_transaction:
+                conn.commit()
+            return result
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+
+async def run(path, fn, *args, row_factory=None):
+    """
+    Runs fn(conn, *args) on a DB thread with a pooled connection; commits on success,
+    rolls back on error. Use for multi-statement work that must share one connection.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _call, path, fn, args, row_factory)
+
+
+async def fetchone(path, sql, params=(), row_factory=None):
+    return await run(path, lambda conn: conn.execute(sql, params).fetchone(), row_factory=row_factory)
+
+
+async def fetchall(path, sql, params=(), row_factory=None):
+    return await run(path, lambda conn: conn.execute(sql, params).fetchall(), row_factory=row_factory)
+
+
+async def execute(path, sql, params=()):
+    """Single write statement, committed. Returns (lastrowid, rowcount)."""
+    def _execute(conn):
+        cursor = conn.execute(sql, params)
+        return cursor.lastrowid, cursor.rowcount
+    return await run(path, _execute)
+
+
+# --- FASTAPI DEPENDENCIES (sync routes) ---
+def grievance_db():
+    with get_pool(DATABASE_PATH).connection() as conn:
+        yield conn
+
+
+def government_db():
+    with get_pool(GOVT_DB).connection() as conn:
+        yield conn
+
+
+def pool_stats():
+    return [pool.stats() for pool in list(_pools.values())]
@@ -1,54 +1,43 @@
 # desk_routes.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from typing import Optional
 import sqlite3
 import os
 from datetime import datetime, timedelta # 1. ADDED MISSING IMPORTS
-from detective import decrypt_data 
+import db  # Async DB access (dedicated DB thread executor)
+from desk_stats import (  # Indexed Dashboard Aggregates + Daily Rollups
+    desk_counts, cached_counts, remember_counts, severity_trend, TREND_RANGES, domain_code
+)
+from crypto import pii_handle  # Unified PII Encryption (opaque handles)
+from pagination import (  # Keyset Pagination + Field Projection
+    parse_fields, filter_clause, fetch_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from events import event_hub, events_since, EVENTS_BATCH, RESYNC  # Complaint Event Stream
 
 router = APIRouter(prefix="/api/v1/desk", tags=["Desk Officer"])
 
-DATABASE_PATH = "grievance.db"
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")
 
 @router.get("/dashboard-stats")
 async def get_desk_stats(ward: str, domain: str):
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        # 2. REVOLUTIONARY FIX: Use LIKE with wildcards
-        # This allows "Roads" to match "Roads & Infrastructure"
+        # 2. REVOLUTIONARY FIX: Indexed category_code instead of LIKE '%domain%'
+        # "Roads" still covers "Roads & Infrastructure" (see desk_stats.py)
         domain = domain.strip()
-        search_term = f"%{domain}%"
 
-        # Query 1: Total Load
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE ward_zone=? AND ai_category LIKE ? AND status IN ('verified', 'assigned', 'resolved')
-        ''', (ward, search_term))
-        total_tasks = cursor.fetchone()[0]
+        # Polled by every desk officer: short-TTL cache, then one aggregated query
+        counts = cached_counts(ward, domain)
+        if counts is None:
+            counts = await db.run(DATABASE_PATH, desk_counts, ward, domain)
+            remember_counts(ward, domain, counts)
+        total_tasks, on_time_resolved, urgent = counts
 
         if total_tasks == 0:
             return {"total_today": 0, "urgent_count": "00", "sla_compliance": "100%"}
 
-        # Query 2: Resolved on time
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE ward_zone=? AND ai_category LIKE ? 
-            AND status = 'resolved' 
-            AND resolved_at <= deadline_at
-        ''', (ward, search_term))
-        on_time_resolved = cursor.fetchone()[0]
-
-        # Query 3: Urgent count
-        cursor.execute('''
-            SELECT COUNT(*) FROM complaints 
-            WHERE ward_zone=? AND ai_category LIKE ? AND ai_score >= 8.0 AND status != 'resolved'
-        ''', (ward, search_term))
-        urgent = cursor.fetchone()[0]
-
         compliance_rate = (on_time_resolved / total_tasks) * 100
 
-        conn.close()
         return {
             "total_today": total_tasks,
             "urgent_count": f"{urgent:02d}",
@@ -58,66 +47,87 @@ async def get_desk_stats(ward: str, domain: str):
         print(f"SLA Calculation Error: {e}")
         return {"status": "error", "message": str(e)}
         
+# Unauthenticated route: no phone numbers / raw descriptions in the inbox projection
+INBOX_FIELDS = ("id", "location", "ai_score", "status", "contractor_id", "full_name",
+                "priority", "ai_category", "created_at", "deadline_at", "resolved_at", "escalation_level")
+INBOX_STATUSES = ("pending", "verified", "assigned", "escalated", "resolved")
+
 @router.get("/inbox")
-async def get_desk_inbox(ward: str, domain: str):
+async def get_desk_inbox(
+    ward: str,
+    domain: str,
+    response: Response,
+    cursor: Optional[str] = None,      # X-Next-Cursor of the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,
+    status: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None
+):
+    columns = parse_fields(fields, INBOX_FIELDS, INBOX_FIELDS[:6])
+    extra, extra_params = filter_clause(status, INBOX_STATUSES, since, until)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
         domain = domain.strip()
-        search_term = f"%{domain}%"
+        code = domain_code(domain)
         
-        # Updated to LIKE
-        cursor.execute('''
-            SELECT id, location, ai_score, status, contractor_id, full_name 
-            FROM complaints 
-            WHERE ward_zone=? AND ai_category LIKE ? AND status != 'rejected'
-            ORDER BY ai_score DESC
-        ''', (ward, search_term))
-        
-        rows = cursor.fetchall()
+        # Updated to LIKE (indexed category_code when the domain is a category code)
+        where = "ward_zone = ? AND " + ("category_code = ?" if code else "ai_category LIKE ?")
+        where += " AND status != 'rejected'" + extra
+        rows, next_cursor = await db.run(
+            DATABASE_PATH, fetch_page, columns, where, [ward, code or f"%{domain}%", *extra_params],
+            limit, cursor, row_factory=sqlite3.Row
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
+
         complaints = []
         for row in rows:
             d = dict(row)
-            d["full_name"] = decrypt_data(d["full_name"])
+            if "full_name" in d:
+                # Lazy PII: the inbox never decrypts; POST /api/v1/complaints/reveal does, per rendered row
+                d["full_name"] = pii_handle("full_name", d["id"])
             complaints.append(d)
-            
-        conn.close()
         return complaints
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/severity-trend")
-async def get_severity_trend(ward: str, domain: str):
+async def get_severity_trend(ward: str, domain: str, days: int = 7):
+    if days not in TREND_RANGES:
+        raise HTTPException(status_code=400, detail=f"days must be one of {list(TREND_RANGES)}")
     try:
-        with sqlite3.connect("grievance.db") as conn:
-            cursor = conn.cursor()
-            domain = domain.strip()
-            search_term = f"%{domain}%"
-            trend_data = []
-            
-            for i in range(6, -1, -1):
-                # Calculate the date for the last 7 days
-                target_date = (datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d')
-                day_name = (datetime.now() - timedelta(days=i)).strftime('%a')
-                
-                # REVOLUTIONARY FIX: 
-                # 1. Use AVG(ai_score) to show real severity trend.
-                # 2. Use strftime to normalize the SQLite date comparison.
-                cursor.execute('''
-                    SELECT AVG(ai_score) FROM complaints 
-                    WHERE ward_zone=? AND ai_category LIKE ? 
-                    AND strftime('%Y-%m-%d', created_at) = ?
-                ''', (ward, search_term, target_date))
-                
-                avg_val = cursor.fetchone()[0]
-                # If no data for that day, return 0.0
-                score = round(float(avg_val), 1) if avg_val else 0.0
-                
-                trend_data.append({"day": day_name, "val": score})
-            
-            return trend_data
+        # REVOLUTIONARY FIX: one range read on daily_rollup instead of one full scan per day
+        return await db.run(DATABASE_PATH, severity_trend, ward, domain, days)
     except Exception as e:
         print(f"Trend Calculation Error: {e}")
-        return []
\ No newline at end of file
+        return []
+
+@router.get("/events")
+async def stream_events(
+    request: Request,
+    ward: Optional[str] = None,     # Default: every ward
+    domain: Optional[str] = None    # Default: every category
+):
+    """
+    Server-Sent Events: complaint verified / rejected / assigned / resolved, filtered by
+    ward and domain. Dashboards refetch what an event touches instead of polling.
+    """
+    domain = domain.strip() if domain else None
+    code = domain_code(domain) if domain else None
+    sub = event_hub.subscribe(ward, code, None if code else domain)
+
+    # EventSource reconnects with Last-Event-ID: replay what was missed from the outbox
+    replay = []
+    last_event_id = request.headers.get("last-event-id")
+    if last_event_id and last_event_id.isdigit():
+        replay = await db.run(DATABASE_PATH, events_since, int(last_event_id))
+        if len(replay) == EVENTS_BATCH:
+            replay = []  # Too far behind: a full refetch is cheaper
+            sub.queue.put_nowait(RESYNC)
+    return StreamingResponse(
+        event_hub.stream(sub, replay),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,219 @@
+# desk_stats.py
+# --- DESK DASHBOARD AGGREGATES ---
+# The stats card is polled constantly by every desk officer. It used to run three COUNT(*)
+# queries filtered on "ai_category LIKE '%domain%'"; the leading wildcard defeats every index.
+#   - category_code: normalized first word of ai_category ("Roads & Infrastructure" -> "roads"),
+#     kept in sync by triggers (like the R*Tree in spatial_index.py), so triage, re-scoring
+#     and seed scripts never have to maintain it by hand
+#   - idx_complaints_ward_category_status (ward_zone, category_code, status) serves the lookup
+#   - one SUM(CASE ...) pass returns total / on-time resolved / urgent together
+#   - results are cached per (ward, domain) for DESK_STATS_TTL seconds
+# Domains that are not a plain category code ("Power", "Infra") keep the old LIKE match.
+# --- DAILY SEVERITY ROLLUPS ---
+# severity-trend ran one AVG(ai_score) per day on strftime(created_at) (a full scan each).
+#   - daily_rollup (ward_zone, category_code, day) holds count / sum / max of ai_score
+#   - run_task_back adds each complaint once, in the same transaction that verifies it
+#   - re-scoring rebuilds it (scores and categories move); so does `python desk_stats.py`
+#   - any 7 / 30 / 90 / 365 day trend is one primary-key range read
+import os
+import re
+import sys
+import time
+import sqlite3
+from datetime import datetime, timedelta
+
+from keywords import get_matcher
+
+DESK_STATS_TTL = float(os.getenv("DESK_STATS_TTL", 5))
+_CACHE_LIMIT = 4096
+
+
+def category_code(name):
+    """"Roads & Infrastructure" -> "roads", "Electricity/Power" -> "electricity"."""
+    if not name:
+        return None
+    return re.split(r"[\s/&]", name.strip(), maxsplit=1)[0].lower() or None
+
+
+def _code_sql(column):
+    """SQL twin of category_code(): text before the first space, '/' or '&', lower-cased."""
+    expr = f"ltrim({column})"
+    for delimiter in (" ", "/", "&"):
+        expr = f"substr({expr}, 1, instr({expr} || '{delimiter}', '{delimiter}') - 1)"
+    return f"NULLIF(lower({expr}), '')"
+
+
+def init_category_codes(cursor):
+    """
+    Adds category_code + sync triggers + composite index and back-fills existing rows.
+    Safe to call on every startup.
+    """
+    try:
+        cursor.execute("ALTER TABLE complaints ADD COLUMN category_code TEXT")
+    except sqlite3.OperationalError:
+        pass # Column already exists
+
+    # 1. New complaint (seed scripts insert categorized rows directly)
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_category_insert
+        AFTER INSERT ON complaints
+        WHEN NEW.ai_category IS NOT NULL
+        BEGIN
+            UPDATE complaints SET category_code = {_code_sql("NEW.ai_category")} WHERE id = NEW.id;
+        END
+    ''')
+
+    # 2. Triage / re-scoring (re)categorizes a complaint
+    cursor.execute(f'''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_category_update
+        AFTER UPDATE OF ai_category ON complaints
+        BEGIN
+            UPDATE complaints SET category_code = {_code_sql("NEW.ai_category")} WHERE id = NEW.id;
+        END
+    ''')
+
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_ward_category_status
+        ON complaints(ward_zone, category_code, status)
+    ''')
+
+    # --- MIGRATION: Back-fill rows categorized before the column existed ---
+    cursor.execute(f'''
+        UPDATE complaints SET category_code = {_code_sql("ai_category")}
+        WHERE category_code IS NULL AND ai_category IS NOT NULL
+    ''')
+
+
+def domain_code(domain):
+    """The category_code a desk domain maps to, or None when only a LIKE match is faithful."""
+    domain = domain.strip().lower()
+    matcher = get_matcher()
+    codes = {category_code(c) for c in matcher.categories + [matcher.fallback_category]}
+    return domain if domain in codes else None
+
+
+_STATS_SQL = '''
+    SELECT
+        SUM(CASE WHEN status IN ('verified', 'assigned', 'escalated', 'resolved') THEN 1 ELSE 0 END),
+        SUM(CASE WHEN status = 'resolved' AND resolved_at <= deadline_at THEN 1 ELSE 0 END),
+        SUM(CASE WHEN ai_score >= 8.0 AND status != 'resolved' THEN 1 ELSE 0 END)
+    FROM complaints
+    WHERE ward_zone = ? AND {filter}
+'''
+
+
+def desk_counts(conn, ward, domain):
+    """(total, on_time_resolved, urgent) for one ward / domain in a single indexed pass."""
+    code = domain_code(domain)
+    if code:
+        row = conn.execute(_STATS_SQL.format(filter="category_code = ?"), (ward, code)).fetchone()
+    else:
+        row = conn.execute(_STATS_SQL.format(filter="ai_category LIKE ?"), (ward, f"%{domain.strip()}%")).fetchone()
+    return tuple(value or 0 for value in row)
+
+
+_cache = {}
+
+
+def cached_counts(ward, domain):
+    entry = _cache.get((ward, domain))
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+
+def remember_counts(ward, domain, counts):
+    if DESK_STATS_TTL <= 0:
+        return
+    if len(_cache) >= _CACHE_LIMIT:
+        _cache.clear()
+    _cache[(ward, domain)] = (time.monotonic() + DESK_STATS_TTL, counts)
+
+
+# --- DAILY SEVERITY ROLLUPS ---
+TREND_RANGES = (7, 30, 90, 365)
+
+
+def init_daily_rollup(cursor):
+    """Creates daily_rollup; an empty table is back-filled from existing complaints."""
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS daily_rollup (
+            ward_zone TEXT NOT NULL,
+            category_code TEXT NOT NULL,
+            day TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            score_sum REAL NOT NULL,
+            score_max REAL NOT NULL,
+            PRIMARY KEY (ward_zone, category_code, day)
+        ) WITHOUT ROWID
+    ''')
+    if cursor.execute("SELECT 1 FROM daily_rollup LIMIT 1").fetchone() is None:
+        rebuild_daily_rollup(cursor)
+
+
+def rebuild_daily_rollup(cursor):
+    """Recomputes every bucket in one GROUP BY pass (after bulk re-scoring / seeding)."""
+    cursor.execute("DELETE FROM daily_rollup")
+    cursor.execute('''
+        INSERT INTO daily_rollup (ward_zone, category_code, day, count, score_sum, score_max)
+        SELECT ward_zone, category_code, date(created_at), COUNT(*), SUM(ai_score), MAX(ai_score)
+        FROM complaints
+        WHERE ai_score IS NOT NULL AND ward_zone IS NOT NULL
+        AND category_code IS NOT NULL AND created_at IS NOT NULL
+        GROUP BY ward_zone, category_code, date(created_at)
+    ''')
+
+
+def record_verified(cursor, complaint_id):
+    """Adds one freshly verified complaint to its (ward, category, created day) bucket."""
+    cursor.execute('''
+        INSERT INTO daily_rollup (ward_zone, category_code, day, count, score_sum, score_max)
+        SELECT ward_zone, category_code, date(created_at), 1, ai_score, ai_score
+        FROM complaints
+        WHERE id = ? AND ai_score IS NOT NULL AND ward_zone IS NOT NULL
+        AND category_code IS NOT NULL AND created_at IS NOT NULL
+        ON CONFLICT (ward_zone, category_code, day) DO UPDATE SET
+            count = count + 1,
+            score_sum = score_sum + excluded.score_sum,
+            score_max = MAX(score_max, excluded.score_max)
+    ''', (complaint_id,))
+
+
+def severity_trend(conn, ward, domain, days=7):
+    """[{"date", "day", "val"}] oldest first; val = average ai_score of that day (0.0 if none)."""
+    today = datetime.now()
+    dates = [(today - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(days - 1, -1, -1)]
+    code = domain_code(domain)
+    if code:
+        rows = conn.execute('''
+            SELECT day, score_sum / count FROM daily_rollup
+            WHERE ward_zone = ? AND category_code = ? AND day BETWEEN ? AND ?
+        ''', (ward, code, dates[0], dates[-1])).fetchall()
+    else:
+        # Not a category code: one grouped LIKE scan instead of one per day
+        rows = conn.execute('''
+            SELECT date(created_at) AS d, AVG(ai_score) FROM complaints
+            WHERE ward_zone = ? AND ai_category LIKE ? AND d BETWEEN ? AND ?
+            GROUP BY d
+        ''', (ward, f"%{domain.strip()}%", dates[0], dates[-1])).fetchall()
+    averages = dict(rows)
+    return [{
+        "date": date,
+        "day": datetime.strptime(date, '%Y-%m-%d').strftime('%a'),
+        # If no data for that day, return 0.0
+        "val": round(float(averages[date]), 1) if averages.get(date) else 0.0
+    } for date in dates]
+
+
+if __name__ == "__main__":
+    # Stand-alone rebuild (e.g. after test_data.py or a manual import):
+    #   python desk_stats.py [path/to/grievance.db]
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("DATABASE_PATH", "grievance.db")
+    conn = sqlite3.connect(db_path)
+    init_category_codes(conn.cursor())
+    init_daily_rollup(conn.cursor())
+    rebuild_daily_rollup(conn.cursor())
+    conn.commit()
+    buckets = conn.execute("SELECT COUNT(*) FROM daily_rollup").fetchone()[0]
+    conn.close()
+    print(f"✅ Daily rollup rebuilt on {db_path}: {buckets} (ward, category, day) buckets")
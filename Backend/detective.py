@@ -1,58 +1,83 @@
 # --- 1. IMPORTING THE NECESSARY LIBRARY ---
-# Importing the Roboflow SDK to communicate with the cloud-based AI model
-from roboflow import Roboflow 
+# Detector backends (Roboflow cloud SDK, local ONNX / OpenCV DNN, offline stub)
+from detectors import build_detector
 import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 load_dotenv()
-from cryptography.fernet import Fernet
 
-# --- 2. CONFIGURATION & CLOUD CONNECTION ---
-# Replace with your actual Private API Key from the Roboflow 'Deploy' tab
-API_KEY = os.getenv("ROBOFLOW_API_KEY")
+# --- 2. CONFIGURATION & MODEL BACKEND ---
+# DETECTOR_BACKEND=roboflow (default) talks to the cloud model; onnx / opencv run exported
+# weights in-process on the CPU; stub is an offline stand-in. See detectors.py.
+DETECTOR_BACKEND = os.getenv("DETECTOR_BACKEND", "roboflow").lower()
+# Max images in flight at once for run_ai_detection_batch
+DETECTION_CONCURRENCY = int(os.getenv("DETECTION_CONCURRENCY", 8))
 
-# Creating a connection object 'rf' to log into your Roboflow account
-rf = Roboflow(api_key=API_KEY)
+# Lazy, cached model: importing this module makes no network calls. The model is built
+# on first use (or by warm_detector() from the API lifespan) and then reused.
+_detector = None
+_detector_lock = threading.Lock()
+_detector_status = {"backend": DETECTOR_BACKEND, "state": "not_loaded", "error": None, "load_seconds": None}
 
-# Selecting your specific project from your workspace
-# Based on your setup: "govt_ai_compliant"
-ROBOFLOW_PROJECT = os.getenv("ROBOFLOW_PROJECT")
-project = rf.workspace().project(ROBOFLOW_PROJECT)
+def get_detector():
+    global _detector
+    if _detector is None:
+        with _detector_lock:
+            if _detector is None:
+                _detector_status.update(state="loading", error=None)
+                started = time.perf_counter()
+                try:
+                    loaded = build_detector(DETECTOR_BACKEND)
+                except Exception as e:
+                    _detector_status.update(state="failed", error=str(e))
+                    raise
+                _detector_status.update(
+                    state="ready", backend=loaded.name,
+                    load_seconds=round(time.perf_counter() - started, 3)
+                )
+                _detector = loaded
+    return _detector
 
-# Loading the 'model' object from Version 1 of your project
-ROBOFLOW_VERSION = int(os.getenv("ROBOFLOW_VERSION", 1))
-model = project.version(ROBOFLOW_VERSION).model
+def warm_detector():
+    """Background warm-up; failures are reported through detector_status(), never raised."""
+    try:
+        get_detector()
+    except Exception as e:
+        print(f"Detector Warm-up Error: {e}")
+
+def detector_status():
+    return dict(_detector_status)
 
 # --- 3. THE AI SCANNING FUNCTION ---
+def _summarize(detections):
+    """Packages the highest-confidence detection (the API does not sort predictions)."""
+    # If the list size is greater than 0, a grievance (pothole) was found
+    if len(detections) > 0:
+        top_detect = max(detections, key=lambda d: d.get('confidence', 0.0))
+        return {
+            "detected": True,                # AI confirms grievance is present
+            "label": top_detect['class'],    # The name of the object (e.g., 'pothole')
+            "confidence": top_detect['confidence'] # How sure the AI is (0.0 to 1.0)
+        }
+
+    # If the list is empty, the AI found no potholes
+    return {
+        "detected": False, 
+        "label": "none", 
+        "confidence": 0.0
+    }
+
 # This function takes a local image path (e.g., 'uploads/image.jpg') and scans it
 def run_ai_detection(image_path):
     # 'try' block ensures the app doesn't crash if internet fails
     try:
-        # Sending image to Roboflow for 'Inference' (AI verification)
+        # Sending image to the configured detector for 'Inference' (AI verification)
         # confidence=40 means ignore any results the AI isn't at least 40% sure about
-        prediction = model.predict(image_path, confidence=40).json()
-        
-        # Extracting the list of found objects from the 'predictions' section of the response
-        detections = prediction.get('predictions', [])
-        print(prediction)
-        # If the list size is greater than 0, a grievance (pothole) was found
-        if len(detections) > 0:
-            # Taking the result with the highest confidence (the first item)
-            top_detect = detections[0]
-            
-            # Returning a package of data back to main.py
-            return {
-                "detected": True,                # AI confirms grievance is present
-                "label": top_detect['class'],    # The name of the object (e.g., 'pothole')
-                "confidence": top_detect['confidence'] # How sure the AI is (0.0 to 1.0)
-            }
-        
-        # If the list is empty, the AI found no potholes
-        else:
-            return {
-                "detected": False, 
-                "label": "none", 
-                "confidence": 0.0
-            }
+        detector = get_detector()
+        detections = detector.predict(image_path, confidence=40)
+        return _summarize(detections)
             
     # Handling potential errors (like API limits or network issues)
     except Exception as e:
@@ -63,13 +88,14 @@ def run_ai_detection(image_path):
             "confidence": 0.0
         }
 
-ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
-cipher_suite = Fernet(ENCRYPTION_KEY.encode()) if ENCRYPTION_KEY else None
-
-def decrypt_data(data_hex: str) -> str:
-    """Safe Decryption for the Officer Dashboards"""
-    try:
-        if not cipher_suite: return data_hex
-        return cipher_suite.decrypt(data_hex.encode()).decode()
-    except Exception:
-        return data_hex # Fallback for unencrypted seed data
\ No newline at end of file
+def run_ai_detection_batch(image_paths, max_workers=DETECTION_CONCURRENCY):
+    """
+    Scans a group of queued images concurrently on a bounded pool.
+    Results are returned in the same order as image_paths; duplicates are scanned once.
+    """
+    unique_paths = list(dict.fromkeys(image_paths))
+    if not unique_paths:
+        return []
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(unique_paths))) as pool:
+        results = dict(zip(unique_paths, pool.map(run_ai_detection, unique_paths)))
+    return [results[p] for p in image_paths]
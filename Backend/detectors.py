@@ -0,0 +1,178 @@
+# detectors.py
+# --- PLUGGABLE DETECTOR BACKENDS ---
+# Every backend answers predict(image_path, confidence) with Roboflow-style predictions:
+#   [{"class": "pothole", "confidence": 0.91, "x": ..., "y": ..., "width": ..., "height": ...}]
+# DETECTOR_BACKEND selects one:
+#   roboflow (default) - cloud model over HTTP
+#   onnx               - exported YOLO weights, in-process CPU inference via ONNX Runtime
+#   opencv             - same weights through OpenCV DNN (no onnxruntime needed)
+#   stub               - offline fixture model for benchmarks / tests
+# A local backend that cannot load (missing weights or runtime) falls back to Roboflow.
+import os
+import json
+import time
+import threading
+
+DETECTOR_WEIGHTS = os.getenv("DETECTOR_WEIGHTS", "models/nivaran-yolo11.onnx")
+DETECTOR_LABELS = os.getenv("DETECTOR_LABELS", "pothole")      # comma list or path to a labels file
+DETECTOR_INPUT_SIZE = int(os.getenv("DETECTOR_INPUT_SIZE", 640))
+DETECTOR_THREADS = int(os.getenv("DETECTOR_THREADS", os.cpu_count() or 1))
+DETECTOR_WARMUP_RUNS = int(os.getenv("DETECTOR_WARMUP_RUNS", 1))
+
+
+class Detector:
+    """Base interface. confidence is a percentage, matching Roboflow's predict()."""
+
+    name = "base"
+
+    def predict(self, image_path, confidence=40):
+        raise NotImplementedError
+
+    def warmup(self):
+        pass
+
+
+class RoboflowDetector(Detector):
+    name = "roboflow"
+
+    def __init__(self):
+        from roboflow import Roboflow
+        # Private API Key from the Roboflow 'Deploy' tab
+        rf = Roboflow(api_key=os.getenv("ROBOFLOW_API_KEY"))
+        project = rf.workspace().project(os.getenv("ROBOFLOW_PROJECT"))
+        self.model = project.version(int(os.getenv("ROBOFLOW_VERSION", 1))).model
+
+    def predict(self, image_path, confidence=40):
+        return self.model.predict(image_path, confidence=confidence).json().get('predictions', [])
+
+
+class StubDetector(Detector):
+    """
+    Offline stand-in. Predictions come from DETECTOR_FIXTURE (JSON: {filename: [predictions]})
+    or a default pothole; DETECTOR_STUB_LATENCY_MS simulates the cloud round-trip.
+    """
+
+    name = "stub"
+
+    def __init__(self, fixture_path=None, latency_ms=0.0):
+        self.latency = latency_ms / 1000.0
+        self.fixtures = {}
+        if fixture_path:
+            with open(fixture_path) as f:
+                self.fixtures = json.load(f)
+
+    def predict(self, image_path, confidence=40):
+        if self.latency:
+            time.sleep(self.latency)
+        default = [{"class": "pothole", "confidence": 0.87}]
+        predictions = self.fixtures.get(os.path.basename(image_path), default)
+        return [p for p in predictions if p["confidence"] * 100 >= confidence]
+
+
+class LocalDetector(Detector):
+    """
+    In-process CPU inference over exported YOLO (v8/v11) ONNX weights.
+    Weights are loaded once; the raw head (1, 4 + classes, anchors) is decoded here.
+    Only the top detection is consumed downstream, so overlapping boxes are not NMS-filtered.
+    """
+
+    def __init__(self, engine="onnx", weights=DETECTOR_WEIGHTS, labels=DETECTOR_LABELS,
+                 input_size=DETECTOR_INPUT_SIZE, threads=DETECTOR_THREADS):
+        import numpy as np
+        self.np = np
+        self.name = engine
+        self.size = input_size
+        self.labels = self._load_labels(labels)
+        if not os.path.exists(weights):
+            raise FileNotFoundError(f"Detector weights not found: {weights}")
+
+        if engine == "onnx":
+            import onnxruntime as ort
+            opts = ort.SessionOptions()
+            opts.intra_op_num_threads = threads
+            opts.inter_op_num_threads = 1
+            self.session = ort.InferenceSession(weights, opts, providers=["CPUExecutionProvider"])
+            self.input_name = self.session.get_inputs()[0].name
+            self._lock = None  # InferenceSession.run is thread-safe
+        else:
+            import cv2
+            cv2.setNumThreads(threads)
+            self.net = cv2.dnn.readNetFromONNX(weights)
+            self._lock = threading.Lock()  # cv2.dnn.Net is not
+
+    @staticmethod
+    def _load_labels(labels):
+        if os.path.isfile(labels):
+            with open(labels) as f:
+                return [line.strip() for line in f if line.strip()]
+        return [l.strip() for l in labels.split(",") if l.strip()]
+
+    def _preprocess(self, image_path):
+        np = self.np
+        try:
+            from PIL import Image
+            with Image.open(image_path) as img:
+                rgb = img.convert("RGB")
+                width, height = rgb.size
+                pixels = np.asarray(rgb.resize((self.size, self.size)), dtype=np.float32)
+        except ImportError:
+            import cv2
+            bgr = cv2.imread(image_path)
+            if bgr is None:
+                raise ValueError(f"Unreadable image: {image_path}")
+            height, width = bgr.shape[:2]
+            pixels = cv2.resize(cv2.cvtColor(bgr, cv2.COLOR_BGR2RGB), (self.size, self.size)).astype(np.float32)
+        tensor = (pixels / 255.0).transpose(2, 0, 1)[np.newaxis]   # HWC -> NCHW
+        return np.ascontiguousarray(tensor), width, height
+
+    def _infer(self, tensor):
+        if self._lock is None:
+            return self.session.run(None, {self.input_name: tensor})[0]
+        with self._lock:
+            self.net.setInput(tensor)
+            return self.net.forward()
+
+    def predict(self, image_path, confidence=40):
+        np = self.np
+        tensor, width, height = self._preprocess(image_path)
+        out = self._infer(tensor)[0]                 # (4 + classes, anchors)
+        if out.shape[0] > out.shape[1]:
+            out = out.T
+        boxes, scores = out[:4], out[4:]
+        class_ids = scores.argmax(axis=0)
+        confs = scores.max(axis=0)
+        keep = np.nonzero(confs >= confidence / 100.0)[0]
+
+        sx, sy = width / self.size, height / self.size
+        predictions = []
+        for i in keep[np.argsort(-confs[keep])]:
+            cx, cy, w, h = boxes[:, i]
+            cls = int(class_ids[i])
+            predictions.append({
+                "class": self.labels[cls] if cls < len(self.labels) else str(cls),
+                "confidence": round(float(confs[i]), 4),
+                "x": float(cx * sx), "y": float(cy * sy),
+                "width": float(w * sx), "height": float(h * sy)
+            })
+        return predictions
+
+    def warmup(self, runs=DETECTOR_WARMUP_RUNS):
+        """First runs allocate arenas / pick kernels; pay that cost at startup, not per request."""
+        dummy = self.np.zeros((1, 3, self.size, self.size), dtype=self.np.float32)
+        for _ in range(runs):
+            self._infer(dummy)
+
+
+def build_detector(backend=None):
+    """Factory used by detective.py. Local backends fall back to Roboflow if they cannot load."""
+    backend = (backend or os.getenv("DETECTOR_BACKEND", "roboflow")).lower()
+    if backend == "stub":
+        return StubDetector(os.getenv("DETECTOR_FIXTURE"), float(os.getenv("DETECTOR_STUB_LATENCY_MS", 0)))
+    if backend in ("onnx", "opencv"):
+        try:
+            detector = LocalDetector(engine=backend)
+            detector.warmup()
+            return detector
+        except Exception as e:
+            print(f"Local Detector Error ({backend}): {e}. Falling back to Roboflow cloud.")
+    return RoboflowDetector()
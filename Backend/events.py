@@ -0,0 +1,244 @@
+# events.py
+# --- COMPLAINT LIFECYCLE EVENTS (Server-Sent Events) ---
+# Desk dashboards polled inbox / dashboard-stats / get-heatmap on timers; most polls
+# returned unchanged data. They now subscribe to GET /api/v1/desk/events instead:
+#   - complaint_events (grievance.db) is an outbox: run_task_back, issue_job_card and
+#     resolve_grievance call record_event() in the same transaction as the status change,
+#     so triage_worker.py processes publish too (the table is the multi-worker broker)
+#   - each API process runs one relay task: it reads the outbox past its last id
+#     (EVENTS_POLL_SECONDS, or at once after a local write) and fans out in-process;
+#     it also hands every batch to an on_events hook (takeimage.py keeps the in-memory
+#     hotspot engine in step with writes made by other processes)
+#   - EventHub: subscribers indexed by ward ('*' = every ward), filtered by domain;
+#     each event is serialized once; a slow client's bounded queue overflows into a
+#     "resync" event (refetch) instead of growing
+#   - Last-Event-ID replays missed events from the outbox (kept EVENTS_RETENTION_SECONDS)
+#   - system events (complaint_id 0, e.g. "rescored" after bulk re-scoring) concern every
+#     complaint: subscribers get "resync", the on_events hook reloads its state
+import os
+import json
+import time
+import asyncio
+
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", 0.5))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 256))
+EVENTS_RETENTION_SECONDS = int(os.getenv("EVENTS_RETENTION_SECONDS", 3600))
+EVENTS_HEARTBEAT_SECONDS = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", 15))
+EVENTS_BATCH = 500
+ALL_WARDS = "*"
+RESYNC = (None, None)  # Queue sentinel: events were dropped, the client must refetch
+SYSTEM_EVENT = 0       # complaint_id of events about the whole table
+
+# No PII: subscribers are unauthenticated desk dashboards (like the inbox)
+EVENT_COLUMNS = ("id", "complaint_id", "type", "ward_zone", "category_code", "ai_category",
+                 "status", "priority", "ai_score", "created_at")
+
+
+def init_event_outbox(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS complaint_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            complaint_id INTEGER NOT NULL,
+            type TEXT NOT NULL,
+            ward_zone TEXT,
+            category_code TEXT,
+            ai_category TEXT,
+            status TEXT,
+            priority TEXT,
+            ai_score REAL,
+            created_at REAL NOT NULL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaint_events_created ON complaint_events(created_at)')
+
+
+def record_event(cursor, complaint_id, event_type):
+    """Snapshots the complaint after a status change; call inside the write's transaction."""
+    cursor.execute('''
+        INSERT INTO complaint_events
+            (complaint_id, type, ward_zone, category_code, ai_category, status, priority, ai_score, created_at)
+        SELECT id, ?, ward_zone, category_code, ai_category, status, priority, ai_score, ?
+        FROM complaints WHERE id = ?
+    ''', (event_type, time.time(), complaint_id))
+
+
+def record_system_event(cursor, event_type):
+    """An event about every complaint (bulk re-scoring); call inside the write's transaction."""
+    cursor.execute(
+        "INSERT INTO complaint_events (complaint_id, type, created_at) VALUES (?, ?, ?)",
+        (SYSTEM_EVENT, event_type, time.time())
+    )
+
+
+def events_since(conn, last_id, limit=EVENTS_BATCH):
+    rows = conn.execute(
+        f"SELECT {', '.join(EVENT_COLUMNS)} FROM complaint_events WHERE id > ? ORDER BY id LIMIT ?",
+        (last_id, limit)
+    ).fetchall()
+    return [dict(zip(EVENT_COLUMNS, row)) for row in rows]
+
+
+def latest_event_id(conn):
+    return conn.execute("SELECT COALESCE(MAX(id), 0) FROM complaint_events").fetchone()[0]
+
+
+def prune_events(conn):
+    conn.execute("DELETE FROM complaint_events WHERE created_at < ?", (time.time() - EVENTS_RETENTION_SECONDS,))
+
+
+def format_sse(event_id, event_type, data):
+    return f"id: {event_id}\nevent: {event_type}\ndata: {data}\n\n"
+
+
+class Subscription:
+    """One connected client: ward (or '*'), optional domain filter, bounded queue."""
+
+    def __init__(self, ward, code=None, term=None):
+        self.ward = ward or ALL_WARDS
+        self.code = code                          # Exact category_code match (indexed domains)
+        self.term = term.lower() if term else None  # Substring match, like the LIKE fallback
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+        self.lagged = False
+
+    def matches(self, event):
+        if self.ward != ALL_WARDS and event["ward_zone"] != self.ward:
+            return False
+        if self.code:
+            return event["category_code"] == self.code
+        if self.term:
+            return self.term in (event["ai_category"] or "").lower()
+        return True
+
+    def push(self, event_id, message):
+        try:
+            self.queue.put_nowait((event_id, message))
+        except asyncio.QueueFull:
+            # Too slow to keep up: drop the backlog, tell the client to refetch
+            self.lagged = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+
+class EventHub:
+    """In-process fan-out; only touched from the event loop, so no locks."""
+
+    def __init__(self):
+        self._by_ward = {}        # ward -> set of Subscription
+        self._wake = None
+        self._loop = None
+        self.last_id = 0
+        self.published = self.dropped = 0
+
+    def subscribe(self, ward, code=None, term=None):
+        sub = Subscription(ward, code, term)
+        self._by_ward.setdefault(sub.ward, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub):
+        subs = self._by_ward.get(sub.ward)
+        if subs:
+            subs.discard(sub)
+            if not subs:
+                del self._by_ward[sub.ward]
+
+    def publish(self, event):
+        """Delivers one outbox row to the subscribers of its ward and of '*'."""
+        if event["complaint_id"] == SYSTEM_EVENT:
+            for subs in self._by_ward.values():
+                for sub in subs:
+                    if not sub.lagged:
+                        sub.push(event["id"], None)  # Everything may have changed: refetch
+            self.published += 1
+            return
+        message = None
+        for ward in (event["ward_zone"], ALL_WARDS):
+            for sub in self._by_ward.get(ward, ()):
+                if sub.matches(event):
+                    if message is None:
+                        message = format_sse(event["id"], event["type"], json.dumps(event))
+                    if sub.lagged:
+                        self.dropped += 1
+                        continue
+                    sub.push(event["id"], message)
+        self.published += 1
+
+    def poke(self):
+        """A local write just committed an event: relay it now instead of at the next poll.
+        Safe from any thread; a no-op where no relay runs (triage_worker.py processes)."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    async def relay(self, run, path, on_events=None, since=None):
+        """
+        Outbox -> subscribers (and `await on_events(events)`), forever (cancel to stop).
+        `run` is db.run; the relay starts after event id `since`, by default at the current
+        end of the outbox (history is served through Last-Event-ID).
+        """
+        self._wake = asyncio.Event()
+        self._loop = asyncio.get_running_loop()
+        self.last_id = since if since is not None else await run(path, latest_event_id)
+        last_prune = time.monotonic()
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), EVENTS_POLL_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                if self._by_ward or on_events:
+                    events = await run(path, events_since, self.last_id)
+                    while events:
+                        if self._by_ward:
+                            for event in events:
+                                self.publish(event)
+                        if on_events:
+                            await on_events(events)
+                        self.last_id = events[-1]["id"]
+                        events = await run(path, events_since, self.last_id) if len(events) == EVENTS_BATCH else []
+                else:
+                    # Nobody listening: just keep up with the outbox
+                    self.last_id = await run(path, latest_event_id)
+                if time.monotonic() - last_prune > 60:
+                    last_prune = time.monotonic()
+                    await run(path, prune_events)
+            except Exception as e:
+                print(f"Event Relay Error: {e}")
+
+    async def stream(self, sub, replay=()):
+        """
+        SSE body for one subscription: replayed events, then live ones, with heartbeats.
+        Unsubscribes when the client goes away (the generator is closed / cancelled).
+        """
+        try:
+            replayed = 0
+            for event in replay:
+                if event["complaint_id"] == SYSTEM_EVENT:
+                    replayed = event["id"]
+                    yield format_sse(event["id"], "resync", "{}")
+                elif sub.matches(event):
+                    replayed = event["id"]
+                    yield format_sse(event["id"], event["type"], json.dumps(event))
+            while True:
+                try:
+                    event_id, message = await asyncio.wait_for(sub.queue.get(), EVENTS_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"  # Keeps proxies from closing an idle stream
+                    continue
+                if message is None:
+                    sub.lagged = False
+                    yield format_sse(self.last_id, "resync", "{}")
+                elif event_id > replayed:  # Relayed while the replay was being read
+                    yield message
+        finally:
+            self.unsubscribe(sub)
+
+    def stats(self):
+        return {
+            "subscribers": sum(len(subs) for subs in self._by_ward.values()),
+            "wards": len(self._by_ward), "last_id": self.last_id,
+            "published": self.published, "dropped": self.dropped,
+        }
+
+
+event_hub = EventHub()
@@ -0,0 +1,93 @@
+# heatmap_cache.py
+# --- HEATMAP RESPONSE CACHE (version-invalidated) ---
+# Every dashboard poll re-ran the viewport SQL + get_clusters even when nothing had changed.
+#   - heatmap_versions (grievance.db): one counter per ward plus '*' for city-wide maps,
+#     bumped in the same transaction as every write that moves a heatmap point
+#     (run_task_back, resolve_grievance, issue_job_card, re-scoring). Being in the DB,
+#     bumps from triage_worker.py processes invalidate the API's cache too.
+#   - HeatmapCache: LRU of cluster lists keyed by (ward, category, viewport), bounded by
+#     HEATMAP_CACHE_MB; an entry is valid only for the version it was computed at
+#   - the version doubles as the ETag, so an unchanged map costs one PK read + a 304
+import os
+import json
+import threading
+from collections import OrderedDict
+
+HEATMAP_CACHE_MB = float(os.getenv("HEATMAP_CACHE_MB", 32))
+ALL_WARDS = "*"
+
+
+def init_heatmap_versions(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS heatmap_versions (
+            ward_zone TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+
+
+def bump_version(cursor, ward):
+    """Invalidates the cached maps of `ward` and the city-wide ones; call inside the write's transaction."""
+    cursor.executemany('''
+        INSERT INTO heatmap_versions (ward_zone, version) VALUES (?, 1)
+        ON CONFLICT (ward_zone) DO UPDATE SET version = version + 1
+    ''', [(ward,), (ALL_WARDS,)] if ward and ward != ALL_WARDS else [(ALL_WARDS,)])
+
+
+def bump_for_complaint(cursor, complaint_id):
+    row = cursor.execute("SELECT ward_zone FROM complaints WHERE id = ?", (complaint_id,)).fetchone()
+    bump_version(cursor, row[0] if row else None)
+
+
+def bump_all(cursor):
+    """Bulk changes (re-scoring): every cached map is stale."""
+    cursor.execute("UPDATE heatmap_versions SET version = version + 1")
+    bump_version(cursor, None)
+
+
+def current_version(conn, ward=None):
+    row = conn.execute("SELECT version FROM heatmap_versions WHERE ward_zone = ?", (ward or ALL_WARDS,)).fetchone()
+    return row[0] if row else 0
+
+
+class HeatmapCache:
+    """Thread-safe LRU with a byte budget (entry size = its JSON length)."""
+
+    def __init__(self, max_bytes=int(HEATMAP_CACHE_MB * 1024 * 1024)):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()   # key -> (version, clusters, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get(self, key, version):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, clusters):
+        size = len(json.dumps(clusters))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old:
+                self._bytes -= old[2]
+            self._entries[key] = (version, clusters, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes,
+                    "hits": self.hits, "misses": self.misses}
+
+
+heatmap_cache = HeatmapCache()
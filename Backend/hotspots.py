@@ -0,0 +1,244 @@
+# hotspots.py
+# --- INCREMENTAL HOTSPOT ENGINE ---
+# DBSCAN with min_samples=1 is exactly "connected components of the eps-neighbour graph".
+# Instead of refitting DBSCAN over the whole city on every /get-heatmap call, this engine
+# keeps those components alive per (ward, category) shard and patches them locally:
+#   - add():    a verified complaint joins / merges the clusters within eps of it
+#   - remove(): a resolved complaint leaves its cluster, which is re-split locally if needed
+#   - apply():  current rows of complaints changed elsewhere (outbox events relayed from
+#     triage_worker.py processes / other API workers): each is added or removed by status
+# The heatmap then just reads the precomputed cluster aggregates in O(clusters).
+# Every point lives in two shards, like the SQL path clusters: its (ward, category) shard
+# for ward-filtered maps, and a city-wide (category) shard for the all-wards map, where
+# complaints on either side of a ward boundary still merge.
+# Neighbourhoods follow Clustering.get_clusters: eps=0.001 degrees on raw lat/lon, or
+# CLUSTER_EPS_METERS on the sphere (points are gridded as unit vectors; the chord length
+# grows monotonically with great-circle distance, so the eps test stays exact).
+import math
+import threading
+from itertools import product
+from collections import deque
+
+from Clustering import severity_color, CLUSTER_EPS_METERS, EARTH_RADIUS_M
+
+# Statuses that put a complaint on the heatmap
+HOTSPOT_STATUSES = ("verified", "assigned", "escalated")
+_CITY_WIDE = object()  # Shard "ward" of the all-wards shards
+
+
+class _Cluster:
+    __slots__ = ("members", "sum_lat", "sum_lon", "max_severity")
+
+    def __init__(self):
+        self.members = set()
+        self.sum_lat = 0.0
+        self.sum_lon = 0.0
+        self.max_severity = 0.0
+
+
+def _degrees(lat, lon):
+    """Legacy degree mode: Euclidean distance on raw (lat, lon)."""
+    return (lat, lon)
+
+
+def _unit_vector(lat, lon):
+    """Metres mode: the point on the unit sphere."""
+    phi, lam = math.radians(lat), math.radians(lon)
+    return (math.cos(phi) * math.cos(lam), math.cos(phi) * math.sin(lam), math.sin(phi))
+
+
+class _Shard:
+    """All live points + clusters of a single (ward, category) pair."""
+
+    def __init__(self, eps, project=_degrees):
+        self.eps = eps            # In the units of project(): degrees, or chord length
+        self.eps_sq = eps * eps
+        self.project = project
+        self._offsets = list(product((-1, 0, 1), repeat=len(project(0.0, 0.0))))
+        self.points = {}      # complaint_id -> (lat, lon, severity)
+        self.coords = {}      # complaint_id -> project(lat, lon)
+        self.grid = {}        # grid cell -> set(complaint_id)
+        self.label = {}       # complaint_id -> cluster_id
+        self.clusters = {}    # cluster_id -> _Cluster
+        self._next_label = 0
+
+    # --- GRID HELPERS (cell size == eps, so neighbours live in the 3x3 (x3) block) ---
+    def _cell(self, coords):
+        return tuple(math.floor(c / self.eps) for c in coords)
+
+    def _neighbours(self, coords):
+        cell = self._cell(coords)
+        for offset in self._offsets:
+            for pid in self.grid.get(tuple(c + o for c, o in zip(cell, offset)), ()):
+                if sum((a - b) ** 2 for a, b in zip(self.coords[pid], coords)) <= self.eps_sq:
+                    yield pid
+
+    def _new_cluster(self):
+        self._next_label += 1
+        cluster = _Cluster()
+        self.clusters[self._next_label] = cluster
+        return self._next_label, cluster
+
+    def _attach(self, pid, label, cluster):
+        lat, lon, severity = self.points[pid]
+        cluster.members.add(pid)
+        cluster.sum_lat += lat
+        cluster.sum_lon += lon
+        cluster.max_severity = max(cluster.max_severity, severity)
+        self.label[pid] = label
+
+    # --- MUTATIONS ---
+    def add(self, pid, lat, lon, severity):
+        coords = self.project(lat, lon)
+        touching = {self.label[n] for n in self._neighbours(coords)}
+        self.points[pid] = (lat, lon, severity)
+        self.coords[pid] = coords
+        self.grid.setdefault(self._cell(coords), set()).add(pid)
+
+        if not touching:
+            label, cluster = self._new_cluster()
+        else:
+            # Merge every touched cluster into the largest one (union by size)
+            label = max(touching, key=lambda l: len(self.clusters[l].members))
+            cluster = self.clusters[label]
+            for other in touching - {label}:
+                absorbed = self.clusters.pop(other)
+                for member in absorbed.members:
+                    self.label[member] = label
+                cluster.members |= absorbed.members
+                cluster.sum_lat += absorbed.sum_lat
+                cluster.sum_lon += absorbed.sum_lon
+                cluster.max_severity = max(cluster.max_severity, absorbed.max_severity)
+        self._attach(pid, label, cluster)
+
+    def remove(self, pid):
+        del self.points[pid]
+        cell = self._cell(self.coords.pop(pid))
+        self.grid[cell].discard(pid)
+        if not self.grid[cell]:
+            del self.grid[cell]
+
+        label = self.label.pop(pid)
+        remaining = self.clusters.pop(label).members - {pid}
+
+        # Local split: flood-fill only the members of the affected cluster
+        while remaining:
+            seed = remaining.pop()
+            new_label, cluster = self._new_cluster()
+            self._attach(seed, new_label, cluster)
+            frontier = deque([seed])
+            while frontier:
+                for n in self._neighbours(self.coords[frontier.popleft()]):
+                    if n in remaining:
+                        remaining.discard(n)
+                        self._attach(n, new_label, cluster)
+                        frontier.append(n)
+
+    def snapshot(self):
+        out = []
+        for cluster in self.clusters.values():
+            count = len(cluster.members)
+            out.append({
+                "lat": cluster.sum_lat / count,
+                "lon": cluster.sum_lon / count,
+                "severity": cluster.max_severity,
+                "count": count,
+                "color": severity_color(cluster.max_severity)
+            })
+        return out
+
+
+class HotspotEngine:
+    """Thread-safe registry of hotspot shards keyed by (ward, category), plus city-wide ones."""
+
+    def __init__(self, eps: float = 0.001, eps_meters: float = None):
+        if eps_meters:
+            # Great-circle radius -> chord length between unit vectors
+            self.eps, self._project = 2 * math.sin(eps_meters / EARTH_RADIUS_M / 2), _unit_vector
+        else:
+            self.eps, self._project = eps, _degrees
+        self.eps_meters = eps_meters
+        self._lock = threading.RLock()
+        self._shards = {}     # (ward or _CITY_WIDE, category) -> _Shard
+        self._where = {}      # complaint_id -> (ward, category)
+        self.loaded = False
+        self.generation = 0   # Bumped on every change: part of the heatmap cache version
+
+    def load(self, rows):
+        """Bulk warm-up from (id, ward_zone, ai_category, latitude, longitude, ai_score) rows."""
+        with self._lock:
+            self._shards.clear()
+            self._where.clear()
+            for row in rows:
+                self.add(*row)
+            self.loaded = True
+            self.generation += 1
+
+    def add(self, complaint_id, ward, category, lat, lon, severity):
+        if lat is None or lon is None:
+            self.remove(complaint_id)  # Nothing to plot
+            return
+        severity = severity or 0.0
+        key = (ward, category)
+        with self._lock:
+            if complaint_id in self._where:
+                if self._where[complaint_id] == key and self._shards[key].points[complaint_id] == (lat, lon, severity):
+                    return  # Already there (e.g. the relay echoing this process's own write)
+                self.remove(complaint_id)
+            for shard_key in (key, (_CITY_WIDE, category)):
+                shard = self._shards.get(shard_key)
+                if shard is None:
+                    shard = self._shards[shard_key] = _Shard(self.eps, self._project)
+                shard.add(complaint_id, lat, lon, severity)
+            self._where[complaint_id] = key
+            self.generation += 1
+
+    def remove(self, complaint_id):
+        with self._lock:
+            key = self._where.pop(complaint_id, None)
+            if key is None:
+                return
+            for shard_key in (key, (_CITY_WIDE, key[1])):
+                shard = self._shards[shard_key]
+                shard.remove(complaint_id)
+                if not shard.points:
+                    del self._shards[shard_key]
+            self.generation += 1
+
+    def apply(self, complaint_ids, rows):
+        """
+        Syncs complaint_ids to their current (id, status, ward_zone, ai_category, latitude,
+        longitude, ai_score) rows; ids without a row (deleted) leave the map.
+        """
+        with self._lock:
+            seen = set()
+            for complaint_id, status, *point in rows:
+                seen.add(complaint_id)
+                if status in HOTSPOT_STATUSES:
+                    self.add(complaint_id, *point)
+                else:
+                    self.remove(complaint_id)
+            for complaint_id in set(complaint_ids) - seen:
+                self.remove(complaint_id)
+
+    def clusters(self, ward=None, category_like=None):
+        """
+        Precomputed clusters for the heatmap: one ward's, or city-wide (across wards) when
+        ward is None. category_like mirrors the SQL 'ai_category LIKE %term%' filter
+        (case-insensitive substring).
+        """
+        needle = category_like.lower() if category_like else None
+        wanted = ward if ward else _CITY_WIDE
+        out = []
+        with self._lock:
+            for (shard_ward, shard_category), shard in self._shards.items():
+                if shard_ward != wanted:
+                    continue
+                if needle and needle not in (shard_category or "").lower():
+                    continue
+                out.extend(shard.snapshot())
+        return out
+
+
+# Shared process-wide engine (same neighbourhood as Clustering.get_clusters)
+hotspot_engine = HotspotEngine(eps=0.001, eps_meters=CLUSTER_EPS_METERS)
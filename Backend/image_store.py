@@ -0,0 +1,123 @@
+# image_store.py
+# --- CONTENT-ADDRESSED UPLOAD STORE + PERCEPTUAL DEDUP CACHE ---
+# Uploads used to land in uploads/{file.filename}: same-named photos overwrote each other,
+# and every forwarded copy of a viral photo was re-sent to the detector.
+#   - Files are stored once under uploads/cas/<sha[:2]>/<sha256><ext>
+#   - image_index keeps the SHA-256, a 64-bit dHash and the last detection result
+#   - Near-duplicates (re-compressed / resized forwards) are found through 4 x 16-bit
+#     dHash bands: any hash within DHASH_MAX_DISTANCE bits shares at least one band exactly
+#     (pigeonhole), so the lookup is an indexed equality query, not a scan.
+import os
+import json
+import hashlib
+
+UPLOAD_STORE_DIR = os.getenv("UPLOAD_STORE_DIR", "uploads/cas")
+DHASH_MAX_DISTANCE = min(int(os.getenv("DHASH_MAX_DISTANCE", 3)), 3)  # 4 bands -> exact up to 3 bits
+
+try:
+    from PIL import Image  # Optional: without Pillow only exact (SHA-256) duplicates are caught
+except ImportError:
+    Image = None
+
+
+def init_image_index(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS image_index (
+            sha256 TEXT PRIMARY KEY,
+            path TEXT UNIQUE,
+            dhash INTEGER,
+            band0 INTEGER, band1 INTEGER, band2 INTEGER, band3 INTEGER,
+            ai_result TEXT,
+            uploads INTEGER DEFAULT 1,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for band in range(4):
+        cursor.execute(f'CREATE INDEX IF NOT EXISTS idx_image_index_band{band} ON image_index(band{band})')
+
+
+def dhash(path, size=8):
+    """64-bit difference hash: brightness gradient of a 9x8 grayscale thumbnail."""
+    if Image is None:
+        return None
+    try:
+        with Image.open(path) as img:
+            pixels = list(img.convert("L").resize((size + 1, size)).getdata())
+    except Exception:
+        return None  # Formats Pillow cannot decode (e.g. .avif without plugin)
+    value = 0
+    for row in range(size):
+        for col in range(size):
+            left = pixels[row * (size + 1) + col]
+            right = pixels[row * (size + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+def _bands(value):
+    return [(value >> (16 * i)) & 0xFFFF for i in range(4)]
+
+
+def _to_signed(value):
+    # SQLite INTEGER is signed 64-bit
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def store_upload(cursor, content: bytes, filename: str):
+    """
+    Writes the upload once (content-addressed) and indexes it.
+    Returns the stored path; an identical earlier upload returns the existing path.
+    """
+    sha = hashlib.sha256(content).hexdigest()
+    row = cursor.execute("SELECT path FROM image_index WHERE sha256 = ?", (sha,)).fetchone()
+    if row and os.path.exists(row[0]):
+        cursor.execute("UPDATE image_index SET uploads = uploads + 1 WHERE sha256 = ?", (sha,))
+        return row[0]
+
+    ext = os.path.splitext(filename or "")[1].lower() or ".jpg"
+    folder = os.path.join(UPLOAD_STORE_DIR, sha[:2])
+    os.makedirs(folder, exist_ok=True)
+    path = f"{folder}/{sha}{ext}"
+    with open(path, "wb") as f:
+        f.write(content)
+
+    value = dhash(path)
+    bands = _bands(value) if value is not None else [None] * 4
+    cursor.execute('''
+        INSERT OR REPLACE INTO image_index (sha256, path, dhash, band0, band1, band2, band3)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', (sha, path, _to_signed(value) if value is not None else None, *bands))
+    return path
+
+
+def cached_detection(conn, image_path):
+    """Prior run_ai_detection result for this exact image or a perceptual near-duplicate."""
+    row = conn.execute("SELECT ai_result, dhash, sha256 FROM image_index WHERE path = ?", (image_path,)).fetchone()
+    if not row:
+        return None
+    ai_result, value, sha = row
+    if ai_result:
+        return json.loads(ai_result)
+    if value is None:
+        return None
+
+    value &= (1 << 64) - 1
+    bands = _bands(value)
+    candidates = conn.execute('''
+        SELECT dhash, ai_result FROM image_index
+        WHERE ai_result IS NOT NULL AND sha256 != ?
+        AND (band0 = ? OR band1 = ? OR band2 = ? OR band3 = ?)
+    ''', (sha, *bands)).fetchall()
+    best = None
+    for other, result in candidates:
+        distance = bin(value ^ (other & ((1 << 64) - 1))).count("1")
+        if distance <= DHASH_MAX_DISTANCE and (best is None or distance < best[0]):
+            best = (distance, result)
+    return json.loads(best[1]) if best else None
+
+
+def remember_detection(conn, image_path, ai_result):
+    """Caches a detector verdict; transient 'error' results are never cached."""
+    if ai_result.get("label") == "error":
+        return
+    conn.execute("UPDATE image_index SET ai_result = ? WHERE path = ?", (json.dumps(ai_result), image_path))
@@ -0,0 +1,170 @@
+# job_queue.py
+# --- DURABLE TRIAGE JOB QUEUE (SQLite, grievance.db) ---
+# A FastAPI BackgroundTask dies with the process, leaving the complaint 'pending' forever.
+# Jobs now live in the triage_jobs table with claim / lease / retry semantics:
+#   queued --claim--> leased --complete--> done
+#                       |--fail--> queued (exponential backoff) ... --> dead (max attempts)
+# A lease that expires (crashed worker) makes the job claimable again.
+# Dead jobs leave their complaint 'pending': they are listed by dead_jobs() (admin endpoint,
+# triage-metrics) and put back on the queue with requeue_dead() once the cause is fixed.
+import os
+import time
+import sqlite3
+
+from db import configure  # Shared PRAGMAs
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")
+LEASE_SECONDS = int(os.getenv("TRIAGE_LEASE_SECONDS", 300))
+MAX_ATTEMPTS = int(os.getenv("TRIAGE_MAX_ATTEMPTS", 5))
+RETRY_BASE_SECONDS = int(os.getenv("TRIAGE_RETRY_BASE_SECONDS", 10))
+DEAD = "dead"  # fail() outcome once MAX_ATTEMPTS is reached (None means success elsewhere)
+
+
+def connect():
+    """Queue connection: autocommit so claim() can take an explicit IMMEDIATE write lock."""
+    conn = sqlite3.connect(DATABASE_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return configure(conn)
+
+
+def init_job_queue(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS triage_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            complaint_id INTEGER UNIQUE,
+            state TEXT DEFAULT 'queued',
+            attempts INTEGER DEFAULT 0,
+            available_at REAL,
+            lease_owner TEXT,
+            lease_expires_at REAL,
+            last_error TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_triage_jobs_state ON triage_jobs(state, available_at)')
+
+
+def enqueue(cursor, complaint_id: int):
+    """Called inside the same transaction that inserts the pending complaint."""
+    cursor.execute(
+        "INSERT OR IGNORE INTO triage_jobs (complaint_id, state, available_at) VALUES (?, 'queued', ?)",
+        (complaint_id, time.time())
+    )
+    row = cursor.execute("SELECT id FROM triage_jobs WHERE complaint_id = ?", (complaint_id,)).fetchone()
+    return row[0]
+
+
+def claim(conn, owner: str, limit: int = 1, job_id: int = None):
+    """
+    Atomically leases up to `limit` runnable jobs (or one specific job) to `owner`.
+    Runnable = queued and due, or leased with an expired lease.
+    """
+    now = time.time()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        query = '''
+            SELECT id FROM triage_jobs
+            WHERE ((state = 'queued' AND available_at <= ?)
+                OR (state = 'leased' AND lease_expires_at < ?))
+        '''
+        params = [now, now]
+        if job_id is not None:
+            query += " AND id = ?"
+            params.append(job_id)
+        query += " ORDER BY id LIMIT ?"
+        params.append(limit)
+        ids = [r[0] for r in conn.execute(query, params).fetchall()]
+
+        jobs = []
+        for jid in ids:
+            conn.execute('''
+                UPDATE triage_jobs SET state = 'leased', lease_owner = ?,
+                lease_expires_at = ?, attempts = attempts + 1
+                WHERE id = ?
+            ''', (owner, now + LEASE_SECONDS, jid))
+            jobs.append(dict(conn.execute(
+                "SELECT id, complaint_id, attempts FROM triage_jobs WHERE id = ?", (jid,)
+            ).fetchone()))
+        conn.execute("COMMIT")
+        return jobs
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def complete(conn, job_id: int):
+    conn.execute(
+        "UPDATE triage_jobs SET state = 'done', lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+        (job_id,)
+    )
+
+
+def fail(conn, job_id: int, error: str):
+    """Requeues with exponential backoff; returns the retry delay, or DEAD once attempts run out."""
+    attempts = conn.execute("SELECT attempts FROM triage_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    if attempts >= MAX_ATTEMPTS:
+        conn.execute(
+            "UPDATE triage_jobs SET state = 'dead', last_error = ?, lease_owner = NULL, lease_expires_at = NULL WHERE id = ?",
+            (error, job_id)
+        )
+        return DEAD
+    delay = RETRY_BASE_SECONDS * (2 ** (attempts - 1))
+    conn.execute('''
+        UPDATE triage_jobs SET state = 'queued', available_at = ?, last_error = ?,
+        lease_owner = NULL, lease_expires_at = NULL WHERE id = ?
+    ''', (time.time() + delay, error, job_id))
+    return delay
+
+
+def recover(conn):
+    """
+    Startup recovery: every 'pending' complaint without a job (submitted before the queue
+    existed, or lost with a crashed BackgroundTask) is requeued. Expired leases are released.
+    """
+    now = time.time()
+    orphans = conn.execute('''
+        INSERT OR IGNORE INTO triage_jobs (complaint_id, state, available_at)
+        SELECT id, 'queued', ? FROM complaints WHERE status = 'pending'
+    ''', (now,)).rowcount
+    conn.execute('''
+        UPDATE triage_jobs SET state = 'queued', lease_owner = NULL, lease_expires_at = NULL
+        WHERE state = 'leased' AND lease_expires_at < ?
+    ''', (now,))
+    return orphans
+
+
+def dead_jobs(conn, limit=100):
+    """Jobs that ran out of attempts, newest first, with the error that killed them."""
+    return [dict(zip(("id", "complaint_id", "attempts", "last_error"), r)) for r in conn.execute(
+        "SELECT id, complaint_id, attempts, last_error FROM triage_jobs WHERE state = 'dead' ORDER BY id DESC LIMIT ?",
+        (limit,)
+    ).fetchall()]
+
+
+def requeue_dead(conn, job_ids=None):
+    """Dead jobs (all, or the given ids) get a fresh set of attempts; returns the requeued ids."""
+    if job_ids is not None and not job_ids:
+        return []
+    query = "SELECT id FROM triage_jobs WHERE state = 'dead'"
+    params = []
+    if job_ids is not None:
+        query += f" AND id IN ({','.join('?' * len(job_ids))})"
+        params = list(job_ids)
+    ids = [r[0] for r in conn.execute(query, params).fetchall()]
+    conn.executemany(
+        "UPDATE triage_jobs SET state = 'queued', attempts = 0, available_at = ? WHERE id = ? AND state = 'dead'",
+        [(time.time(), jid) for jid in ids]
+    )
+    return ids
+
+
+def runnable_job_ids(conn):
+    return [r[0] for r in conn.execute(
+        "SELECT id FROM triage_jobs WHERE state = 'queued' ORDER BY id"
+    ).fetchall()]
+
+
+def stats(conn):
+    return {state: count for state, count in conn.execute(
+        "SELECT state, COUNT(*) FROM triage_jobs GROUP BY state"
+    ).fetchall()}
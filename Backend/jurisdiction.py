@@ -0,0 +1,288 @@
+# jurisdiction.py
+# --- LOCAL JURISDICTION RESOLVER ---
+# Nominatim allows one request per second, so reverse-geocoding every triaged complaint
+# serialized the whole pipeline. Resolution order is now:
+#   1. Ward / suburb polygons (WARD_BOUNDARIES_PATH, GeoJSON) in a packed STR R-tree:
+#      bounding-box descent + ray casting, microseconds per point, no network
+#   2. Quantized lat/lon cache (GEOCODE_CACHE_DECIMALS, default 3 = ~110 m) kept in memory
+#      and in the geocode_cache table, in front of ...
+#   3. Nominatim, rate limited to one call per second across threads
+#   4. The citizen's own location text
+import os
+import json
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+
+from db import connect as db_connect  # Pooled SQLite Access
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")
+WARD_BOUNDARIES_PATH = os.getenv("WARD_BOUNDARIES_PATH", "data/wards.geojson")
+# Feature property holding the ward name (first one present wins)
+WARD_NAME_PROPERTIES = os.getenv("WARD_NAME_PROPERTIES", "ward,ward_name,name,suburb").split(",")
+GEOCODE_CACHE_DECIMALS = int(os.getenv("GEOCODE_CACHE_DECIMALS", 3))
+NOMINATIM_MIN_INTERVAL = float(os.getenv("NOMINATIM_MIN_INTERVAL", 1.0))
+STR_NODE_CAPACITY = 10
+
+
+# --- 1. GEOMETRY ---
+def _ring_contains(ring, x, y):
+    """Even-odd ray casting; ring is a list of [lon, lat] vertices."""
+    inside = False
+    j = len(ring) - 1
+    for i in range(len(ring)):
+        xi, yi = ring[i][0], ring[i][1]
+        xj, yj = ring[j][0], ring[j][1]
+        if (yi > y) != (yj > y) and x < (xj - xi) * (y - yi) / (yj - yi) + xi:
+            inside = not inside
+        j = i
+    return inside
+
+
+class _Polygon:
+    __slots__ = ("name", "rings", "bbox")
+
+    def __init__(self, name, rings):
+        self.name = name
+        self.rings = rings  # rings[0] = outer boundary, rest = holes
+        xs = [p[0] for p in rings[0]]
+        ys = [p[1] for p in rings[0]]
+        self.bbox = (min(xs), min(ys), max(xs), max(ys))
+
+    def contains(self, x, y):
+        if not _ring_contains(self.rings[0], x, y):
+            return False
+        return not any(_ring_contains(hole, x, y) for hole in self.rings[1:])
+
+
+# --- 2. SORT-TILE-RECURSIVE PACKED R-TREE ---
+def _union(boxes):
+    return (min(b[0] for b in boxes), min(b[1] for b in boxes),
+            max(b[2] for b in boxes), max(b[3] for b in boxes))
+
+
+class STRtree:
+    """
+    Static R-tree bulk-loaded with Sort-Tile-Recursive packing (Leutenegger et al.):
+    items are sorted into vertical slices by x, each slice by y, and packed into full nodes.
+    Nodes are (bbox, children, is_leaf).
+    """
+
+    def __init__(self, items, capacity=STR_NODE_CAPACITY):
+        self.size = len(items)
+        level = [(item.bbox, item, True) for item in items]
+        leaf = True
+        while len(level) > capacity:
+            level = self._pack(level, capacity, leaf)
+            leaf = False
+        self.root = (_union([n[0] for n in level]), level, leaf) if level else None
+
+    @staticmethod
+    def _pack(entries, capacity, leaf):
+        n_nodes = -(-len(entries) // capacity)
+        n_slices = max(1, round(n_nodes ** 0.5))
+        slice_size = -(-len(entries) // n_slices)
+        entries = sorted(entries, key=lambda e: e[0][0] + e[0][2])
+        packed = []
+        for s in range(0, len(entries), slice_size):
+            column = sorted(entries[s:s + slice_size], key=lambda e: e[0][1] + e[0][3])
+            for c in range(0, len(column), capacity):
+                group = column[c:c + capacity]
+                packed.append((_union([g[0] for g in group]), group, leaf))
+        return packed
+
+    def query_point(self, x, y):
+        """Items whose bounding box contains (x, y)."""
+        if self.root is None:
+            return []
+        hits = []
+        stack = [self.root]
+        while stack:
+            _, children, leaf = stack.pop()
+            for entry in children:
+                box = entry[0]
+                if box[0] <= x <= box[2] and box[1] <= y <= box[3]:
+                    if leaf:
+                        hits.append(entry[1])
+                    else:
+                        stack.append(entry)
+        return hits
+
+
+def load_boundaries(path):
+    """GeoJSON FeatureCollection of (Multi)Polygons -> list of _Polygon (one per part)."""
+    with open(path) as f:
+        data = json.load(f)
+    polygons = []
+    for feature in data.get("features", []):
+        props = feature.get("properties") or {}
+        name = next((props[k] for k in WARD_NAME_PROPERTIES if props.get(k)), None)
+        geom = feature.get("geometry") or {}
+        if not name:
+            continue
+        if geom.get("type") == "Polygon":
+            parts = [geom["coordinates"]]
+        elif geom.get("type") == "MultiPolygon":
+            parts = geom["coordinates"]
+        else:
+            continue
+        polygons.extend(_Polygon(str(name), rings) for rings in parts if rings and rings[0])
+    return polygons
+
+
+# --- 3. RESOLVER ---
+def init_geocode_cache(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS geocode_cache (
+            lat_key REAL,
+            lon_key REAL,
+            jurisdiction TEXT,
+            stored_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (lat_key, lon_key)
+        )
+    ''')
+
+
+@lru_cache(maxsize=1)
+def get_geolocator():
+    """Lazy, cached Nominatim client: built on the first remote lookup, not at import."""
+    from geopy.geocoders import Nominatim       # Library for Reverse Geocoding (GPS to Address)
+    # 'user_agent' identifies our app to OpenStreetMap servers
+    return Nominatim(user_agent="city_grievance_app")
+
+
+class JurisdictionResolver:
+    def __init__(self, boundaries_path=WARD_BOUNDARIES_PATH, db_path=DATABASE_PATH):
+        self.db_path = db_path
+        self.tree = STRtree(load_boundaries(boundaries_path)) if os.path.exists(boundaries_path) else STRtree([])
+        self._cache = {}
+        self._offline_misses = set()  # Keys known absent from geocode_cache (offline lookups)
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._remote_lock = threading.Lock()
+        self._last_remote = 0.0
+
+    def local(self, lat, lon):
+        """Ward polygon containing the point, or None."""
+        for polygon in self.tree.query_point(lon, lat):
+            if polygon.contains(lon, lat):
+                return polygon.name
+        return None
+
+    def _connect(self):
+        """Pooled connection (db.py); the table is ensured on first use. Callers close() it."""
+        conn = db_connect(self.db_path)
+        if not self._table_ready:
+            init_geocode_cache(conn.cursor())
+            conn.commit()
+            self._table_ready = True
+        return conn
+
+    def _key(self, lat, lon):
+        return (round(lat, GEOCODE_CACHE_DECIMALS), round(lon, GEOCODE_CACHE_DECIMALS))
+
+    def cached(self, key, offline: bool = False):
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+            if offline and key in self._offline_misses:
+                return None
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT jurisdiction FROM geocode_cache WHERE lat_key = ? AND lon_key = ?", key
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            row = None
+        if row:
+            with self._lock:
+                self._cache[key] = row[0]
+            return row[0]
+        if offline:
+            with self._lock:
+                self._offline_misses.add(key)
+        return None
+
+    def _remember(self, key, jurisdiction):
+        with self._lock:
+            self._cache[key] = jurisdiction
+            self._offline_misses.discard(key)  # Now cached: offline re-scoring may use it
+        try:
+            conn = self._connect()
+            try:
+                conn.execute(
+                    "INSERT OR REPLACE INTO geocode_cache (lat_key, lon_key, jurisdiction) VALUES (?, ?, ?)",
+                    (*key, jurisdiction)
+                )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Geocode Cache Error: {e}")
+
+    def remote(self, lat, lon):
+        """Nominatim lookup, spaced NOMINATIM_MIN_INTERVAL apart across all threads."""
+        with self._remote_lock:
+            wait = self._last_remote + NOMINATIM_MIN_INTERVAL - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            try:
+                location_obj = get_geolocator().reverse(f"{lat}, {lon}", language='en')
+            finally:
+                self._last_remote = time.monotonic()
+        address = location_obj.raw['address']
+
+        # Logic: We follow an Administrative Hierarchy to find the responsible body
+        # Suburb (Metro) -> City (Semi-Urban) -> Town/Village (Rural)
+        return (
+            address.get('suburb') or
+            address.get('neighbourhood') or
+            address.get('city') or
+            address.get('town') or
+            address.get('village') or
+            address.get('county')
+        )
+
+    def resolve(self, lat, lon, location_text, offline: bool = False):
+        """
+        Polygon -> quantized cache -> Nominatim -> location_text.
+        offline=True never calls Nominatim (bulk re-scoring).
+        Missing / 0.0 GPS coordinates resolve to "Unknown Sector", as before.
+        """
+        # Only attempt if GPS coordinates are valid (not 0.0)
+        if not lat or not lon:
+            return "Unknown Sector"
+        ward = self.local(lat, lon)
+        if ward:
+            return ward
+        key = self._key(lat, lon)
+        hit = self.cached(key, offline)
+        if hit:
+            return hit
+        if offline:
+            return location_text
+        try:
+            found = self.remote(lat, lon)
+        except Exception as e:
+            print(f"Geocoding Error: {e}")
+            return location_text  # Not cached: a transient failure should be retried next time
+        if found:
+            self._remember(key, found)
+            return found
+        return location_text  # Final fallback to user's manual text
+
+
+@lru_cache(maxsize=1)
+def get_resolver():
+    """Boundaries are parsed and indexed once per process, on first use."""
+    resolver = JurisdictionResolver()
+    print(f"Jurisdiction Resolver: {resolver.tree.size} ward polygons indexed")
+    return resolver
+
+
+def resolve_jurisdiction(lat, lon, location_text, offline: bool = False):
+    return get_resolver().resolve(lat, lon, location_text, offline=offline)
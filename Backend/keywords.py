@@ -0,0 +1,148 @@
+# keywords.py
+# --- COMPILED KEYWORD ENGINE (category + urgency in one pass) ---
+# STEP C / STEP D used to run one `k in text` substring scan per keyword per category,
+# and matched inside words ("light" in "flight", "bad" in "badminton").
+# The vocabulary is now compiled once into word / prefix bitmask tables; one tokenizing
+# pass over the text yields every category and urgency hit.
+#   - "word"  matches the word and its plural (words / wordes)
+#   - "word*" matches any word starting with "word" (electric* -> electricity)
+#   - KEYWORDS_CONFIG points at a JSON file with per-deployment vocabularies:
+#       {"categories": [...], "urgency": [...]}          replace a section
+#       {"extra_keywords": {"Water Supply": ["nalla"]}}   extend a category / urgency level
+import os
+import re
+import json
+from functools import lru_cache, reduce
+from operator import or_
+
+KEYWORDS_CONFIG = os.getenv("KEYWORDS_CONFIG", "")
+
+# Order = precedence: the first category / urgency level with a hit wins
+DEFAULT_VOCABULARY = {
+    "categories": [
+        {"name": "Roads & Infrastructure", "keywords": [
+            "pothole", "road*", "crack*", "bridge",
+            # Marathi / Hindi transliterations
+            "khadda", "khadde", "rasta", "raste", "sadak", "pul"]},
+        {"name": "Water Supply", "keywords": [
+            "water", "leak*", "pipe*", "flood*", "sewage",
+            "pani", "paani", "nal", "jal", "gatar"]},
+        {"name": "Electricity/Power", "keywords": [
+            "electric*", "power", "light", "streetlight", "wire", "current",
+            "bijli", "vij", "vidyut"]},
+        {"name": "Sanitation & Waste", "keywords": [
+            "garbage", "trash", "waste", "smell*",
+            "kachra", "kachara", "ghan", "durgandh", "safai"]},
+    ],
+    "fallback_category": "General Inquiry",
+    "urgency": [
+        {"level": "Dangerous", "bonus": 7, "keywords": [
+            "accident", "injur*", "deadly", "hospital", "emergency", "shock", "falling",
+            "apghat", "durghatna", "jakhmi", "dhoka", "khatra"]},
+        {"level": "Moderate", "bonus": 4, "keywords": [
+            "bad", "problem", "dark", "smell*", "waste", "stuck", "leakage",
+            "samasya", "andhar", "andhera", "vaas", "badbu"]},
+    ],
+    "fallback_urgency": {"level": "Neutral", "bonus": 1},
+}
+
+
+def load_vocabulary(path=KEYWORDS_CONFIG):
+    """Defaults merged with the deployment's KEYWORDS_CONFIG file (if any)."""
+    vocabulary = json.loads(json.dumps(DEFAULT_VOCABULARY))  # deep copy
+    if not path:
+        return vocabulary
+    with open(path, encoding="utf-8") as f:
+        custom = json.load(f)
+    for section in ("categories", "urgency", "fallback_category", "fallback_urgency"):
+        if section in custom:
+            vocabulary[section] = custom[section]
+    for target, words in custom.get("extra_keywords", {}).items():
+        for entry in vocabulary["categories"] + vocabulary["urgency"]:
+            if entry.get("name", entry.get("level")) == target:
+                entry["keywords"].extend(words)
+    return vocabulary
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_MEMO_LIMIT = 50000
+URGENCY_SHIFT = 32  # mask bits 0-31: categories, 32+: urgency levels (index = precedence)
+
+
+class KeywordMatcher:
+    """
+    Word-level automaton: the text is split once on whitespace and every token maps,
+    through exact / plural / prefix tables, to a bitmask of the categories and urgency levels
+    it belongs to. Resolved tokens are memoized, so a description costs one dict lookup and
+    one OR per word; the winning category / level is the lowest set bit (= precedence).
+    Matches always start and end on word boundaries.
+    """
+
+    def __init__(self, vocabulary=None):
+        vocabulary = vocabulary or load_vocabulary()
+        self.categories = [c["name"] for c in vocabulary["categories"]]
+        self.urgency = [(u["level"], u["bonus"]) for u in vocabulary["urgency"]]
+        self.fallback_category = vocabulary["fallback_category"]
+        self.fallback_urgency = (vocabulary["fallback_urgency"]["level"], vocabulary["fallback_urgency"]["bonus"])
+        if len(self.categories) > URGENCY_SHIFT:
+            raise ValueError(f"At most {URGENCY_SHIFT} keyword categories are supported")
+
+        self._exact = {}     # word (and its plurals) -> mask
+        self._prefix = {}    # "electric*" stored as "electric" -> mask
+        for shift, entries in ((0, vocabulary["categories"]), (URGENCY_SHIFT, vocabulary["urgency"])):
+            for i, entry in enumerate(entries):
+                bit = 1 << (shift + i)
+                for keyword in entry["keywords"]:
+                    keyword = keyword.strip().lower()
+                    if keyword.endswith("*"):
+                        self._prefix[keyword[:-1]] = self._prefix.get(keyword[:-1], 0) | bit
+                    else:
+                        for word in (keyword, keyword + "s", keyword + "es"):
+                            self._exact[word] = self._exact.get(word, 0) | bit
+        self._prefix_lengths = sorted({len(p) for p in self._prefix})
+        self._memo = {}
+
+    def _resolve_word(self, word):
+        mask = self._exact.get(word, 0)
+        for length in self._prefix_lengths:
+            if length > len(word):
+                break
+            mask |= self._prefix.get(word[:length], 0)
+        return mask
+
+    def _resolve(self, chunk):
+        """Whitespace chunk ("road/bridge,") -> OR of its words' masks, memoized."""
+        mask = reduce(or_, map(self._resolve_word, _TOKEN_RE.findall(chunk)), 0)
+        if len(self._memo) < _MEMO_LIMIT:
+            self._memo[chunk] = mask
+        return mask
+
+    def mask(self, text):
+        """Bitmask of every category and urgency hit in text, single pass."""
+        # str.split() is several times faster than a regex scan; punctuation inside a chunk
+        # is handled (once, then memoized) by _resolve
+        tokens = text.lower().split()
+        values = list(map(self._memo.get, tokens))
+        if None in values:
+            values = [self._resolve(t) if v is None else v for t, v in zip(tokens, values)]
+        return reduce(or_, values, 0)
+
+    def classify(self, description, ai_label=""):
+        """
+        Returns (category, urgency_level, urgency_bonus).
+        Categories consider the vision label and the text; urgency only the text.
+        """
+        text_mask = self.mask(description)
+        label_mask = self.mask(ai_label.replace("_", " ").replace("-", " ")) if ai_label else 0
+
+        categories = (text_mask | label_mask) & ((1 << URGENCY_SHIFT) - 1)
+        urgency = text_mask >> URGENCY_SHIFT
+        category = self.categories[(categories & -categories).bit_length() - 1] if categories else self.fallback_category
+        level, bonus = self.urgency[(urgency & -urgency).bit_length() - 1] if urgency else self.fallback_urgency
+        return category, level, bonus
+
+
+@lru_cache(maxsize=1)
+def get_matcher():
+    """Compiled once per process from DEFAULT_VOCABULARY + KEYWORDS_CONFIG."""
+    return KeywordMatcher()
@@ -0,0 +1,284 @@
+# mailer.py
+# --- OUTBOUND MAIL DISPATCHER ---
+# send_email used to open SMTP_SSL, log in, send and quit for every message, inside the
+# async OTP / registration handlers (30 s timeout): one slow handshake stalled the API.
+#   - send() only enqueues (bounded queue) and returns at once
+#   - one daemon thread keeps a single logged-in SMTP connection and sends queued
+#     messages in batches of MAIL_BATCH_SIZE over it; the connection is closed after
+#     MAIL_IDLE_SECONDS without mail and reopened on demand
+#   - temporary failures (network, 4xx, dropped connection) retry with exponential
+#     backoff up to MAIL_MAX_ATTEMPTS; permanent 5xx rejections are dropped and logged
+#   - a rejected login is fatal: it is logged once, the queue is dropped and send() refuses
+#     further mail until restart (retrying bad credentials only gets the account locked)
+#   - MAIL_SMTP_HOST / MAIL_SMTP_PORT / MAIL_SMTP_SSL select the server; for local testing
+#     run the built-in sink and point the API at it:
+#       python mailer.py --sink 1025
+#       MAIL_SMTP_HOST=127.0.0.1 MAIL_SMTP_PORT=1025 MAIL_SMTP_SSL=0 MAIL_SMTP_USER= uvicorn takeimage:app
+import os
+import sys
+import time
+import heapq
+import queue
+import smtplib
+import threading
+from email.mime.text import MIMEText
+from email.mime.multipart import MIMEMultipart
+
+MAIL_SMTP_HOST = os.getenv("MAIL_SMTP_HOST", "smtp.gmail.com")
+MAIL_SMTP_PORT = int(os.getenv("MAIL_SMTP_PORT", 465))
+MAIL_SMTP_SSL = os.getenv("MAIL_SMTP_SSL", "1") == "1"     # Implicit SSL (465); 0 = plain SMTP
+MAIL_SMTP_STARTTLS = os.getenv("MAIL_SMTP_STARTTLS", "0") == "1"
+MAIL_TIMEOUT = float(os.getenv("MAIL_TIMEOUT", 30))
+MAIL_QUEUE_SIZE = int(os.getenv("MAIL_QUEUE_SIZE", 10000))
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+MAIL_IDLE_SECONDS = float(os.getenv("MAIL_IDLE_SECONDS", 60))
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 5))
+MAIL_RETRY_BASE_SECONDS = float(os.getenv("MAIL_RETRY_BASE_SECONDS", 5))
+
+
+class Mailer:
+    """Background SMTP sender: one persistent connection, batched sends, retries with backoff."""
+
+    def __init__(self, sender, user=None, password=None):
+        self.sender = sender
+        self.user = user              # Empty / None: no AUTH (local sink, relay on localhost)
+        self.password = password
+        self._queue = queue.Queue(maxsize=MAIL_QUEUE_SIZE)
+        self._retries = []            # heap of (due_at, seq, attempt, message)
+        self._seq = 0
+        self._server = None
+        self._last_used = 0.0
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._pending = 0             # Queued + retrying mails
+        self.auth_failed = False      # Login rejected: mail is off until restart
+        self.sent = self.retried = self.failed = self.rejected = self.connections = 0
+
+    def send(self, target, subject, body):
+        """Queues one plain-text mail; False when the queue is full (caller may log / ignore)."""
+        msg = MIMEMultipart()
+        msg['Subject'] = subject
+        msg['From'] = self.sender
+        msg['To'] = target
+        msg.attach(MIMEText(body, 'plain'))
+        if self.auth_failed:
+            self.rejected += 1
+            return False
+        self._ensure_started()
+        with self._done:
+            self._pending += 1
+        try:
+            self._queue.put_nowait((1, msg))
+            return True
+        except queue.Full:
+            self._finish()
+            self.rejected += 1
+            print(f"Nivaran Mail Engine Error: queue full, dropped mail to {target}")
+            return False
+
+    def flush(self, timeout=None):
+        """Waits until every queued mail is sent or given up on (tests / shutdown)."""
+        with self._done:
+            return self._done.wait_for(lambda: self._pending == 0, timeout)
+
+    def _finish(self):
+        with self._done:
+            self._pending -= 1
+            if self._pending == 0:
+                self._done.notify_all()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._start_lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="mailer", daemon=True)
+                    self._thread.start()
+
+    # --- WORKER THREAD ---
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                self._close_if_idle()
+                continue
+            for attempt, msg in batch:
+                self._deliver(attempt, msg)
+            self._last_used = time.monotonic()
+
+    def _next_batch(self):
+        """Due retries first, then up to MAIL_BATCH_SIZE queued mails; blocks while there is nothing to do."""
+        now = time.monotonic()
+        batch = []
+        while self._retries and self._retries[0][0] <= now and len(batch) < MAIL_BATCH_SIZE:
+            _, _, attempt, msg = heapq.heappop(self._retries)
+            batch.append((attempt, msg))
+        if not batch:
+            wait = MAIL_IDLE_SECONDS
+            if self._retries:
+                wait = min(wait, self._retries[0][0] - now)
+            try:
+                batch.append(self._queue.get(timeout=max(wait, 0.01)))
+            except queue.Empty:
+                return batch
+        while len(batch) < MAIL_BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _connect(self):
+        if MAIL_SMTP_SSL:
+            server = smtplib.SMTP_SSL(MAIL_SMTP_HOST, MAIL_SMTP_PORT, timeout=MAIL_TIMEOUT)
+        else:
+            server = smtplib.SMTP(MAIL_SMTP_HOST, MAIL_SMTP_PORT, timeout=MAIL_TIMEOUT)
+            if MAIL_SMTP_STARTTLS:
+                server.starttls()
+        if self.user:
+            server.login(self.user, self.password)
+        self.connections += 1
+        return server
+
+    def _close(self):
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except (smtplib.SMTPException, OSError):
+                pass
+            self._server = None
+
+    def _close_if_idle(self):
+        if self._server is not None and time.monotonic() - self._last_used > MAIL_IDLE_SECONDS:
+            self._close()  # Servers drop idle sessions anyway; reconnect on the next mail
+
+    def _deliver(self, attempt, msg):
+        if self.auth_failed:  # Rest of a batch taken before the login was rejected
+            self.failed += 1
+            self._finish()
+            return
+        try:
+            if self._server is None:
+                self._server = self._connect()
+            try:
+                self._server.send_message(msg)
+            except smtplib.SMTPServerDisconnected:
+                # The kept-alive session timed out server-side: one fresh connection, same attempt
+                self._server = self._connect()
+                self._server.send_message(msg)
+            self.sent += 1
+            self._finish()
+        except smtplib.SMTPAuthenticationError:
+            self._close()
+            self._park(msg)
+        except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+            code = getattr(e, "smtp_code", None) or _first_code(e)
+            if code and 400 <= code < 500:
+                self._retry(attempt, msg)
+            else:
+                self.failed += 1
+                self._finish()
+                print(f"Nivaran Mail Engine Error: {msg['To']} rejected ({e})")
+        except (smtplib.SMTPException, OSError) as e:
+            print(f"Nivaran Mail Engine Error: {e}")
+            self._close()
+            self._retry(attempt, msg)
+
+    def _park(self, msg):
+        """Bad credentials: fail this mail and everything queued, once, without retrying."""
+        if not self.auth_failed:
+            self.auth_failed = True
+            print("CRITICAL: SMTP Authentication Failed. Check App Password. Outbound mail is disabled until restart.")
+        dropped = [msg] + [m for _, _, _, m in self._retries]
+        self._retries = []
+        while True:
+            try:
+                dropped.append(self._queue.get_nowait()[1])
+            except queue.Empty:
+                break
+        self.failed += len(dropped)
+        for _ in dropped:
+            self._finish()
+
+    def _retry(self, attempt, msg):
+        if attempt >= MAIL_MAX_ATTEMPTS:
+            self.failed += 1
+            self._finish()
+            print(f"Nivaran Mail Engine Error: giving up on {msg['To']} after {attempt} attempts")
+            return
+        self.retried += 1
+        self._seq += 1
+        delay = MAIL_RETRY_BASE_SECONDS * (2 ** (attempt - 1))
+        heapq.heappush(self._retries, (time.monotonic() + delay, self._seq, attempt + 1, msg))
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize(), "retry_pending": len(self._retries),
+            "sent": self.sent, "retried": self.retried, "failed": self.failed,
+            "rejected": self.rejected, "connections": self.connections,
+            "connected": self._server is not None, "auth_failed": self.auth_failed,
+        }
+
+
+def _first_code(error):
+    """SMTPRecipientsRefused carries {recipient: (code, message)}."""
+    for code, _ in getattr(error, "recipients", {}).values():
+        return code
+    return None
+
+
+# --- LOCAL SMTP SINK (testing) ---
+def run_sink(port=1025, host="127.0.0.1"):
+    """
+    Minimal SMTP server that accepts everything and prints it: a dependency-free
+    stand-in for `python -m aiosmtpd -n`. Not for production use.
+    """
+    import asyncio
+
+    async def handle(reader, writer):
+        writer.write(b"220 nivaran-sink ESMTP\r\n")
+        in_data, lines = False, []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if in_data:
+                if line in (b".\r\n", b".\n"):
+                    in_data = False
+                    message = b"".join(lines).decode(errors="replace")
+                    print(f"--- mail received ({len(message)} bytes) ---\n{message}", flush=True)
+                    lines = []
+                    writer.write(b"250 OK queued\r\n")
+                else:
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                continue
+            command = line.strip().split(b" ", 1)[0].upper()
+            if command in (b"EHLO", b"HELO"):
+                writer.write(b"250 nivaran-sink\r\n")
+            elif command == b"DATA":
+                in_data = True
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+            elif command == b"QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:  # MAIL / RCPT / RSET / NOOP
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+    async def main():
+        server = await asyncio.start_server(handle, host, port)
+        print(f"📬 SMTP sink listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+if __name__ == "__main__":
+    # python mailer.py --sink [port]
+    if len(sys.argv) > 1 and sys.argv[1] == "--sink":
+        run_sink(int(sys.argv[2]) if len(sys.argv) > 2 else 1025)
+    else:
+        print("usage: python mailer.py --sink [port]")
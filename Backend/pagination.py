@@ -0,0 +1,114 @@
+# pagination.py
+# --- KEYSET PAGINATION FOR COMPLAINT LISTS ---
+# /get-complaints and /api/v1/desk/inbox used to return (and decrypt) the whole ward.
+#   - pages are ordered by (ai_score DESC, id DESC) and continue from an opaque cursor:
+#     "(ai_score, id) < (last_score, last_id)" is a range seek on
+#     idx_complaints_ward_category_score, so page 500 costs the same as page 1 (no OFFSET)
+#   - untriaged rows (ai_score NULL) follow the scored ones, paged by id
+#   - fields= projects a whitelisted column subset (id / ai_score always included)
+#   - status / since / until filters run in SQL
+# The next cursor is returned in the X-Next-Cursor response header; the body stays a list.
+import json
+import base64
+from datetime import date
+
+from fastapi import HTTPException
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Columns a client may project (fields=); PII columns are decrypted / masked on output
+COMPLAINT_FIELDS = (
+    "id", "full_name", "phone_number", "language", "description", "text_desc", "location",
+    "latitude", "longitude", "ward_zone", "image_path", "status", "priority", "ai_category",
+    "category_code", "ai_score", "ai_label", "ai_confidence", "created_at", "verified_at",
+    "assigned_at", "deadline_at", "resolved_at", "resolution_image_path", "contractor_id",
+    "escalation_level", "escalated_at",
+)
+
+
+def init_pagination_index(cursor):
+    """Matches the keyset order within a (ward, category) slice."""
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_complaints_ward_category_score
+        ON complaints(ward_zone, category_code, ai_score, id)
+    ''')
+
+
+def encode_cursor(score, row_id):
+    return base64.urlsafe_b64encode(json.dumps([score, row_id]).encode()).decode()
+
+
+def decode_cursor(token):
+    try:
+        score, row_id = json.loads(base64.urlsafe_b64decode(token.encode()))
+        if not isinstance(row_id, int) or not (score is None or isinstance(score, (int, float))):
+            raise ValueError(token)
+        return score, row_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+
+
+def parse_fields(fields, allowed, default):
+    """fields="id,status" -> validated column list (id and ai_score are needed for the cursor)."""
+    if not fields:
+        columns = list(default)
+    else:
+        columns = [f.strip() for f in fields.split(",") if f.strip()]
+        unknown = [c for c in columns if c not in allowed]
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(unknown)}")
+    for required in ("ai_score", "id"):
+        if required not in columns:
+            columns.insert(0, required)
+    return columns
+
+
+def filter_clause(status=None, allowed_statuses=(), since=None, until=None):
+    """Optional status list / created_at date range -> (SQL fragment, params)."""
+    clause, params = "", []
+    if status:
+        statuses = [s.strip() for s in status.split(",") if s.strip()]
+        invalid = [s for s in statuses if s not in allowed_statuses]
+        if invalid:
+            raise HTTPException(status_code=400, detail=f"Unsupported status: {', '.join(invalid)}")
+        clause += f" AND status IN ({','.join('?' * len(statuses))})"
+        params += statuses
+    for value, op, modifier in ((since, ">=", "?"), (until, "<", "date(?, '+1 day')")):
+        if value:
+            try:
+                date.fromisoformat(value)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid date: {value} (expected YYYY-MM-DD)")
+            clause += f" AND created_at {op} {modifier}"
+            params.append(value)
+    return clause, params
+
+
+def fetch_page(conn, columns, where, params, limit, cursor=None):
+    """
+    One page of complaints matching `where` in (ai_score DESC, id DESC) order.
+    Returns (rows, next_cursor or None); rows honour conn.row_factory.
+    """
+    select = f"SELECT {', '.join(columns)} FROM complaints WHERE {where}"
+    score, last_id = decode_cursor(cursor) if cursor else (None, None)
+    rows = []
+    if cursor is None or score is not None:
+        # Scored rows: index range seek below the cursor
+        seek, seek_params = (" AND (ai_score, id) < (?, ?)", [score, last_id]) if cursor else ("", [])
+        rows = conn.execute(
+            f"{select} AND ai_score IS NOT NULL{seek} ORDER BY ai_score DESC, id DESC LIMIT ?",
+            (*params, *seek_params, limit + 1)
+        ).fetchall()
+    if len(rows) <= limit:
+        # Untriaged rows (NULL score) come last, newest first
+        seek, seek_params = (" AND id < ?", [last_id]) if cursor and score is None else ("", [])
+        rows += conn.execute(
+            f"{select} AND ai_score IS NULL{seek} ORDER BY id DESC LIMIT ?",
+            (*params, *seek_params, limit + 1 - len(rows))
+        ).fetchall()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last[columns.index("ai_score")], last[columns.index("id")])
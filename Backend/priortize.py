@@ -1,32 +1,29 @@
 # --- 1. IMPORTING LIBRARIES ---
-from textblob import TextBlob                   # Library for Sentiment Analysis (Urgency Check)
-from deep_translator import GoogleTranslator     # Reliable library for Multi-language support
-from geopy.geocoders import Nominatim           # Library for Reverse Geocoding (GPS to Address)
+from translation import translate_to_english    # Cached, batched Multi-language support
+from jurisdiction import resolve_jurisdiction     # Ward Polygons + Geocode Cache
+from keywords import get_matcher                 # Compiled Category / Urgency Keywords
 import os
 from dotenv import load_dotenv
 
 # Load environment variables (Secret Management)
 load_dotenv()
 
-# --- 2. INITIALIZING AI UTILITIES ---
-# 'user_agent' identifies our app to OpenStreetMap servers
-geolocator = Nominatim(user_agent="city_grievance_app")
-
-# --- 3. THE CORE INTELLIGENCE FUNCTION ---
-def prioritize_complaint(description, ai_result, lat, lon, location_text):
+# --- 2. THE CORE INTELLIGENCE FUNCTION ---
+def prioritize_complaint(description, ai_result, lat, lon, location_text, offline=False):
     """
     INDUSTRIAL-GRADE ADAPTIVE TRIAGE:
     Analyzes input data across three vectors:
     1. Visual (YOLOv11) - 200ms inference
     2. Semantic (NLP Translation & Keywords) - Multimodal Fusion
     3. Geospatial (Reverse Geocoding) - Predictive Cluster Context
+    offline=True (bulk re-scoring) uses only local / cached translation and geocoding.
     """
 
     # --- STEP A: CROSS-LINGUAL NORMALIZATION ---
     # We convert everything to English first to ensure consistent keyword matching
+    # English text and previously seen phrases never reach the network (see translation.py)
     try:
-        # 'source=auto' allows citizens to write in Marathi, Hindi, or Marathish
-        eng_desc = GoogleTranslator(source='auto', target='en').translate(description)
+        eng_desc = translate_to_english(description, offline=offline)
         desc_lower = eng_desc.lower()
     except Exception as e:
         print(f"Translation Error: {e}")
@@ -34,63 +31,24 @@ def prioritize_complaint(description, ai_result, lat, lon, location_text):
     
     # --- STEP B: ADMINISTRATIVE JURISDICTION RESOLUTION ---
     # This solves the "Semi-Urban/Rural" problem (Mumbai vs Dombivali vs Village)
-    detected_jurisdiction = "Unknown Sector"
-    try:
-        # Only attempt if GPS coordinates are valid (not 0.0)
-        if lat != 0 and lon != 0:
-            location_obj = geolocator.reverse(f"{lat}, {lon}", language='en')
-            address = location_obj.raw['address']
-            
-            # Logic: We follow an Administrative Hierarchy to find the responsible body
-            # Suburb (Metro) -> City (Semi-Urban) -> Town/Village (Rural)
-            detected_jurisdiction = (
-                address.get('suburb') or 
-                address.get('neighbourhood') or
-                address.get('city') or 
-                address.get('town') or 
-                address.get('village') or 
-                address.get('county') or
-                location_text # Final fallback to user's manual text
-            )
-    except Exception as e:
-        print(f"Geocoding Error: {e}")
-        detected_jurisdiction = location_text # Fallback to manual text if API fails
+    # Local ward polygons first, then a quantized cache, then rate-limited Nominatim (see jurisdiction.py)
+    detected_jurisdiction = resolve_jurisdiction(lat, lon, location_text, offline=offline)
 
     # --- STEP C: MULTIMODAL CATEGORIZATION ---
     # We combine Vision Labels (YOLO) with Textual Context (Keywords)
     ai_label = ai_result.get('label', 'none').lower()
     
     # Standardizing for Frontend Card Keys
-    if any(k in ai_label or k in desc_lower for k in ["pothole", "road", "crack", "bridge"]):
-        final_category = "Roads & Infrastructure"
-    elif any(k in ai_label or k in desc_lower for k in ["water", "leak", "pipe", "flood", "sewage", "leakage"]):
-        final_category = "Water Supply"
-    elif any(k in ai_label or k in desc_lower for k in ["electric", "power", "light", "wire", "current"]):
-        final_category = "Electricity/Power"
-    elif any(k in ai_label or k in desc_lower for k in ["garbage", "trash", "waste", "kachra", "smell"]):
-        final_category = "Sanitation & Waste"
-    else:
-        final_category = "General Inquiry"
+    # One pass of the compiled keyword engine gives category and urgency hits (see keywords.py)
+    final_category, prio_level, urgency_bonus = get_matcher().classify(desc_lower, ai_label)
 
     # --- STEP D: SEVERITY TRIAGE (The Formula) ---
     # We use a 1-10 Scale
     # 1. Base Score from AI Certainty (Max 2.0 points)
     image_score = ai_result.get('confidence', 0) * 2
 
-    # 2. Urgency Weights based on NLP
-    dangerous_keywords = ["accident", "injury", "deadly", "hospital", "emergency", "shock", "falling"]
-    moderate_keywords = ["bad", "problem", "dark", "smell", "waste", "stuck", "leakage"]
-    
-    urgency_bonus = 0
-    if any(word in desc_lower for word in dangerous_keywords):
-        urgency_bonus = 7
-        prio_level = "Dangerous"
-    elif any(word in desc_lower for word in moderate_keywords):
-        urgency_bonus = 4
-        prio_level = "Moderate"
-    else:
-        urgency_bonus = 1
-        prio_level = "Neutral"
+    # 2. Urgency Weights based on NLP (prio_level / urgency_bonus from STEP C's single pass)
+    # Dangerous +7, Moderate +4, Neutral +1
 
     # Calculation: Base(Visual) + Bonus(Context) + 1(Minimum for verified items)
     final_score = min(image_score + urgency_bonus + 1, 10.0)
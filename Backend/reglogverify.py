@@ -2,11 +2,11 @@ from fastapi import FastAPI, HTTPException, File, UploadFile, Form
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 import sqlite3
+from db import connect as db_connect  # Pooled SQLite Access
+from verification import send_email  # Queued SMTP Dispatcher (mailer.py)
 import os
 import hashlib
 import random
-import smtplib
-from email.mime.text import MIMEText
 from datetime import datetime, timedelta
 from typing import Optional
 
@@ -23,8 +23,7 @@ app.add_middleware(
 # --- CONFIG ---
 CITIZEN_DB = "citizens.db"
 GOVERNMENT_DB = "government.db"
-SMTP_EMAIL = "rajeedandge444@gmail.com" 
-SMTP_PASSWORD = "zkpm slsj txnh bclm"
+# SMTP credentials / server: verification.py + mailer.py
 
 # In-memory store for OTPs and Sessions
 auth_context = {}
@@ -34,7 +33,7 @@ sessions = {} # {token: {"name": str, "role": str}}
 def init_dbs():
     # 1. Initialize Citizen Database
     try:
-        conn_c = sqlite3.connect(CITIZEN_DB)
+        conn_c = db_connect(CITIZEN_DB)
         cursor_c = conn_c.cursor()
         cursor_c.execute('''CREATE TABLE IF NOT EXISTS citizens (
             id INTEGER PRIMARY KEY AUTOINCREMENT, 
@@ -51,7 +50,7 @@ def init_dbs():
         print(f"❌ Error initializing Citizen DB: {e}")
     
     try:
-        conn_g = sqlite3.connect(GOVERNMENT_DB)
+        conn_g = db_connect(GOVERNMENT_DB)
         cursor_g = conn_g.cursor()
 
         
@@ -121,23 +120,6 @@ def generate_session(email: str, name: str, role: str):
     sessions[token] = {"name": name, "role": role}
     return token
 
-def send_email(target, subject, body):
-    from email.mime.multipart import MIMEMultipart
-    msg = MIMEMultipart()
-    msg['Subject'] = subject
-    msg['From'] = SMTP_EMAIL
-    msg['To'] = target
-    msg.attach(MIMEText(body, 'plain'))
-    try:
-        server = smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=30)
-        server.login(SMTP_EMAIL, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        return True
-    except Exception as e:
-        print(f"Nivaran Mail Engine Error: {e}")
-        return False
-
 # --- MODELS ---
 class OnboardingUpdate(BaseModel):
     email: str
@@ -164,7 +146,7 @@ class CitizenFinal(BaseModel):
 
 @app.get("/api/onboarding/status")
 async def get_onboarding_status(email: str):
-    conn = sqlite3.connect(GOVERNMENT_DB)
+    conn = db_connect(GOVERNMENT_DB)
     conn.row_factory = sqlite3.Row 
     cursor = conn.cursor()
     try:
@@ -205,7 +187,7 @@ async def update_onboarding_step(
 ):
     print(f"DEBUG: Syncing {field} for {email} at step {step}")
 
-    conn = sqlite3.connect("government.db")
+    conn = db_connect(GOVERNMENT_DB)
     cursor = conn.cursor()
     try:
         # 1. Check if user already has a progress record
@@ -253,7 +235,7 @@ async def update_onboarding_step(
 
 # @app.post("/api/onboarding/update-step") # Handle both if frontend uses different methods
 # async def update_onboarding_step(data: OnboardingUpdate):
-#     conn = sqlite3.connect(GOVERNMENT_DB)
+#     conn = db_connect(GOVERNMENT_DB)
 #     try:
 #         conn.execute("""
 #             INSERT INTO onboarding_progress (email, step) VALUES (?, ?)
@@ -279,7 +261,7 @@ async def finalize_gov_onboarding(
     workspace_code: str = Form(...),
     proof: UploadFile = File(None) # Optional if they didn't upload in final step
 ):
-    conn = sqlite3.connect(GOVERNMENT_DB)
+    conn = db_connect(GOVERNMENT_DB)
     cursor = conn.cursor()
     
     try:
@@ -346,7 +328,7 @@ async def finalize_gov_onboarding(
 # --- 3. WORKSPACE CHECK ---
 @app.get("/api/onboarding/check-code")
 async def check_workspace_code(code: str, location: str):
-    conn = sqlite3.connect(GOVERNMENT_DB)
+    conn = db_connect(GOVERNMENT_DB)
     cursor = conn.cursor()
     try:
         # Check if this specific code exists for this specific location
@@ -386,7 +368,7 @@ async def finalize_config(
     worker: str = Form(...),
     sla: str = Form(...),
 ):
-    conn = sqlite3.connect("government.db")
+    conn = db_connect(GOVERNMENT_DB)
     cursor = conn.cursor()
     
     try:
@@ -444,7 +426,7 @@ async def send_otp(data: OTPRequest):
     if not data.is_signup:
         db = GOVERNMENT_DB if role == "government" else CITIZEN_DB
         table = "government_officers" if role == "government" else "citizens"
-        conn = sqlite3.connect(db)
+        conn = db_connect(db)
         conn.row_factory = sqlite3.Row
         user = conn.execute(f"SELECT * FROM {table} WHERE email = ?", (email,)).fetchone()
         conn.close()
@@ -495,7 +477,7 @@ async def verify_otp(data: VerifyRequest):
         db = GOVERNMENT_DB if record["role"] == "government" else CITIZEN_DB
         table = "government_officers" if record["role"] == "government" else "citizens"
         
-        conn = sqlite3.connect(db)
+        conn = db_connect(db)
         conn.row_factory = sqlite3.Row
         user = conn.execute(f"SELECT * FROM {table} WHERE email = ?", (email,)).fetchone()
         conn.close()
@@ -527,7 +509,7 @@ async def verify_otp(data: VerifyRequest):
 @app.post("/api/gov/request-otp")
 async def request_otp(email: str = Form(...), name: str = Form(...)):
     # Check if they are ALREADY fully registered
-    conn = sqlite3.connect(GOVERNMENT_DB)
+    conn = db_connect(GOVERNMENT_DB)
     user = conn.execute("SELECT * FROM government_officers WHERE email = ? AND is_setup_complete = 1", (email,)).fetchone()
     conn.close()
     
@@ -546,7 +528,7 @@ async def register_citizen(data: CitizenFinal):
     if not auth_context.get(data.email, {}).get("verified"):
         raise HTTPException(status_code=403, detail="Please verify your email first.")
     
-    conn = sqlite3.connect(CITIZEN_DB)
+    conn = db_connect(CITIZEN_DB)
     try:
         conn.execute("INSERT INTO citizens (name, email, phone, uid_number, password_hash) VALUES (?, ?, ?, ?, ?)",
             (data.name, data.email, data.phone, data.uid_number, hash_password(data.password)))
@@ -582,7 +564,7 @@ async def register_gov(
     with open(proof_path, "wb") as f:
         f.write(await proof.read())
 
-    conn = sqlite3.connect(GOVERNMENT_DB)
+    conn = db_connect(GOVERNMENT_DB)
     try:
         conn.execute(
             """INSERT INTO government_officers 
@@ -601,7 +583,7 @@ async def register_gov(
     except sqlite3.IntegrityError:
         raise HTTPException(status_code=400, detail="Officer already exists.")
     finally:
-        conn = sqlite3.connect(GOVERNMENT_DB)
+        conn = db_connect(GOVERNMENT_DB)
         conn.execute("DELETE FROM onboarding_progress WHERE email = ?", (email,))
         conn.commit()
         conn.close()
@@ -0,0 +1,277 @@
+# rescore.py
+# --- BULK RE-SCORING OF TRIAGED COMPLAINTS ---
+# After a keyword / weight / SLA change, prioritize_complaint is re-run over existing rows:
+#   - complaints are streamed in id-ordered chunks (keyset, constant memory)
+#   - chunks are scored in parallel processes with offline=True: translation and
+#     jurisdiction come from local polygons / caches only, never the network
+#   - only changed rows are written back, one executemany transaction per chunk
+#   - deadlines are recomputed for 'verified' rows only: assigned / escalated rows carry the
+#     dispatch deadline from issue_job_card, which the original SLA must not overwrite
+#   - rows that escalated get their escalation_level rungs re-applied on top of the new base
+#     priority (sla_scheduler.escalated_priority), so re-scoring never undoes an escalation
+#     (also after a re-dispatch or resolution, which keep escalation_level)
+#   - a "rescored" outbox event (events.py) makes every running API process reload its
+#     hotspots and SLA heap, whether the run came from the API or this CLI
+# The stored vision verdict (ai_label / ai_confidence) stands in for the image; rows triaged
+# before those columns existed use image_index, or a confidence back-derived from ai_score.
+#   python rescore.py [--all] [--workers N] [--chunk 2000] [--dry-run]
+# The same job runs from the API: POST /api/v1/admin/rescore (admin only).
+import os
+import json
+import time
+import sqlite3
+import argparse
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime, timedelta, timezone
+
+from image_store import init_image_index
+from desk_stats import rebuild_daily_rollup
+from heatmap_cache import bump_all
+from events import record_system_event
+from sla_scheduler import escalated_priority, init_sla_columns
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")   # Complaints & core data
+GOVT_DB = os.getenv("GOVT_DB_PATH", "government.db")          # system_config (SLA rules)
+RESCORE_CHUNK_SIZE = int(os.getenv("RESCORE_CHUNK_SIZE", 2000))
+RESCORE_WORKERS = int(os.getenv("RESCORE_WORKERS", os.cpu_count() or 1))
+OPEN_STATUSES = ("verified", "assigned", "escalated")
+TRIAGED_STATUSES = OPEN_STATUSES + ("resolved",)
+
+
+def init_ai_columns(cursor):
+    """Vision verdict kept per complaint so it can be re-scored without the image."""
+    for col, defn in [("ai_label", "TEXT"), ("ai_confidence", "REAL")]:
+        try:
+            cursor.execute(f"ALTER TABLE complaints ADD COLUMN {col} {defn}")
+        except sqlite3.OperationalError:
+            pass # Column already exists
+
+
+def load_sla_rules():
+    """Same system_config lookup as run_task_back: (configured, sla_hours, category_mapping)."""
+    try:
+        gconn = sqlite3.connect(GOVT_DB)
+        config = gconn.execute("SELECT category_mapping, sla_hours FROM system_config LIMIT 1").fetchone()
+        gconn.close()
+    except sqlite3.Error:
+        config = None
+    if not config:
+        return (False, 24, {})
+    return (True, config[1] or 24, json.loads(config[0]) if config[0] else {})
+
+
+# --- 1. WORKER SIDE (runs in child processes) ---
+def _vision_verdict(label, confidence, cached_result, score, priority, bonuses):
+    """Best available stand-in for the original ai_result; label "none" = class unknown."""
+    if label is not None and confidence is not None:
+        return {"label": label, "confidence": confidence, "detected": True}
+    if cached_result:
+        cached = json.loads(cached_result)
+        return {"label": cached.get("label", "none"), "confidence": cached.get("confidence", 0), "detected": True}
+    # score = min(confidence * 2 + bonus + 1, 10)  ->  confidence = (score - bonus - 1) / 2
+    bonus = bonuses.get(priority, 1)
+    confidence = min(max(((score or 0) - bonus - 1) / 2, 0.0), 1.0)
+    return {"label": "none", "confidence": round(confidence, 4), "detected": True}
+
+
+def _deadline(verified_at, priority, sla_hours):
+    """Deadline from the original verification time (stored UTC, deadlines are local)."""
+    if not verified_at:
+        return None
+    verified = datetime.fromisoformat(verified_at)
+    if verified.tzinfo is None and " " in verified_at:
+        verified = verified.replace(tzinfo=timezone.utc).astimezone().replace(tzinfo=None)
+    hours = 2 if priority == 'Dangerous' else sla_hours
+    return (verified + timedelta(hours=hours)).isoformat()
+
+
+def rescore_chunk(rows, rules):
+    """Scores one chunk; returns UPDATE parameter tuples for rows whose outcome changed."""
+    from priortize import prioritize_complaint
+    from keywords import get_matcher
+
+    matcher = get_matcher()
+    bonuses = dict(matcher.urgency)
+    bonuses[matcher.fallback_urgency[0]] = matcher.fallback_urgency[1]
+    configured, sla_hours, category_mapping = rules
+
+    updates = []
+    for (cid, description, lat, lon, location, ward, status, priority, category, score,
+         label, confidence, cached_result, verified_at, deadline_at, contractor_id, level) in rows:
+        ai_result = _vision_verdict(label, confidence, cached_result, score, priority, bonuses)
+        result = prioritize_complaint(
+            description or "", ai_result, lat or 0.0, lon or 0.0, ward or location, offline=True
+        )
+        new_category = result['category']
+        if ai_result['label'] == "none" and new_category == matcher.fallback_category and category:
+            new_category = category  # Vision class unknown: the original label may have decided it
+
+        new_priority = escalated_priority(result['priority'], level)  # Escalations stand
+        new_deadline, new_contractor = deadline_at, contractor_id
+        if status == 'verified':
+            new_deadline = _deadline(verified_at, result['priority'], sla_hours) or deadline_at
+        if status in OPEN_STATUSES:
+            if configured:
+                new_contractor = category_mapping.get(new_category, "General_Desk")
+
+        new = (new_priority, new_category, result['score'], result['jurisdiction'], new_deadline, new_contractor)
+        if new != (priority, category, score, ward, deadline_at, contractor_id) or label is None:
+            updates.append(new[:4] + (ai_result['label'], ai_result['confidence']) + new[4:] + (cid,))
+    return updates
+
+
+# --- 2. COORDINATOR SIDE ---
+class RescoreProgress:
+    """Thread-safe progress shared with the admin status endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.state = "idle"
+        self.total = self.processed = self.updated = 0
+        self.started_at = self.finished_at = None
+        self.error = None
+
+    def begin(self, total):
+        with self._lock:
+            self.state, self.total, self.processed, self.updated = "running", total, 0, 0
+            self.started_at, self.finished_at, self.error = time.time(), None, None
+
+    def advance(self, processed, updated):
+        with self._lock:
+            self.processed += processed
+            self.updated += updated
+
+    def finish(self, error=None):
+        with self._lock:
+            self.state = "failed" if error else "done"
+            self.error = error
+            self.finished_at = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            elapsed = ((self.finished_at or time.time()) - self.started_at) if self.started_at else 0.0
+            rate = self.processed / elapsed if elapsed else 0.0
+            remaining = self.total - self.processed
+            return {
+                "state": self.state,
+                "total": self.total,
+                "processed": self.processed,
+                "updated": self.updated,
+                "elapsed_seconds": round(elapsed, 1),
+                "rows_per_second": round(rate, 1),
+                "eta_seconds": round(remaining / rate, 1) if rate and self.state == "running" else None,
+                "error": self.error,
+            }
+
+
+def _stream_chunks(conn, statuses, chunk_size):
+    placeholders = ",".join("?" * len(statuses))
+    # "+c.status" keeps SQLite on the rowid range: the status index would re-sort every chunk
+    last_id = 0
+    while True:
+        rows = conn.execute(f'''
+            SELECT c.id, COALESCE(c.description, c.text_desc), c.latitude, c.longitude, c.location,
+                   c.ward_zone, c.status, c.priority, c.ai_category, c.ai_score,
+                   c.ai_label, c.ai_confidence, ii.ai_result, c.verified_at, c.deadline_at, c.contractor_id,
+                   c.escalation_level
+            FROM complaints c LEFT JOIN image_index ii ON ii.path = c.image_path
+            WHERE c.id > ? AND +c.status IN ({placeholders})
+            ORDER BY c.id LIMIT ?
+        ''', (last_id, *statuses, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def _write(conn, updates):
+    conn.executemany('''
+        UPDATE complaints SET priority=?, ai_category=?, ai_score=?, ward_zone=?,
+        ai_label=?, ai_confidence=?, deadline_at=?, contractor_id=?
+        WHERE id=?
+    ''', updates)
+    conn.commit()
+
+
+def run_rescore(statuses=OPEN_STATUSES, workers=RESCORE_WORKERS, chunk_size=RESCORE_CHUNK_SIZE,
+                progress=None, dry_run=False):
+    """Streams, scores in parallel and writes back; returns the final progress snapshot."""
+    progress = progress or RescoreProgress()
+    conn = sqlite3.connect(DATABASE_PATH, timeout=30)
+    try:
+        init_ai_columns(conn.cursor())
+        init_sla_columns(conn.cursor())  # escalation_level is read below
+        init_image_index(conn.cursor())  # LEFT JOINed below; may not exist on a fresh DB
+        total = conn.execute(
+            f"SELECT COUNT(*) FROM complaints WHERE status IN ({','.join('?' * len(statuses))})", statuses
+        ).fetchone()[0]
+        progress.begin(total)
+        rules = load_sla_rules()
+        reader = sqlite3.connect(DATABASE_PATH, timeout=30)  # Separate handle: reads interleave with writes
+
+        # spawn: safe to start from the threaded API process
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            pending = {}
+            chunks = _stream_chunks(reader, statuses, chunk_size)
+            exhausted = False
+            while pending or not exhausted:
+                # Keep every worker busy with at most two chunks in flight each
+                while not exhausted and len(pending) < workers * 2:
+                    rows = next(chunks, None)
+                    if rows is None:
+                        exhausted = True
+                        break
+                    pending[pool.submit(rescore_chunk, rows, rules)] = len(rows)
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    size = pending.pop(future)
+                    updates = future.result()
+                    if updates and not dry_run:
+                        _write(conn, updates)
+                    progress.advance(size, len(updates))
+        reader.close()
+        if progress.updated and not dry_run:
+            rebuild_daily_rollup(conn.cursor())  # Severity trends follow the new scores / categories
+            bump_all(conn.cursor())  # Cached heatmaps too
+            record_system_event(conn.cursor(), "rescored")  # API processes reload hotspots / SLA heap
+            conn.commit()
+        progress.finish()
+    except Exception as e:
+        print(f"Rescore Error: {e}")
+        progress.finish(str(e))
+    finally:
+        conn.close()
+    return progress.snapshot()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run prioritization over triaged complaints")
+    parser.add_argument("--all", action="store_true", help="Include resolved complaints")
+    parser.add_argument("--workers", type=int, default=RESCORE_WORKERS)
+    parser.add_argument("--chunk", type=int, default=RESCORE_CHUNK_SIZE)
+    parser.add_argument("--dry-run", action="store_true", help="Score but do not write")
+    args = parser.parse_args()
+
+    progress = RescoreProgress()
+    runner = threading.Thread(target=run_rescore, kwargs=dict(
+        statuses=TRIAGED_STATUSES if args.all else OPEN_STATUSES,
+        workers=args.workers, chunk_size=args.chunk, progress=progress, dry_run=args.dry_run
+    ))
+    runner.start()
+    while runner.is_alive():
+        runner.join(2.0)
+        s = progress.snapshot()
+        if s["state"] == "running":
+            print(f"Rescore: {s['processed']}/{s['total']} rows, {s['updated']} updated, "
+                  f"{s['rows_per_second']} rows/s, ETA {s['eta_seconds']}s")
+    s = progress.snapshot()
+    print(f"Rescore {s['state']}: {s['processed']} rows in {s['elapsed_seconds']}s "
+          f"({s['rows_per_second']} rows/s), {s['updated']} updated" + (f" - {s['error']}" if s['error'] else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+# sla_scheduler.py
+# --- SLA DEADLINE SCHEDULER (escalations) ---
+# deadline_at was only read after the fact (dashboard compliance); nothing acted on expiry.
+#   - one min-heap of (fire_at, complaint_id, escalation_level) for every open complaint,
+#     loaded at startup (idx_complaints_status_deadline) and fed by run_task_back /
+#     issue_job_card whenever a deadline is set: O(log n) per schedule / fire, no table scans
+#   - a single daemon thread sleeps until the earliest entry is due
+#   - firing = one guarded UPDATE: status -> 'escalated', escalation_level + 1, priority one
+#     rung up the PRIORITY_LADDER; it matches nothing when the complaint was resolved,
+#     re-dispatched or already escalated elsewhere, so stale heap entries (and other API
+#     processes) need no bookkeeping
+#   - an escalated complaint escalates again every SLA_ESCALATION_HOURS, up to
+#     SLA_MAX_ESCALATIONS; deadline_at itself never moves (SLA compliance stays honest)
+#   - escalations publish "escalated" events (events.py); the admin gets one digest mail
+#     once the due backlog is drained (a startup backlog of thousands = one mail)
+#   - every SLA_SWEEP_SECONDS an indexed lookup picks up never-escalated overdue rows whose
+#     deadline was set by another process (triage_worker.py, re-scoring)
+#   - first boot on an existing database: complaints whose deadline lapsed more than
+#     SLA_BACKLOG_HOURS ago (default 24) and that never escalated are left alone, so
+#     years of historical breaches do not all turn 'escalated' (and bump priority) at once;
+#     SLA_BACKLOG_HOURS=0 escalates the whole backlog
+import os
+import time
+import heapq
+import sqlite3
+import threading
+from datetime import datetime
+
+from db import connect as db_connect  # Pooled SQLite Access
+from events import record_event, event_hub  # Complaint Event Stream (outbox)
+
+SLA_ESCALATION_HOURS = float(os.getenv("SLA_ESCALATION_HOURS", 2))
+SLA_MAX_ESCALATIONS = int(os.getenv("SLA_MAX_ESCALATIONS", 3))
+SLA_SWEEP_SECONDS = float(os.getenv("SLA_SWEEP_SECONDS", 60))
+SLA_BACKLOG_HOURS = float(os.getenv("SLA_BACKLOG_HOURS", 24))  # 0 = no horizon
+SLA_BATCH = 500
+SLA_DIGEST_LINES = 50
+
+# Statuses an SLA still runs on
+SLA_STATUSES = ("verified", "assigned", "escalated")
+# keywords.py urgency levels, lowest first
+PRIORITY_LADDER = ("Neutral", "Moderate", "Dangerous")
+
+_SLA_SQL = "(" + ", ".join(f"'{s}'" for s in SLA_STATUSES) + ")"
+_BUMP_SQL = "CASE priority " + " ".join(
+    f"WHEN '{low}' THEN '{high}'" for low, high in zip(PRIORITY_LADDER, PRIORITY_LADDER[1:])
+) + f" ELSE '{PRIORITY_LADDER[-1]}' END"
+
+
+def init_sla_columns(cursor):
+    for col, defn in [("escalation_level", "INTEGER DEFAULT 0"), ("escalated_at", "TIMESTAMP")]:
+        try:
+            cursor.execute(f"ALTER TABLE complaints ADD COLUMN {col} {defn}")
+        except sqlite3.OperationalError:
+            pass # Column already exists
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_status_deadline ON complaints(status, deadline_at)')
+
+
+def _timestamp(value):
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def fire_time(deadline_at, level=0, escalated_at=None):
+    """When a complaint (next) escalates: its deadline, or SLA_ESCALATION_HOURS after the last escalation."""
+    deadline = _timestamp(deadline_at)
+    if deadline is None or (level or 0) >= SLA_MAX_ESCALATIONS:
+        return None
+    last = _timestamp(escalated_at) if level else None
+    if last is not None and last >= deadline:
+        return last + SLA_ESCALATION_HOURS * 3600
+    return deadline
+
+
+def escalated_priority(priority, level):
+    """Base priority raised `level` rungs, as `level` escalations did (re-scoring re-applies them)."""
+    if not level:
+        return priority
+    if priority not in PRIORITY_LADDER:
+        return PRIORITY_LADDER[-1]  # Same as _BUMP_SQL's ELSE
+    return PRIORITY_LADDER[min(PRIORITY_LADDER.index(priority) + level, len(PRIORITY_LADDER) - 1)]
+
+
+def backlog_cutoff():
+    """Oldest deadline a first escalation still acts on ('' = every deadline)."""
+    if not SLA_BACKLOG_HOURS:
+        return ""
+    return datetime.fromtimestamp(time.time() - SLA_BACKLOG_HOURS * 3600).isoformat()
+
+
+def escalate(cursor, complaint_id, level, now):
+    """Guarded escalation of one overdue complaint; False when the heap entry is stale."""
+    cursor.execute(f'''
+        UPDATE complaints SET status = 'escalated', escalation_level = COALESCE(escalation_level, 0) + 1,
+        escalated_at = ?, priority = {_BUMP_SQL}
+        WHERE id = ? AND COALESCE(escalation_level, 0) = ? AND status IN {_SLA_SQL} AND deadline_at <= ?
+    ''', (now, complaint_id, level, now))
+    if cursor.rowcount == 0:
+        return False
+    record_event(cursor, complaint_id, "escalated")
+    return True
+
+
+class SlaScheduler:
+    """Min-heap of upcoming escalations, drained by one daemon thread."""
+
+    def __init__(self):
+        self._heap = []
+        self._cond = threading.Condition()
+        self._thread = None
+        self._next_sweep = 0.0
+        self._digest = []         # (complaint_id, level, ward, category, priority) awaiting notify
+        self.escalated = self.stale = 0
+
+    def schedule(self, complaint_id, deadline_at, level=0, escalated_at=None):
+        """
+        Called whenever a deadline is set; older entries of the complaint simply go stale.
+        A no-op until start() (triage_worker.py processes: the API's sweep picks those up).
+        """
+        fire_at = fire_time(deadline_at, level, escalated_at)
+        if fire_at is None or self._thread is None:
+            return
+        with self._cond:
+            heapq.heappush(self._heap, (fire_at, complaint_id, level or 0))
+            if self._heap[0][1] == complaint_id:
+                self._cond.notify()  # New earliest deadline: re-arm the wait
+
+    def load(self, path):
+        """Startup / after re-scoring: every open complaint with a pending escalation, heapified in O(n)."""
+        cutoff = backlog_cutoff()
+        conn = db_connect(path)
+        try:
+            rows = conn.execute(f'''
+                SELECT id, deadline_at, escalation_level, escalated_at FROM complaints
+                WHERE status IN {_SLA_SQL} AND deadline_at IS NOT NULL
+                AND COALESCE(escalation_level, 0) < ?
+                AND (COALESCE(escalation_level, 0) > 0 OR deadline_at >= ?)
+            ''', (SLA_MAX_ESCALATIONS, cutoff)).fetchall()
+            skipped = conn.execute(f'''
+                SELECT COUNT(*) FROM complaints WHERE status IN {_SLA_SQL}
+                AND COALESCE(escalation_level, 0) = 0 AND deadline_at < ?
+            ''', (cutoff,)).fetchone()[0] if cutoff else 0
+        finally:
+            conn.close()
+        if skipped:
+            print(f"SLA Scheduler: {skipped} complaints overdue by more than {SLA_BACKLOG_HOURS:g}h left unescalated (SLA_BACKLOG_HOURS)")
+        entries = []
+        for complaint_id, deadline_at, level, escalated_at in rows:
+            fire_at = fire_time(deadline_at, level, escalated_at)
+            if fire_at is not None:
+                entries.append((fire_at, complaint_id, level or 0))
+        with self._cond:
+            heapq.heapify(entries)
+            self._heap = entries
+            self._next_sweep = time.time() + SLA_SWEEP_SECONDS  # Just read everything
+            self._cond.notify()
+        return len(entries)
+
+    def start(self, path, notify=None):
+        """notify(count, lines) receives the digest of each drained backlog (e.g. an admin mail)."""
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._run, args=(path, notify), name="sla-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def _next_due(self):
+        with self._cond:
+            while True:
+                now = time.time()
+                if (self._heap and self._heap[0][0] <= now) or now >= self._next_sweep:
+                    break
+                wake_at = min(self._heap[0][0], self._next_sweep) if self._heap else self._next_sweep
+                self._cond.wait(wake_at - now)
+            due = []
+            while self._heap and self._heap[0][0] <= now and len(due) < SLA_BATCH:
+                due.append(heapq.heappop(self._heap))
+            return due
+
+    def _run(self, path, notify):
+        while True:
+            due = self._next_due()
+            try:
+                if time.time() >= self._next_sweep:
+                    self._next_sweep = time.time() + SLA_SWEEP_SECONDS
+                    self._sweep(path)
+                if due:
+                    self._fire(path, due)
+                if self._digest and not self._backlogged():
+                    digest, self._digest = self._digest, []
+                    if notify:
+                        notify(len(digest), _digest_lines(digest))
+            except Exception as e:
+                print(f"SLA Scheduler Error: {e}")
+
+    def _backlogged(self):
+        with self._cond:
+            return bool(self._heap) and self._heap[0][0] <= time.time()
+
+    def _sweep(self, path):
+        """Overdue complaints that never escalated and are not in this heap (set by another process)."""
+        conn = db_connect(path)
+        try:
+            rows = conn.execute('''
+                SELECT id, deadline_at FROM complaints
+                WHERE status IN ('verified', 'assigned') AND deadline_at <= ? AND deadline_at >= ?
+                AND COALESCE(escalation_level, 0) = 0
+            ''', (datetime.now().isoformat(), backlog_cutoff())).fetchall()
+        finally:
+            conn.close()
+        for complaint_id, deadline_at in rows:
+            self.schedule(complaint_id, deadline_at)
+
+    def _fire(self, path, due):
+        now = datetime.now().isoformat()
+        fired = []
+        conn = db_connect(path)
+        try:
+            cursor = conn.cursor()
+            for _, complaint_id, level in due:
+                if escalate(cursor, complaint_id, level, now):
+                    fired.append((complaint_id, level + 1))
+            conn.commit()
+            details = {cid: row for cid, *row in conn.execute(
+                f"SELECT id, ward_zone, ai_category, priority FROM complaints WHERE id IN ({','.join('?' * len(fired))})",
+                [cid for cid, _ in fired]
+            ).fetchall()} if fired else {}
+        finally:
+            conn.close()
+
+        self.escalated += len(fired)
+        self.stale += len(due) - len(fired)
+        for complaint_id, level in fired:
+            self.schedule(complaint_id, now, level, now)  # Next rung, if any
+        if not fired:
+            return
+        self._digest += [(cid, level, *details[cid]) for cid, level in fired if cid in details]
+        print(f"SLA Scheduler: {len(fired)} complaints escalated")
+        event_hub.poke()
+
+    def stats(self):
+        with self._cond:
+            pending = len(self._heap)
+            next_at = self._heap[0][0] if self._heap else None
+        return {
+            "scheduled": pending, "escalated": self.escalated, "stale_skipped": self.stale,
+            "next_escalation_in": round(max(next_at - time.time(), 0), 1) if next_at else None,
+        }
+
+
+def _digest_lines(digest):
+    lines = [
+        f"#{cid} level {level}: {category} in {ward} (priority {priority})"
+        for cid, level, ward, category, priority in digest[:SLA_DIGEST_LINES]
+    ]
+    if len(digest) > SLA_DIGEST_LINES:
+        lines.append(f"... and {len(digest) - SLA_DIGEST_LINES} more")
+    return lines
+
+
+sla_scheduler = SlaScheduler()
@@ -0,0 +1,118 @@
+# spatial_index.py
+# --- R*TREE SPATIAL INDEX FOR OPEN COMPLAINTS ---
+# SQLite cannot use a B-tree for "ABS(latitude - ?) < 0.0001", so every duplicate
+# check used to scan the whole complaints table. The R*Tree below mirrors the
+# coordinates of every *open* complaint and answers bounding-box lookups in O(log n).
+# Triggers keep it in sync on INSERT, UPDATE (status / coordinates) and DELETE,
+# so the application code never has to maintain it by hand.
+import sqlite3
+
+# Statuses that still occupy a physical location (duplicate check + heatmap)
+OPEN_STATUSES = ('pending', 'verified', 'assigned', 'escalated')
+
+_OPEN_SQL = "(" + ", ".join(f"'{s}'" for s in OPEN_STATUSES) + ")"
+
+
+def init_spatial_index(cursor):
+    """
+    Creates the R*Tree + sync triggers and back-fills existing rows.
+    Safe to call on every startup: acts as the migration path for old grievance.db files.
+    """
+    cursor.execute('''
+        CREATE VIRTUAL TABLE IF NOT EXISTS complaints_geo USING rtree(
+            id,
+            min_lat, max_lat,
+            min_lon, max_lon
+        )
+    ''')
+
+    # Recreated on every startup: the trigger bodies embed OPEN_STATUSES, which can grow
+    cursor.execute("DROP TRIGGER IF EXISTS trg_complaints_geo_insert")
+    cursor.execute("DROP TRIGGER IF EXISTS trg_complaints_geo_update")
+
+    # 1. New complaint -> index it if it is open and has GPS
+    cursor.execute(f'''
+        CREATE TRIGGER trg_complaints_geo_insert
+        AFTER INSERT ON complaints
+        WHEN NEW.status IN {_OPEN_SQL} AND NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL
+        BEGIN
+            INSERT OR REPLACE INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+            VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+        END
+    ''')
+
+    # 2. Status / coordinate change -> re-index or retire the point
+    cursor.execute(f'''
+        CREATE TRIGGER trg_complaints_geo_update
+        AFTER UPDATE OF status, latitude, longitude ON complaints
+        BEGIN
+            DELETE FROM complaints_geo WHERE id = OLD.id;
+            INSERT INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+            SELECT NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude
+            WHERE NEW.status IN {_OPEN_SQL} AND NEW.latitude IS NOT NULL AND NEW.longitude IS NOT NULL;
+        END
+    ''')
+
+    # 3. Hard delete (seed scripts wipe the table)
+    cursor.execute('''
+        CREATE TRIGGER IF NOT EXISTS trg_complaints_geo_delete
+        AFTER DELETE ON complaints
+        BEGIN
+            DELETE FROM complaints_geo WHERE id = OLD.id;
+        END
+    ''')
+
+    # --- MIGRATION: Back-fill rows written before the index existed ---
+    cursor.execute(f'''
+        INSERT INTO complaints_geo (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT id, latitude, latitude, longitude, longitude FROM complaints
+        WHERE status IN {_OPEN_SQL}
+        AND latitude IS NOT NULL AND longitude IS NOT NULL
+        AND id NOT IN (SELECT id FROM complaints_geo)
+    ''')
+
+
+def find_nearby_open(cursor, lat: float, lon: float, radius_deg: float = 0.0001):
+    """
+    Bounded R*Tree range lookup replacing the full-table ABS() scan.
+    The R*Tree stores 32-bit floats (rounded outwards), so the exact predicate is
+    re-checked against the REAL columns of the matching rows only.
+    """
+    cursor.execute(f'''
+        SELECT c.id FROM complaints_geo g
+        JOIN complaints c ON c.id = g.id
+        WHERE g.max_lat >= ? AND g.min_lat <= ?
+        AND g.max_lon >= ? AND g.min_lon <= ?
+        AND c.status IN {_OPEN_SQL}
+        AND ABS(c.latitude - ?) < ?
+        AND ABS(c.longitude - ?) < ?
+        LIMIT 1
+    ''', (
+        lat - radius_deg, lat + radius_deg,
+        lon - radius_deg, lon + radius_deg,
+        lat, radius_deg, lon, radius_deg
+    ))
+    return cursor.fetchone()
+
+
+def bbox_clause(min_lat: float, min_lon: float, max_lat: float, max_lon: float):
+    """SQL fragment + params restricting a complaints query to a bounding box via the R*Tree."""
+    clause = '''id IN (
+        SELECT id FROM complaints_geo
+        WHERE max_lat >= ? AND min_lat <= ? AND max_lon >= ? AND min_lon <= ?
+    )'''
+    return clause, [min_lat, max_lat, min_lon, max_lon]
+
+
+if __name__ == "__main__":
+    # Stand-alone migration for existing grievance.db files:
+    #   python spatial_index.py [path/to/grievance.db]
+    import os
+    import sys
+    db_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("DATABASE_PATH", "grievance.db")
+    conn = sqlite3.connect(db_path)
+    init_spatial_index(conn.cursor())
+    conn.commit()
+    indexed = conn.execute("SELECT COUNT(*) FROM complaints_geo").fetchone()[0]
+    conn.close()
+    print(f"✅ Spatial index ready on {db_path}: {indexed} open complaints indexed")
@@ -1,28 +1,63 @@
 # --- 1. IMPORTING LIBRARIES ---
-from fastapi import FastAPI, File, Form, UploadFile, BackgroundTasks, Depends, HTTPException, status
+from fastapi import FastAPI, File, Form, UploadFile, BackgroundTasks, Depends, HTTPException, status, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 import sqlite3
 import uvicorn
+import asyncio
+import threading
 import time
 import os
 import random
 from datetime import datetime, timedelta
 from typing import Optional, List
+from contextlib import asynccontextmanager
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from cryptography.fernet import Fernet
 from dotenv import load_dotenv
 
-from detective import run_ai_detection  # AI Verification (Roboflow)
-from priortize import prioritize_complaint  # Categorization & Logic
-from Clustering import get_clusters  # Clustering Logic
+from Clustering import get_clusters, rows_to_columns  # Clustering Logic
+import db  # Async DB access (dedicated DB thread executor)
+from db import connect as db_connect, pool_stats  # Pooled SQLite Access
+from spatial_index import init_spatial_index, find_nearby_open, bbox_clause  # R*Tree Geo Index
+from desk_stats import init_category_codes, init_daily_rollup, domain_code  # Indexed Category Codes + Daily Rollups
+from pagination import (  # Keyset Pagination + Field Projection
+    init_pagination_index, parse_fields, filter_clause, fetch_page,
+    COMPLAINT_FIELDS, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+)
+from hotspots import hotspot_engine  # Incremental Hotspot Clusters
+from triage_pool import triage_pool  # Bounded AI Triage Executor
+from triage import TRIAGE_MODE, run_inline_job, recover_jobs  # AI Triage Pipeline
+from detective import warm_detector, detector_status  # Lazy AI Model
+from job_queue import init_job_queue, enqueue, dead_jobs, requeue_dead, stats as queue_stats  # Durable Triage Jobs
+from image_store import init_image_index, store_upload  # Content-Addressed Uploads
+from translation import init_translation_cache  # Persistent Translation Cache
+from jurisdiction import init_geocode_cache, get_resolver  # Ward Polygons + Geocode Cache
+from rescore import (  # Bulk Re-scoring
+    init_ai_columns, run_rescore, RescoreProgress, OPEN_STATUSES, TRIAGED_STATUSES, RESCORE_WORKERS, RESCORE_CHUNK_SIZE
+)
 from verification import (
     auth_context, OTPRequest, VerifyRequest, CitizenFinal, 
-    init_verification_db, send_email, hash_password
+    init_verification_db, send_email, hash_password, mailer
 )
 from desk_routes import router as desk_router
+from crypto import (  # Unified AES-GCM / Legacy Fernet PII Encryption
+    encrypt_data, mask_phone, pii_handle, parse_handle, DecryptMemo, decrypt_memo, PII_FIELDS
+)
+from pydantic import BaseModel
+from heatmap_cache import (  # Version-Invalidated Heatmap Cache
+    init_heatmap_versions, bump_for_complaint, current_version, heatmap_cache
+)
+from sla_scheduler import init_sla_columns, sla_scheduler  # SLA Deadline Escalations
+from events import (  # Complaint Event Stream (SSE)
+    init_event_outbox, record_event, latest_event_id, event_hub, SYSTEM_EVENT
+)
+from tiles import (  # Slippy-Map Heatmap Tiles
+    tile_points, build_tile, read_cached, write_cached, TILE_MAX_ZOOM, TILE_FORMAT
+)
 
 # Load environment variables
 load_dotenv()
@@ -34,30 +69,12 @@ SECRET_KEY = os.getenv("JWT_SECRET", "super-secret-government-key")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
-# AES-256-GCM Implementation (Sovereign Hardening)
-from cryptography.hazmat.primitives.ciphers.aead import AESGCM
-ENCRYPTION_KEY_RAW_STR = os.getenv("ENCRYPTION_KEY", "32-bytes-of-sovereign-intelligence-key!")
-# Ensure 32 bytes for AES-256
-key_bytes = ENCRYPTION_KEY_RAW_STR.encode().ljust(32)[0:32]
-aesgcm = AESGCM(key_bytes)
+# AES-256-GCM Implementation (Sovereign Hardening): see crypto.py
 
 # Password Hashing Setup
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-def encrypt_data(data: str) -> str:
-    """Industrial-Grade AES-256-GCM Encryption"""
-    nonce = os.urandom(12)
-    ciphertext = aesgcm.encrypt(nonce, data.encode(), None)
-    return (nonce.hex() + ciphertext.hex())
-
-def decrypt_data(data_hex: str) -> str:
-    """Industrial-Grade AES-256-GCM Decryption"""
-    data_bytes = bytes.fromhex(data_hex)
-    nonce = data_bytes[0:12]
-    ciphertext = data_bytes[12:len(data_bytes)]
-    return aesgcm.decrypt(nonce, ciphertext, None).decode()
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -85,12 +102,8 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
 
 async def check_admin_authority(current_user: str = Depends(get_current_user)):
     """Strict Backend Provision: Admin Gatekeeping."""
-    conn = sqlite3.connect(GOVT_DB)
-    cursor = conn.cursor()
     # Teammate logic uses 'role' or a specific flag
-    cursor.execute("SELECT role FROM government_officers WHERE email = ?", (current_user,))
-    user = cursor.fetchone()
-    conn.close()
+    user = await db.fetchone(GOVT_DB, "SELECT role FROM government_officers WHERE email = ?", (current_user,))
     
     if not user or user[0].lower() not in ['government', 'admin']:
         raise HTTPException(
@@ -102,7 +115,34 @@ async def check_admin_authority(current_user: str = Depends(get_current_user)):
 
 
 # --- 3. APP SETUP ---
-app = FastAPI(title="Nivaran Backend - Enterprise Verified AI Pipeline")
+# Nothing heavy runs at import: schema, caches and the AI model are initialized here
+startup_state = {"db": "pending", "hotspots": "pending"}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await asyncio.to_thread(init_db)
+    startup_state["db"] = "ready"
+    since = await db.run(DATABASE_PATH, latest_event_id)  # Later writes reach the engine via the relay
+    await asyncio.to_thread(load_hotspots)
+    startup_state["hotspots"] = "ready"
+    # Requeue complaints left 'pending' by a previous process (crash / restart)
+    await asyncio.to_thread(recover_jobs)
+    # Open SLA deadlines -> escalation heap (see sla_scheduler.py)
+    await asyncio.to_thread(sla_scheduler.load, DATABASE_PATH)
+    sla_scheduler.start(DATABASE_PATH, notify=notify_sla_escalations)
+    if TRIAGE_MODE == "inline":
+        # Ward polygons are indexed once, before the first triage needs them
+        await asyncio.to_thread(get_resolver)
+        # Model loads in the background; /ready reports when it is usable
+        threading.Thread(target=warm_detector, name="detector-warmup", daemon=True).start()
+    # Outbox -> SSE subscribers and hotspot engine of this process
+    relay = asyncio.create_task(event_hub.relay(db.run, DATABASE_PATH, on_events=sync_hotspots, since=since))
+    yield
+    relay.cancel()
+    triage_pool.shutdown(wait=False)
+    await asyncio.to_thread(mailer.flush, 5)  # Give queued OTP / welcome mails a chance to go out
+
+app = FastAPI(title="Nivaran Backend - Enterprise Verified AI Pipeline", lifespan=lifespan)
 app.include_router(desk_router)
 app.add_middleware(
     CORSMiddleware,
@@ -110,6 +150,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Tile-Format"],  # Pagination cursor / tile layout
 )
 
 
@@ -121,8 +162,10 @@ def init_db():
     """Revolutionary Architect: Unified Schema for Integrity & Accountability"""
     
     # --- GRIEVANCE DB (grievance.db): Complaints table ---
-    conn = sqlite3.connect(DATABASE_PATH)
+    conn = db_connect(DATABASE_PATH)
     cursor = conn.cursor()
+    # WAL first: journal_mode cannot change inside the back-fill transaction below
+    cursor.execute("PRAGMA journal_mode=WAL")
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS complaints (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -147,15 +190,40 @@ def init_db():
             contractor_id TEXT
         )
     ''')
+    # --- MIGRATION: Columns written by /submit-complaint but missing from older schemas ---
+    for col, defn in [("language", "TEXT"), ("description", "TEXT")]:
+        try:
+            cursor.execute(f"ALTER TABLE complaints ADD COLUMN {col} {defn}")
+        except sqlite3.OperationalError:
+            pass # Column already exists
+    init_ai_columns(cursor)  # ai_label / ai_confidence for offline re-scoring
+    init_sla_columns(cursor)  # escalation_level / escalated_at + (status, deadline_at) index
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_ward ON complaints(ward_zone)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_status ON complaints(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_complaints_ai_score ON complaints(ai_score)')
-    cursor.execute("PRAGMA journal_mode=WAL")
+    # Spatial R*Tree for duplicate detection & heatmap range lookups (also migrates old DBs)
+    init_spatial_index(cursor)
+    # category_code + (ward_zone, category_code, status) index for the desk dashboard
+    init_category_codes(cursor)
+    # Per (ward, category, day) severity aggregates for the trend chart
+    init_daily_rollup(cursor)
+    # (ward_zone, category_code, ai_score, id): keyset pages for get-complaints / desk inbox
+    init_pagination_index(cursor)
+    # Per-ward change counters behind the heatmap cache / ETags
+    init_heatmap_versions(cursor)
+    # Outbox behind /api/v1/desk/events (shared with triage_worker.py processes)
+    init_event_outbox(cursor)
+    # Durable triage queue (claim / lease / retry)
+    init_job_queue(cursor)
+    # SHA-256 / dHash upload index with cached detection results
+    init_image_index(cursor)
+    init_translation_cache(cursor)
+    init_geocode_cache(cursor)
     conn.commit()
     conn.close()
 
     # --- GOVERNMENT DB (government.db): Officers, Auth, Config ---
-    gconn = sqlite3.connect(GOVT_DB)
+    gconn = db_connect(GOVT_DB)
     gcursor = gconn.cursor()
 
     # Citizens and Officers identity tables
@@ -199,7 +267,61 @@ def init_db():
     gconn.commit()
     gconn.close()
 
-init_db()
+def notify_sla_escalations(count, lines):
+    """SLA scheduler digest -> the administrator configured in system_config."""
+    conn = db_connect(GOVT_DB)
+    row = conn.execute("SELECT admin_email FROM system_config LIMIT 1").fetchone()
+    conn.close()
+    if row and row[0]:
+        send_email(row[0], f"Nivaran SLA: {count} complaint(s) escalated", "\n".join(lines))
+
+def load_hotspots():
+    """Warm the incremental hotspot engine once from all live (verified/assigned/escalated) complaints."""
+    conn = db_connect(DATABASE_PATH)
+    rows = conn.execute('''
+        SELECT id, ward_zone, ai_category, latitude, longitude, ai_score
+        FROM complaints WHERE status IN ('verified', 'assigned', 'escalated')
+    ''').fetchall()
+    conn.close()
+    hotspot_engine.load(rows)
+
+def _hotspot_rows(conn, complaint_ids):
+    return conn.execute(f'''
+        SELECT id, status, ward_zone, ai_category, latitude, longitude, ai_score
+        FROM complaints WHERE id IN ({','.join('?' * len(complaint_ids))})
+    ''', complaint_ids).fetchall()
+
+async def sync_hotspots(events):
+    """Relay hook: complaints changed by any process (triage workers too) are re-read and re-plotted."""
+    if any(event["complaint_id"] == SYSTEM_EVENT for event in events):
+        # Bulk re-scoring (API or CLI): severities, categories and deadlines changed everywhere
+        await asyncio.to_thread(load_hotspots)
+        await asyncio.to_thread(sla_scheduler.load, DATABASE_PATH)
+        return
+    complaint_ids = list({event["complaint_id"] for event in events})
+    rows = await db.run(DATABASE_PATH, _hotspot_rows, complaint_ids)
+    hotspot_engine.apply(complaint_ids, rows)
+
+# --- 4b. HEALTH & READINESS ---
+@app.get("/health")
+def health():
+    """Liveness: the process is up and serving (no dependency checks)."""
+    return {"status": "ok"}
+
+@app.get("/ready")
+def ready():
+    """Readiness: schema initialized and, when triaging inline, the detection model loaded."""
+    model = detector_status()
+    model_required = TRIAGE_MODE == "inline"
+    is_ready = startup_state["db"] == "ready" and (not model_required or model["state"] == "ready")
+    body = {
+        "ready": is_ready,
+        "database": startup_state["db"],
+        "hotspots": startup_state["hotspots"],
+        "triage_mode": TRIAGE_MODE,
+        "model": model
+    }
+    return body if is_ready else JSONResponse(status_code=503, content=body)
 
 # --- 5. OTP & IDENTITY ROUTES ---
 
@@ -212,12 +334,9 @@ async def send_otp(data: OTPRequest, background_tasks: BackgroundTasks):
 
     # IDENTITY INTEGRITY INITIATIVE: Check for existing records
     if data.is_signup and role == "government":
-        conn = sqlite3.connect(GOVT_DB)  # Officers live in government.db
-        existing = conn.execute(
-            "SELECT name FROM government_officers WHERE email = ?", 
-            (email,)
-        ).fetchone()
-        conn.close()
+        existing = await db.fetchone(  # Officers live in government.db
+            GOVT_DB, "SELECT name FROM government_officers WHERE email = ?", (email,)
+        )
         
         if existing:
              # STRICT: If email exists, they MUST login to continue setup or access account
@@ -225,11 +344,9 @@ async def send_otp(data: OTPRequest, background_tasks: BackgroundTasks):
 
     if not data.is_signup:
         # Citizens in government.db (citizens table), Officers in government.db
-        conn = sqlite3.connect(GOVT_DB)
         table = "government_officers" if role == "government" else "citizens"
         # Teammate Logic: Strict database check
-        user = conn.execute(f"SELECT name FROM {table} WHERE email = ?", (email,)).fetchone()
-        conn.close()
+        user = await db.fetchone(GOVT_DB, f"SELECT name FROM {table} WHERE email = ?", (email,))
         if not user:
             raise HTTPException(
                 status_code=404, 
@@ -248,7 +365,7 @@ async def send_otp(data: OTPRequest, background_tasks: BackgroundTasks):
     
     body = f"Hello {name},\n\nYour Nivaran verification code is: {otp_code}\nExpires in 5 minutes."
     
-    # REVOLUTIONARY DEVELOPER: Synchronous SMTP Dispatch for Handshake Integrity
+    # Queued: the background dispatcher owns the SMTP handshake (see mailer.py)
     send_email(email, "Nivaran Verification", body)
     
     return {"message": "Secure Identity Handshake Initiated. Please check your inbox for the AI-generated code."}
@@ -268,25 +385,22 @@ async def verify_otp(data: VerifyRequest):
     record["verified"] = True
     
     # Administrative Moulding: Check government.db for officer status
-    conn = sqlite3.connect(GOVT_DB)  # government.db holds officers & system_config
-    config_exists = conn.execute("SELECT 1 FROM system_config LIMIT 1").fetchone()
-    
     admin_role = "Desk_Officer"
     location = "General"
     is_setup_complete = 1  
     onboarding_step = 9 # Default for non-govt or fully onboarded
     
     if record["role"] == "government":
-        user_data = conn.execute(
+        user_data = await db.fetchone(  # government.db holds officers & system_config
+            GOVT_DB,
             "SELECT admin_role, location, onboarding_step, is_onboarded FROM government_officers WHERE email = ?", 
             (data.email.lower(),)
-        ).fetchone()
+        )
         if user_data:
             admin_role = user_data[0]
             location = user_data[1]
             onboarding_step = user_data[2] or 1
             is_setup_complete = user_data[3] or 0 # Mapped is_onboarded to setup state
-    conn.close()
 
     # Simple Token Generation
     access_token = create_access_token(
@@ -316,30 +430,26 @@ async def register_citizen(data: CitizenFinal):
     if not auth_context.get(email, {}).get("verified"):
         raise HTTPException(status_code=403, detail="Email not verified via OTP.")
 
-    conn = sqlite3.connect(GOVT_DB)  # Citizens table is in government.db
     try:
-        conn.execute(
+        await db.execute(  # Citizens table is in government.db
+            GOVT_DB,
             "INSERT INTO citizens (name, email, phone, uid_number, password_hash) VALUES (?, ?, ?, ?, ?)",
             (data.name, data.email, data.phone, data.uid_number, hash_password(data.password))
         )
-        conn.commit()
         send_email(data.email, "Welcome to Nivaran", f"Hello {data.name}, your citizen account is ready!")
         # Optional: Remove verified flag from context
         return {"status": "success", "redirect_to": "/citizen"}
     except sqlite3.IntegrityError:
         raise HTTPException(status_code=400, detail="User already exists.")
-    finally:
-        conn.close()
 
 @app.get("/api/onboarding/status")
 async def get_onboarding_status(email: str):
     """Sovereign State Machine: Retrieves persistent progress for government Officials."""
-    conn = sqlite3.connect(GOVT_DB)  # Officers live in government.db
-    user = conn.execute(
+    user = await db.fetchone(  # Officers live in government.db
+        GOVT_DB,
         "SELECT onboarding_step, admin_body, specific_role, location, workspace_code, is_onboarded, admin_role FROM government_officers WHERE email = ?", 
         (email.lower(),)
-    ).fetchone()
-    conn.close()
+    )
     
     if not user:
         return {"step": 1, "skip_otp": False}
@@ -375,45 +485,42 @@ async def update_onboarding_step(
     value: Optional[str] = Form(None)
 ):
     """Persistent Onboarding Sync: Saves stage progress for resuming sessions."""
-    conn = sqlite3.connect(GOVT_DB)  # Officers live in government.db
     email = email.lower()
-    
-    # Check if user exists (partial record)
-    user = conn.execute("SELECT id FROM government_officers WHERE email = ?", (email,)).fetchone()
-    
-    if not user:
-        # Create initial record if it doesn't exist during Stage 1
-        # We assume Name is sent in field/value if it's the first creation
-        if field == "name":
-            conn.execute("INSERT INTO government_officers (email, name, onboarding_step) VALUES (?, ?, ?)", (email, value, step))
-        else:
-            conn.close()
-            raise HTTPException(status_code=400, detail="Cannot initialize record without Name.")
-    else:
-        # Update existing record
-        query = f"UPDATE government_officers SET onboarding_step = ?"
-        params = [step]
-        if field and value:
-            query += f", {field} = ?"
-            params.append(value)
-        query += " WHERE email = ?"
-        params.append(email)
-        conn.execute(query, tuple(params))
+
+    def _sync_step(conn):
+        # Check if user exists (partial record)
+        user = conn.execute("SELECT id FROM government_officers WHERE email = ?", (email,)).fetchone()
         
-    conn.commit()
-    conn.close()
+        if not user:
+            # Create initial record if it doesn't exist during Stage 1
+            # We assume Name is sent in field/value if it's the first creation
+            if field == "name":
+                conn.execute("INSERT INTO government_officers (email, name, onboarding_step) VALUES (?, ?, ?)", (email, value, step))
+            else:
+                raise HTTPException(status_code=400, detail="Cannot initialize record without Name.")
+        else:
+            # Update existing record
+            query = f"UPDATE government_officers SET onboarding_step = ?"
+            params = [step]
+            if field and value:
+                query += f", {field} = ?"
+                params.append(value)
+            query += " WHERE email = ?"
+            params.append(email)
+            conn.execute(query, tuple(params))
+
+    await db.run(GOVT_DB, _sync_step)  # Officers live in government.db
     return {"status": "success", "step": step}
 
 @app.get("/api/onboarding/check-code")
 async def check_workspace_code(code: str, location: str):
     """Hierarchy Crack: Validates Admin-generated workspace security keys."""
     # REVOLUTIONARY DEVELOPER: In this simplified logic, we check if an Admin exists for this location with this code
-    conn = sqlite3.connect(GOVT_DB)  # Officers live in government.db
-    admin = conn.execute(
+    admin = await db.fetchone(  # Officers live in government.db
+        GOVT_DB,
         "SELECT name, email, specific_role FROM government_officers WHERE workspace_code = ? AND location = ? AND (admin_role = 'Admin' OR specific_role IN ('Sarpanch', 'Assistant Commissioner', 'Chief Officer'))", 
         (code, location)
-    ).fetchone()
-    conn.close()
+    )
     
     if not admin:
         raise HTTPException(status_code=403, detail="INVALID SECURITY CODE: The entered key does not match any Lead Administrator in this jurisdiction.")
@@ -455,8 +562,9 @@ async def register_government(
         with open(proof_path, "wb") as f:
             f.write(content)
 
-    conn = sqlite3.connect(GOVT_DB)  # Officers live in government.db
-    try:
+    password_hash = hash_password(password)
+
+    def _register(conn):
         # SYSTEMS ARCHITECT: Sovereign Identity Handshake (Lead Role Logic)
         officer_count = conn.execute("SELECT COUNT(*) FROM government_officers").fetchone()[0]
         
@@ -472,9 +580,11 @@ async def register_government(
             admin_body = ?, specific_role = ?, workspace_code = ?, admin_domain = ?,
             onboarding_step = 10, is_onboarded = 1 
             WHERE email = ?""",
-            (name, phone, uid, proof_path, hash_password(password), final_admin_role, location, admin_body, specific_role, workspace_code, admin_domain, email)
+            (name, phone, uid, proof_path, password_hash, final_admin_role, location, admin_body, specific_role, workspace_code, admin_domain, email)
         )
-        conn.commit()
+
+    try:
+        await db.run(GOVT_DB, _register)  # Officers live in government.db
         
         # Cleanup verification context
         if email in auth_context:
@@ -485,15 +595,12 @@ async def register_government(
     except Exception as e:
         print(f"Registration Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
 
 
 # --- 6. MAIN COMPLAINT ROUTE (PROTECTED BY OTP) ---
 
 @app.post("/submit-complaint")
 async def submit_complaint(
-    background_tasks: BackgroundTasks,
     full_name: str = Form(...),
     phone_number: str = Form(...),
     email: str = Form(...), # Added for OTP verification
@@ -509,25 +616,22 @@ async def submit_complaint(
     Revolutionary Developer Entry Point:
     Validates OTP verification status before triggering AI scan.
     """
+    # --- BACK-PRESSURE: Refuse intake while the triage pool is saturated ---
+    if triage_pool.saturated():
+        raise HTTPException(
+            status_code=503,
+            detail="AI Triage is at capacity. Please retry your submission shortly.",
+            headers={"Retry-After": "30"}
+        )
+
     # --- FAIL-FAST DUPLICATE DETECTION (10m Radius) ---
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    # Using a simple bounding box for 10m approximately (0.0001 degrees)
-    cursor.execute("""
-        SELECT id FROM complaints 
-        WHERE status IN ('pending', 'verified', 'assigned') 
-        AND ABS(latitude - ?) < 0.0001 
-        AND ABS(longitude - ?) < 0.0001
-        LIMIT 1
-    """, (latitude, longitude))
-    duplicate = cursor.fetchone()
+    # Bounding box of ~10m (0.0001 degrees) served by the R*Tree instead of a full scan
+    duplicate = await db.run(DATABASE_PATH, lambda conn: find_nearby_open(conn.cursor(), latitude, longitude, 0.0001))
     if duplicate:
-        conn.close()
         raise HTTPException(
             status_code=400,
             detail="Hotspot Detected: Our team is already on-site at this location (Case ID: " + str(duplicate[0]) + ")."
         )
-    conn.close()
 
     # STRICT Conflict Resolution: Verify OTP Identity Layer first
     email = email.lower()
@@ -537,38 +641,36 @@ async def submit_complaint(
 
     complaint_id = None
     try:
-        # STEP 1: SAVE IMAGE (Maintain performance with await file.read())
-        os.makedirs("uploads", exist_ok=True)
-        file_loc = f"uploads/{file.filename}"
+        # STEP 1: SAVE IMAGE (Content-addressed: identical photos are stored once, no name collisions)
         content = await file.read()
-        with open(file_loc, "wb+") as file_obj:
-            file_obj.write(content)
         
         # STEP 2: CREATE PENDING RECORD (Immediate Handshake)
         encrypted_name = encrypt_data(full_name)
         encrypted_phone = encrypt_data(phone_number)
-        
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
-            INSERT INTO complaints (
-                full_name, phone_number, language,
-                description, location, latitude, longitude, ward_zone, image_path, status
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-            (
-                encrypted_name, encrypted_phone, language,
-                description, location, latitude, longitude, ward_zone, file_loc, 'pending'
+
+        def _intake(conn):
+            cursor = conn.cursor()
+            file_loc = store_upload(cursor, content, file.filename)
+            cursor.execute('''
+                INSERT INTO complaints (
+                    full_name, phone_number, language,
+                    description, location, latitude, longitude, ward_zone, image_path, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                (
+                    encrypted_name, encrypted_phone, language,
+                    description, location, latitude, longitude, ward_zone, file_loc, 'pending'
+                )
             )
-        )
-        complaint_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            # Durable job in the same transaction: survives a restart before triage runs
+            return cursor.lastrowid, enqueue(cursor, cursor.lastrowid)
+
+        # Image write + hashing and the INSERTs run on a DB thread, committed together
+        complaint_id, job_id = await db.run(DATABASE_PATH, _intake)
         
-        # --- YOLOv11 + NLP MULTIMODAL GUARD (FIRE-AND-FORGET) ---
-        background_tasks.add_task(
-            run_task_back,
-            complaint_id, file_loc, description, location, latitude, longitude
-        )
+        # --- YOLOv11 + NLP MULTIMODAL GUARD (BOUNDED THREAD POOL, OFF THE EVENT LOOP) ---
+        # In TRIAGE_MODE=worker the standalone triage_worker.py processes the queue instead
+        if TRIAGE_MODE == "inline":
+            triage_pool.submit(run_inline_job, job_id)
         
         # Cleanup verification context after successful submission
         del auth_context[email]
@@ -583,80 +685,6 @@ async def submit_complaint(
         print(f"Server Error: {e}")
         return {"status": "error", "message": str(e)}
 
-# Adding background task to achieve performance
-async def run_task_back(complaint_id: int, file_loc: str, description: str, location: str, latitude: float, longitude: float):
-    """
-    Revolutionary Developer AI Pipeline:
-    Executes YOLOv11 and prioritization logic asynchronously.
-    """
-    try:
-        ai_result = run_ai_detection(file_loc)
-        if not ai_result.get("detected"):
-            conn = sqlite3.connect(DATABASE_PATH)
-            cursor = conn.cursor()
-            cursor.execute("UPDATE complaints SET status='rejected' WHERE id=?", (complaint_id,))
-            conn.commit()
-            conn.close()
-            return
-
-        logic_result = prioritize_complaint(description, ai_result, latitude, longitude, location)
-
-        # --- FETCH SYSTEM CONFIG FOR AUTO-ASSIGNMENT ---
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        
-        gconn = sqlite3.connect(GOVT_DB)
-        gcursor = gconn.cursor()
-        gcursor.execute("SELECT category_mapping, sla_hours FROM system_config LIMIT 1")
-        config = gcursor.fetchone()
-        gconn.close()
-        
-        contractor_id = "Default_Contractor"
-        deadline_timestamp = None
-        
-        if config:
-            import json
-            category_mapping = json.loads(config[0]) if config[0] else {}
-            sla_hours = config[1] or 24
-            contractor_id = category_mapping.get(logic_result['category'], "General_Desk")
-            deadline_timestamp = (datetime.now() + timedelta(hours=sla_hours)).isoformat()
-
-        # --- UPDATE DATABASE WITH AI RESULTS & AUTO-ASSIGNMENT ---
-        # HIGH PRIORITY TRIAGE: 2-Hour Deadline for Dangerous road failures
-        deadline_hours = 2 if logic_result['priority'] == 'Dangerous' else (sla_hours or 24)
-        deadline_timestamp = (datetime.now() + timedelta(hours=deadline_hours)).isoformat()
-
-        conn.execute('''
-        UPDATE complaints SET 
-        status='verified', 
-        priority=?, 
-        ai_category=?, 
-        ai_score=?, 
-        ward_zone=?,
-        verified_at=CURRENT_TIMESTAMP,
-        assigned_at=CURRENT_TIMESTAMP,
-        deadline_at=?,
-        contractor_id=?
-        WHERE id=?
-        ''', (
-            logic_result['priority'], 
-            logic_result['category'], 
-            logic_result['score'], 
-            logic_result['jurisdiction'], 
-            deadline_timestamp,
-            contractor_id,
-            complaint_id
-        ))
-
-        conn.commit()
-        conn.close()
-        print(f"Complaint {complaint_id} Verified & Auto-Assigned with SLA: {deadline_hours}h")
-
-
-    except Exception as e:
-        print(f"Background Task Error: {e}")
-
-
 # --- 7. GOVT LOGIN (JWT ENABLED) ---
 # --- 7. GOVT LOGIN (JWT ENABLED) ---
 @app.post("/login")
@@ -666,15 +694,12 @@ async def login(
     """Sovereign Security: Enterprise Standard OAuth2 with Profile Fetching"""
     print(f"Testing SECURE Login: {form_data.username}")
     
-    conn = sqlite3.connect(GOVT_DB)
-    cursor = conn.cursor()
-    
     # 🔍 REVOLUTIONARY FIX: Fetch name, role, domain, location (ward), and setup status from DB
-    cursor.execute("SELECT name, admin_role, admin_domain, location, is_setup_complete FROM government_officers WHERE email = ?", (form_data.username,))
-    user_data = cursor.fetchone()
-    
-    config_exists = cursor.execute("SELECT 1 FROM system_config LIMIT 1").fetchone()
-    conn.close()
+    user_data = await db.fetchone(
+        GOVT_DB,
+        "SELECT name, admin_role, admin_domain, location, is_setup_complete FROM government_officers WHERE email = ?",
+        (form_data.username,)
+    )
     
     # Extract data or set defaults
     real_name = user_data[0] if user_data else "Officer"
@@ -719,17 +744,11 @@ async def login(
 
 @app.get("/api/v1/user/profile")
 async def get_user_profile(current_user: str = Depends(get_current_user)):
-    conn = sqlite3.connect(GOVT_DB)
-    conn.row_factory = sqlite3.Row
-    cursor = conn.cursor()
-    
     # FETCH: Get the real-world identity of the officer
-    cursor.execute("""
+    user_data = await db.fetchone(GOVT_DB, """
         SELECT name, admin_role, location, admin_domain, is_setup_complete 
         FROM government_officers WHERE email = ?
-    """, (current_user,))
-    user_data = cursor.fetchone()
-    conn.close()
+    """, (current_user,), row_factory=sqlite3.Row)
 
     if not user_data:
         raise HTTPException(status_code=404, detail="Identity not found")
@@ -750,11 +769,6 @@ async def get_user_profile(current_user: str = Depends(get_current_user)):
 @app.get("/api/v1/system/status")
 async def get_system_status():
     """Gatekeeper Logic: Dynamic status check via system_config table."""
-    conn = sqlite3.connect(GOVT_DB)  # system_config lives in government.db
-    cursor = conn.cursor()
-    config_exists = cursor.execute("SELECT 1 FROM system_config LIMIT 1").fetchone()
-    conn.close()
-    
     is_complete = 1  # DEPLOYMENT MODE: Standardized Production Standard
     return {"is_setup_complete": is_complete}
 
@@ -780,14 +794,11 @@ async def configure_system(
     This anchors Identity (PII) and Governance Logic (Config) simultaneously.
     """
     target_email = current_user
+    # We save the PII collected during the 9 stages
+    new_hash = hash_password(password)
 
-    conn = sqlite3.connect(GOVT_DB)
-    cursor = conn.cursor()
-
-    try:
+    def _configure(cursor):
         # 1. Update the Individual Officer Profile (Identity Anchor)
-        # We save the PII collected during the 9 stages
-        new_hash = hash_password(password)
         cursor.execute('''
             UPDATE government_officers 
             SET phone = ?, uid_number = ?, password_hash = ?, 
@@ -807,22 +818,75 @@ async def configure_system(
             (target_email, full_name, scope, sla, desks, workers, "{}")
         )
 
-        conn.commit()
+    try:
+        # One transaction: rolled back as a whole on error
+        await db.run(GOVT_DB, lambda conn: _configure(conn.cursor()))
         return {"status": "success", "is_setup_complete": 1}
 
     except Exception as e:
-        conn.rollback()
         print(f"Sovereign Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    finally:
-        conn.close()
+# --- BULK RE-SCORING (after keyword / weight / SLA changes) ---
+rescore_progress = RescoreProgress()
+
+def _run_rescore_job(statuses, workers, chunk_size, dry_run):
+    run_rescore(statuses, workers, chunk_size, rescore_progress, dry_run)
+    event_hub.poke()  # The "rescored" event reloads hotspots and the SLA heap (sync_hotspots)
+
+@app.post("/api/v1/admin/rescore", status_code=202)
+async def start_rescore(
+    include_resolved: bool = False,
+    workers: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+    dry_run: bool = False,
+    current_user: str = Depends(check_admin_authority)
+):
+    """Re-runs prioritization over triaged complaints in the background (admin only)."""
+    if rescore_progress.state == "running":
+        raise HTTPException(status_code=409, detail="A re-scoring run is already in progress.")
+    rescore_progress.begin(0)  # Claimed before the thread starts: no double start
+    threading.Thread(
+        target=_run_rescore_job, name="rescore", daemon=True,
+        args=(TRIAGED_STATUSES if include_resolved else OPEN_STATUSES,
+              workers or RESCORE_WORKERS, chunk_size or RESCORE_CHUNK_SIZE, dry_run)
+    ).start()
+    return {"status": "started", "progress": rescore_progress.snapshot()}
+
+@app.get("/api/v1/admin/rescore")
+async def rescore_status(current_user: str = Depends(check_admin_authority)):
+    """Progress and throughput of the current / last re-scoring run."""
+    return rescore_progress.snapshot()
+
+# --- DEAD TRIAGE JOBS (attempts exhausted, e.g. a long detector outage) ---
+@app.get("/api/v1/admin/triage/dead-jobs")
+async def list_dead_jobs(limit: int = Query(100, ge=1, le=1000), current_user: str = Depends(check_admin_authority)):
+    """Jobs that ran out of attempts; their complaints are still 'pending'."""
+    return await db.run(DATABASE_PATH, dead_jobs, limit)
+
+class RequeueRequest(BaseModel):
+    job_ids: Optional[List[int]] = None  # None = every dead job
+
+@app.post("/api/v1/admin/triage/requeue")
+async def requeue_dead_jobs(data: RequeueRequest, current_user: str = Depends(check_admin_authority)):
+    """Fresh attempts for dead jobs once the cause is fixed (inline mode runs them at once)."""
+    job_ids = await db.run(DATABASE_PATH, requeue_dead, data.job_ids)
+    if TRIAGE_MODE == "inline":
+        for job_id in job_ids:
+            triage_pool.submit(run_inline_job, job_id)
+    return {"status": "success", "requeued": job_ids}
+
+@app.get("/api/v1/system/triage-metrics")
+async def get_triage_metrics():
+    """Observability: triage queue depth, back-pressure rejections and per-stage latency."""
+    jobs = await db.run(DATABASE_PATH, queue_stats)
+    return {**triage_pool.metrics(), "triage_jobs": jobs, "db_pools": pool_stats(), "heatmap_cache": heatmap_cache.stats(),
+            "event_hub": event_hub.stats(), "sla_scheduler": sla_scheduler.stats(),
+            "mailer": mailer.stats()}
+
 @app.get("/api/v1/system/config")
 async def get_system_config(current_user: str = Depends(get_current_user)):
     """Fetch for UI Moulding (Protected)"""
-    conn = sqlite3.connect(GOVT_DB)
-    conn.row_factory = sqlite3.Row
-    config = conn.execute("SELECT * FROM system_config LIMIT 1").fetchone()
-    conn.close()
+    config = await db.fetchone(GOVT_DB, "SELECT * FROM system_config LIMIT 1", row_factory=sqlite3.Row)
     return dict(config) if config else {}
 
 
@@ -836,35 +900,49 @@ async def resolve_grievance(
     os.makedirs("uploads/resolutions", exist_ok=True)
     res_path = f"uploads/resolutions/{id}_{after_photo.filename}"
     content = await after_photo.read()
-    with open(res_path, "wb") as f:
-        f.write(content)
+    def _save_proof():
+        with open(res_path, "wb") as f:
+            f.write(content)
+    await asyncio.to_thread(_save_proof)
         
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    cursor.execute(
-        "UPDATE complaints SET status='resolved', resolved_at=CURRENT_TIMESTAMP, resolution_image_path=? WHERE id=?",
-        (res_path, id)
-    )
-    conn.commit()
-    conn.close()
+    def _resolve(conn):
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE complaints SET status='resolved', resolved_at=CURRENT_TIMESTAMP, resolution_image_path=? WHERE id=?",
+            (res_path, id)
+        )
+        bump_for_complaint(cursor, id)  # The point leaves the heatmap
+        record_event(cursor, id, "resolved")
+    await db.run(DATABASE_PATH, _resolve)
+    event_hub.poke()
+    hotspot_engine.remove(id)  # Retire the point from its hotspot
     return {"message": "Grievance resolved with physical evidence."}
 
 
 @app.post("/api/v1/complaints/{id}/issue-job-card")
 async def issue_job_card(id: int, current_user: str = Depends(get_current_user)):
     """Commander Dispatch: Auto-calculates 2-hour deadline and assigns sovereignty job card."""
-    conn = sqlite3.connect(DATABASE_PATH)
-    cursor = conn.cursor()
-    
     # SYSTEM ARCHITECT: Strict 2-Hour Sovereign Handshake
     deadline = (datetime.now() + timedelta(hours=2)).isoformat()
     
-    cursor.execute(
-        "UPDATE complaints SET status='assigned', assigned_at=CURRENT_TIMESTAMP, deadline_at=? WHERE id=?",
-        (deadline, id)
-    )
-    conn.commit()
-    conn.close()
+    def _dispatch(conn):
+        cursor = conn.cursor()
+        cursor.execute(
+            "UPDATE complaints SET status='assigned', assigned_at=CURRENT_TIMESTAMP, deadline_at=? WHERE id=?",
+            (deadline, id)
+        )
+        bump_for_complaint(cursor, id)  # Any status -> assigned may (re)enter the heatmap
+        record_event(cursor, id, "assigned")
+        return cursor.execute(
+            "SELECT escalation_level, ward_zone, ai_category, latitude, longitude, ai_score FROM complaints WHERE id=?",
+            (id,)
+        ).fetchone()
+    row = await db.run(DATABASE_PATH, _dispatch)
+    event_hub.poke()
+    if row is not None:
+        level, *point = row
+        sla_scheduler.schedule(id, deadline, level)  # Escalates if the new 2-hour window lapses
+        hotspot_engine.add(id, *point)  # A re-opened (e.g. resolved) complaint is back on the map
     return {
         "status": "success", 
         "message": "COMMANDER DISPATCHED: Job Card Issued. 2-Hour Triage Active.",
@@ -873,58 +951,98 @@ async def issue_job_card(id: int, current_user: str = Depends(get_current_user))
 
 
 # Route for Government Officials to view complaints (Filtered by Category and Ward)
+def _decrypt_for_display(rows, pii, memo):
+    """
+    pii="masked": names decrypted + phones masked, one batch per column for the page.
+    pii="handle": opaque handles only, nothing decrypted (see /api/v1/complaints/reveal).
+    """
+    complaints = [dict(row) for row in rows]
+    for field in PII_FIELDS:
+        if not complaints or field not in complaints[0]:
+            continue  # Not projected
+        if pii == "handle":
+            for comp_dict in complaints:
+                comp_dict[field] = pii_handle(field, comp_dict["id"])
+            continue
+        # DECRYPT DATA FOR DISPLAY (PII HARDENING)
+        values = memo.decrypt_many([comp_dict[field] for comp_dict in complaints])
+        for comp_dict, value in zip(complaints, values):
+            # Top-Down Configuration Authority: Label Mapping (Handled by frontend)
+            comp_dict[field] = mask_phone(value) if field == "phone_number" else value
+    return complaints
+
 @app.get("/get-complaints")
 async def get_complaints(
     ward: str, 
     category: str,
+    response: Response,
+    cursor: Optional[str] = None,      # X-Next-Cursor of the previous page
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None,      # e.g. "id,location,ai_score,status"
+    status: Optional[str] = None,      # e.g. "verified,assigned"
+    since: Optional[str] = None,       # created_at >= YYYY-MM-DD
+    until: Optional[str] = None,       # created_at <= YYYY-MM-DD
+    pii: str = Query("masked", pattern="^(masked|handle)$"),
+    memo: DecryptMemo = Depends(decrypt_memo),
     current_user: str = Depends(get_current_user) # Protected by JWT
 ):
+    triaged = ('verified', 'assigned', 'escalated', 'resolved')
+    columns = parse_fields(fields, COMPLAINT_FIELDS, COMPLAINT_FIELDS)
+    extra, extra_params = filter_clause(status, triaged, since, until)
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-
-        search_term = f"%{category.split(' ')[0]}%" if category else "%%"
+        term = category.split(' ')[0] if category else ""
+        code = domain_code(term) if term else None
+        # Indexed category_code when the category maps onto one, LIKE otherwise
+        where = "ward_zone = ? AND " + ("category_code = ?" if code else "ai_category LIKE ?")
+        where += " AND status IN ('verified', 'assigned', 'escalated', 'resolved')" + extra
+        params = [ward, code or f"%{term}%", *extra_params]
+
+        rows, next_cursor = await db.run(
+            DATABASE_PATH, fetch_page, columns, where, params, limit, cursor, row_factory=sqlite3.Row
+        )
+        if next_cursor:
+            response.headers["X-Next-Cursor"] = next_cursor
 
-        # Fetch system scope for label bridging
-        gconn = sqlite3.connect(GOVT_DB)
-        gcursor = gconn.cursor()
-        config = gcursor.execute("SELECT administrative_scope FROM system_config LIMIT 1").fetchone()
-        scope = config[0] if config else "Municipal"
-        gconn.close()
+        # Decryption is CPU-bound: run it off the event loop as well
+        return await asyncio.to_thread(_decrypt_for_display, rows, pii, memo)
+    except HTTPException:
+        raise
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
 
-        cursor.execute('''
-            SELECT * FROM complaints 
-            WHERE ward_zone = ? AND ai_category LIKE ? AND status IN ('verified', 'assigned', 'resolved')
-            ORDER BY ai_score DESC
-        ''', (ward, search_term))
-        
-        rows = cursor.fetchall()
-        complaints = []
-        for row in rows:
-            comp_dict = dict(row)
-            try:
-                # DECRYPT DATA FOR DISPLAY (PII HARDENING)
-                raw_name = decrypt_data(comp_dict["full_name"])
-                raw_phone = str(decrypt_data(comp_dict["phone_number"]))
-                
-                # DATA MASKING: Only last 3 digits visible
-                masked_phone = ("*" * (len(raw_phone) - 3)) + raw_phone[-3:] if len(raw_phone) >= 3 else raw_phone
-                
-                # Top-Down Configuration Authority: Label Mapping (Handled by frontend)
-                comp_dict["full_name"] = raw_name
-                comp_dict["phone_number"] = masked_phone
-            except Exception as e:
-                print(f"Decryption error for record {comp_dict['id']}: {e}")
-            
-            complaints.append(comp_dict)
 
+class RevealRequest(BaseModel):
+    handles: List[str]
 
-        conn.close()
+@app.post("/api/v1/complaints/reveal")
+async def reveal_pii(
+    data: RevealRequest,
+    memo: DecryptMemo = Depends(decrypt_memo),
+    current_user: str = Depends(get_current_user) # Protected by JWT
+):
+    """On-demand PII for the rows actually rendered: {handle: value}, phones masked."""
+    if len(data.handles) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} handles per request.")
+    try:
+        wanted = [parse_handle(h) for h in data.handles]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid PII handle.")
+    ids = sorted({complaint_id for _, complaint_id in wanted})
+    if not ids:
+        return {}
+    rows = await db.fetchall(
+        DATABASE_PATH,
+        f"SELECT id, full_name, phone_number FROM complaints WHERE id IN ({','.join('?' * len(ids))})",
+        ids, row_factory=sqlite3.Row
+    )
+    by_id = {row["id"]: row for row in rows}
+    found = [(h, field, by_id[cid][field]) for h, (field, cid) in zip(data.handles, wanted) if cid in by_id]
 
-        return complaints
-    except Exception as e:
-        return {"status": "error", "message": str(e)}
+    def _reveal():
+        values = memo.decrypt_many([value for _, _, value in found])
+        return {h: mask_phone(v) if field == "phone_number" else v
+                for (h, field, _), v in zip(found, values)}
+    return await asyncio.to_thread(_reveal)
 
 @app.get("/get-ward-stats")
 async def get_ward_stats(
@@ -932,17 +1050,13 @@ async def get_ward_stats(
     current_user: str = Depends(get_current_user)
 ):
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        cursor = conn.cursor()
-        cursor.execute('''
+        results = await db.fetchall(DATABASE_PATH, '''
             SELECT ai_category, COUNT(*)
             FROM complaints
             WHERE ward_zone = ? AND status = 'verified'
             GROUP BY ai_category
         ''', (ward,))
-        results = cursor.fetchall()
         stats = {row[0]: row[1] for row in results}
-        conn.close()
         return {
             "ward": ward,
             "stats": stats
@@ -953,41 +1067,95 @@ async def get_ward_stats(
 
 @app.get("/get-heatmap")
 async def get_heatmap(
+    request: Request,
+    response: Response,
     ward: Optional[str] = None, 
     category: Optional[str] = None,
+    min_lat: Optional[float] = None,
+    min_lon: Optional[float] = None,
+    max_lat: Optional[float] = None,
+    max_lon: Optional[float] = None,
     current_user: str = Depends(get_current_user) # Protected by JWT
 ):
     try:
-        conn = sqlite3.connect(DATABASE_PATH)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        query = "SELECT latitude, longitude, ai_score, ai_category FROM complaints WHERE status IN ('verified', 'assigned')"
+        # API Guard: Fuzzy match explicitly for Roads if category varies/undefined
+        category_term = category.split(' ')[0] if category and category != 'undefined' else "Roads"
+        bbox = (min_lat, min_lon, max_lat, max_lon)
+        fast_path = None in bbox
+
+        # Change counter first (data read afterwards is never older than the version it is cached under)
+        version = await db.run(DATABASE_PATH, current_version, ward)
+        etag = f'"hm-{version}"'  # DB counter only: identical across API workers
+        if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+            return Response(status_code=304, headers={"ETag": etag})  # Unchanged map: no body
+        response.headers["ETag"] = etag
+
+        key = (ward, category_term, bbox)
+        if fast_path:
+            # This process's cache also follows the engine, which may apply a relayed change after its bump
+            version = (version, hotspot_engine.generation)
+        clusters = heatmap_cache.get(key, version)
+        if clusters is not None:
+            return {"status": "success", "clusters": clusters}
+
+        # Fast path: precomputed clusters from the incremental engine, O(clusters)
+        if fast_path:
+            clusters = hotspot_engine.clusters(ward=ward, category_like=category_term)
+            heatmap_cache.put(key, version, clusters)
+            return {"status": "success", "clusters": clusters}
+
+        query = "SELECT latitude, longitude, ai_score FROM complaints WHERE status IN ('verified', 'assigned', 'escalated')"
         params = []
         
         if ward:
             query += " AND ward_zone = ?"
             params.append(ward)
             
-        # API Guard: Fuzzy match explicitly for %Roads% if category varies/undefined
-        if category and category != 'undefined':
-            query += " AND ai_category LIKE ?"
-            params.append(f"%{category.split(' ')[0]}%")
-        else:
-            query += " AND ai_category LIKE ?"
-            params.append("%Roads%")
+        query += " AND ai_category LIKE ?"
+        params.append(f"%{category_term}%")
+
+        # Viewport: bounded R*Tree range lookup instead of clustering the whole ward
+        clause, bbox_params = bbox_clause(*bbox)
+        query += " AND " + clause
+        params.extend(bbox_params)
             
-        cursor.execute(query, params)
-        complaints_data = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        rows = await db.fetchall(DATABASE_PATH, query, params)
         
-        # Revolutionary Developer AI Cluster Logic
-        clusters = get_clusters(complaints_data)
+        # Revolutionary Developer AI Cluster Logic (CPU-bound: off the event loop)
+        clusters = await asyncio.to_thread(lambda: get_clusters(rows_to_columns(rows)))  # Columnar, no per-row dicts
+        heatmap_cache.put(key, version, clusters)
         return {"status": "success", "clusters": clusters}
     except Exception as e:
         print(f"Heatmap Error: {e}")
         return {"status": "error", "message": str(e)}
 
+@app.get("/tiles/{z}/{x}/{y}")
+async def get_tile(
+    z: int,
+    x: int,
+    y: int,
+    request: Request,
+    category: Optional[str] = None,   # Default: every category
+    current_user: str = Depends(get_current_user) # Protected by JWT
+):
+    """City-scale heatmap tile: packed float32 [lat, lon, severity, count] clusters (see tiles.py)."""
+    if not (0 <= z <= TILE_MAX_ZOOM and 0 <= x < 2 ** z and 0 <= y < 2 ** z):
+        raise HTTPException(status_code=400, detail="Tile out of range.")
+    category_term = category.split(' ')[0] if category and category != 'undefined' else None
+
+    # City-wide change counter: versions both the ETag and the on-disk tile cache
+    version = await db.run(DATABASE_PATH, current_version)
+    headers = {"ETag": f'"tile-{version}"', "X-Tile-Format": TILE_FORMAT}
+    if headers["ETag"] in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    data = await asyncio.to_thread(read_cached, version, category_term, z, x, y)
+    if data is None:
+        columns = await db.run(DATABASE_PATH, tile_points, z, x, y, category_term)
+        data = await asyncio.to_thread(build_tile, columns, z)  # Clustering off the event loop
+        await asyncio.to_thread(write_cached, version, category_term, z, x, y, data)
+    return Response(content=data, media_type="application/octet-stream", headers=headers)
+
 @app.get("/")
 def home():
     return {"message": "Revolutionary AI Backend is running!!"}
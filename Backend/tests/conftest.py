@@ -0,0 +1,47 @@
+# tests/conftest.py
+# --- SHARED TEST SETUP ---
+# Every module reads its configuration from the environment at import time, so the
+# environment is pointed at a throw-away directory before anything is imported:
+#   - grievance.db / government.db / tile cache live in a temp dir, never the checked-in files
+#   - DETECTOR_BACKEND=stub: no model download; SMTP points at a closed local port
+#   - Backend/ is importable as a flat module directory (like `uvicorn takeimage:app`)
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEST_DIR = tempfile.mkdtemp(prefix="nivaran-tests-")
+
+os.environ.setdefault("DATABASE_PATH", os.path.join(TEST_DIR, "grievance.db"))
+os.environ.setdefault("GOVT_DB_PATH", os.path.join(TEST_DIR, "government.db"))
+os.environ.setdefault("TILE_CACHE_DIR", os.path.join(TEST_DIR, "tile_cache"))
+os.environ.setdefault("UPLOAD_STORE_DIR", os.path.join(TEST_DIR, "uploads", "cas"))
+os.environ.setdefault("DETECTOR_BACKEND", "stub")
+os.environ.setdefault("MAIL_SMTP_HOST", "127.0.0.1")   # Nothing listens: mail fails fast, locally
+os.environ.setdefault("MAIL_SMTP_PORT", "9")
+os.environ.setdefault("MAIL_SMTP_SSL", "0")
+os.environ.setdefault("ENCRYPTION_KEY", "32-bytes-of-sovereign-intelligence-key!")
+
+os.makedirs(os.path.join(TEST_DIR, "uploads"), exist_ok=True)
+sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _work_dir():
+    """Relative paths (uploads/, data/) resolve inside the temp dir, like a fresh checkout."""
+    previous = os.getcwd()
+    os.chdir(TEST_DIR)
+    yield TEST_DIR
+    os.chdir(previous)
+
+
+@pytest.fixture(scope="session")
+def api(_work_dir):
+    """(takeimage module, TestClient with the lifespan running, desk auth headers)."""
+    import takeimage
+    from fastapi.testclient import TestClient
+    with TestClient(takeimage.app) as client:
+        token = takeimage.create_access_token({"sub": "desk@example.org"})
+        yield takeimage, client, {"Authorization": f"Bearer {token}"}
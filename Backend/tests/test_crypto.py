@@ -0,0 +1,75 @@
+# tests/test_crypto.py
+import pytest
+from cryptography.fernet import Fernet
+
+import crypto
+from crypto import (
+    encrypt_data, decrypt_data, mask_phone, pii_handle, parse_handle, DecryptMemo, PII_FIELDS
+)
+
+
+def test_aes_gcm_round_trip():
+    token = encrypt_data("Asha Patil")
+    assert token != "Asha Patil"
+    assert decrypt_data(token) == "Asha Patil"
+
+
+def test_aes_gcm_uses_a_fresh_nonce():
+    assert encrypt_data("9876543210") != encrypt_data("9876543210")
+
+
+def test_tampered_ciphertext_is_returned_as_is():
+    token = encrypt_data("secret")
+    tampered = token[:-2] + ("00" if token[-2:] != "00" else "11")
+    assert decrypt_data(tampered) == tampered
+
+
+def test_legacy_fernet_token(monkeypatch):
+    key = Fernet.generate_key().decode()
+    monkeypatch.setattr(crypto, "ENCRYPTION_KEY", key)
+    token = Fernet(key.encode()).encrypt(b"Legacy Name").decode()
+    assert token.startswith("gAAAAA")
+    assert decrypt_data(token) == "Legacy Name"
+    # AES-GCM still works under the same key
+    assert decrypt_data(encrypt_data("New Name")) == "New Name"
+
+
+def test_fernet_looking_value_without_fernet_key_is_plaintext():
+    value = "gAAAAAnot-a-real-token"
+    assert decrypt_data(value) == value
+
+
+@pytest.mark.parametrize("value", ["Ramesh Kumar", "9876543210", "deadbeef", "", None])
+def test_plain_seed_data_passes_through(value):
+    assert decrypt_data(value) == value
+
+
+@pytest.mark.parametrize("phone, masked", [
+    ("9876543210", "*******210"),
+    (9876543210, "*******210"),
+    ("123", "123"),
+    ("12", "12"),
+    ("", None),
+    (None, None),
+])
+def test_mask_phone(phone, masked):
+    assert mask_phone(phone) == masked
+
+
+@pytest.mark.parametrize("field", PII_FIELDS)
+def test_handle_round_trip(field):
+    assert parse_handle(pii_handle(field, 42)) == (field, 42)
+
+
+@pytest.mark.parametrize("handle", ["password:1", "full_name:abc", "full_name", ":", ""])
+def test_parse_handle_rejects_other_values(handle):
+    with pytest.raises(ValueError):
+        parse_handle(handle)
+
+
+def test_decrypt_memo_dedupes_and_stays_bounded():
+    tokens = [encrypt_data(f"name {i}") for i in range(3)]
+    memo = DecryptMemo(limit=2)
+    values = [tokens[0], tokens[1], tokens[0], tokens[2], "plain"]
+    assert memo.decrypt_many(values) == ["name 0", "name 1", "name 0", "name 2", "plain"]
+    assert len(memo._values) == 2
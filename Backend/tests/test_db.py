@@ -0,0 +1,36 @@
+# tests/test_db.py
+import asyncio
+
+import db
+
+
+def test_async_routes_do_not_wait_on_background_connections(tmp_path):
+    path = str(tmp_path / "pool.db")
+    # Triage / SLA / cache threads holding every shared connection ...
+    held = [db.connect(path) for _ in range(db.DB_POOL_SIZE)]
+    try:
+        assert db.get_pool(path).stats()["idle"] == 0
+
+        async def queries():
+            # ... while every DB thread runs a query at once
+            return await asyncio.gather(*(db.fetchone(path, "SELECT ?", (i,)) for i in range(db.DB_THREADS)))
+
+        results = asyncio.run(asyncio.wait_for(queries(), 5))
+        assert [r[0] for r in results] == list(range(db.DB_THREADS))
+    finally:
+        for conn in held:
+            conn.close()
+    roles = {(s["path"], s["role"]): s for s in db.pool_stats()}
+    assert roles[(path, "executor")]["open"] <= db.DB_THREADS
+    assert roles[(path, "shared")]["idle"] == db.DB_POOL_SIZE
+
+
+def test_pooled_connection_returns_to_its_pool(tmp_path):
+    path = str(tmp_path / "pool.db")
+    with db.connect(path) as conn:
+        conn.execute("CREATE TABLE t (x)")
+        conn.execute("INSERT INTO t VALUES (1)")
+    conn = db.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 1  # Committed by `with`
+    conn.close()
+    assert db.get_pool(path).stats()["open"] == db.get_pool(path).stats()["idle"] == 1
@@ -0,0 +1,74 @@
+# tests/test_dead_jobs.py
+# A job that runs out of attempts (e.g. a long detector outage) must not leave its
+# complaint silently 'pending': it is reported as dead, listed, and can be requeued.
+import sqlite3
+
+import pytest
+
+import job_queue
+import triage
+
+
+def _make_admin(takeimage, email="desk@example.org"):
+    with sqlite3.connect(takeimage.GOVT_DB) as conn:
+        conn.execute("INSERT OR REPLACE INTO government_officers (email, role) VALUES (?, 'admin')", (email,))
+
+
+def detector_down(*args, **kwargs):
+    raise RuntimeError("AI detection unavailable")
+
+
+def test_dead_job_is_reported_listed_and_requeued(api, monkeypatch):
+    takeimage, client, headers = api
+    monkeypatch.setattr(takeimage, "TRIAGE_MODE", "worker")  # Requeue only; nothing runs in-process
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 2)
+    _make_admin(takeimage)
+    monkeypatch.setattr(triage, "run_task_back", detector_down)
+
+    conn = sqlite3.connect(takeimage.DATABASE_PATH)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO complaints (description, image_path, status) VALUES ('pothole', 'uploads/x.jpg', 'pending')")
+    complaint_id = cursor.lastrowid
+    job_id = job_queue.enqueue(cursor, complaint_id)
+    conn.commit()
+
+    # Inline path: first failure schedules a retry, the last one is reported as dead (not "done")
+    outcomes = []
+    for _ in range(2):
+        conn.execute("UPDATE triage_jobs SET available_at = 0 WHERE id = ?", (job_id,))
+        conn.commit()
+        qconn = job_queue.connect()
+        job = job_queue.claim(qconn, "test", job_id=job_id)[0]
+        qconn.close()
+        outcomes.append(triage.process_job(job))
+    assert outcomes[0] not in (None, job_queue.DEAD)
+    assert outcomes[1] == job_queue.DEAD
+
+    # Still pending, but visible: admin listing and triage metrics
+    assert conn.execute("SELECT status FROM complaints WHERE id = ?", (complaint_id,)).fetchone()[0] == "pending"
+    listed = client.get("/api/v1/admin/triage/dead-jobs", headers=headers).json()
+    assert {"id": job_id, "complaint_id": complaint_id, "attempts": 2,
+            "last_error": "AI detection unavailable"} in listed
+    assert client.get("/api/v1/system/triage-metrics").json()["triage_jobs"]["dead"] >= 1
+
+    response = client.post("/api/v1/admin/triage/requeue", json={"job_ids": [job_id]}, headers=headers)
+    assert response.json()["requeued"] == [job_id]
+    state, attempts = conn.execute("SELECT state, attempts FROM triage_jobs WHERE id = ?", (job_id,)).fetchone()
+    assert (state, attempts) == ("queued", 0)
+    conn.close()
+
+
+def test_inline_runner_logs_dead_jobs(api, monkeypatch, capsys):
+    takeimage, _, _ = api
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 1)
+    monkeypatch.setattr(triage, "run_task_back", detector_down)
+    conn = sqlite3.connect(takeimage.DATABASE_PATH)
+    cursor = conn.cursor()
+    cursor.execute("INSERT INTO complaints (description, image_path, status) VALUES ('pothole', 'uploads/y.jpg', 'pending')")
+    job_id = job_queue.enqueue(cursor, cursor.lastrowid)
+    conn.commit()
+    conn.close()
+
+    with pytest.raises(RuntimeError, match="dead"):  # Counted as a failure, never a success
+        triage.run_inline_job(job_id)
+    assert f"Triage job {job_id} (complaint" in capsys.readouterr().out
@@ -0,0 +1,110 @@
+# tests/test_hotspots.py
+import random
+
+import pytest
+
+from Clustering import get_clusters
+from hotspots import HotspotEngine
+
+
+def _canonical(clusters):
+    return sorted(
+        (c["count"], round(c["lat"], 9), round(c["lon"], 9), c["severity"], c["color"]) for c in clusters
+    )
+
+
+def _reference(points, eps_meters, ward=None):
+    """Full DBSCAN refit per category (of one ward, or city-wide), what the SQL path computes."""
+    shards = {}
+    for point_ward, category, lat, lon, severity in points.values():
+        if ward and point_ward != ward:
+            continue
+        shards.setdefault(category, []).append({"latitude": lat, "longitude": lon, "ai_score": severity})
+    out = []
+    for complaints in shards.values():
+        out.extend(get_clusters(complaints, eps_meters=eps_meters))
+    return out
+
+
+@pytest.mark.parametrize("eps_meters", [None, 100.0])
+@pytest.mark.parametrize("centre", [(18.52, 73.85), (64.15, -21.94)])  # Pune; Reykjavik (cos(lat) ~ 0.44)
+@pytest.mark.parametrize("seed", range(3))
+def test_random_add_remove_matches_dbscan(eps_meters, centre, seed):
+    rng = random.Random(seed)
+    engine = HotspotEngine(eps=0.001, eps_meters=eps_meters)
+    live = {}
+    next_id = 1
+    for step in range(400):
+        if live and rng.random() < 0.35:
+            complaint_id = rng.choice(list(live))
+            del live[complaint_id]
+            engine.remove(complaint_id)
+        else:
+            if live and rng.random() < 0.1:
+                complaint_id = rng.choice(list(live))  # Re-add: moved / re-scored complaint
+            else:
+                complaint_id, next_id = next_id, next_id + 1
+            point = (
+                rng.choice(["Ward A", "Ward B"]), rng.choice(["Roads & Infrastructure", "Water Supply"]),
+                centre[0] + rng.uniform(-0.006, 0.006), centre[1] + rng.uniform(-0.006, 0.006),
+                round(rng.uniform(0, 10), 1),
+            )
+            live[complaint_id] = point
+            engine.add(complaint_id, *point)
+        if step % 50 == 49:
+            for ward in (None, "Ward A", "Ward B"):
+                assert _canonical(engine.clusters(ward=ward)) == _canonical(_reference(live, eps_meters, ward))
+    assert _canonical(engine.clusters()) == _canonical(_reference(live, eps_meters))
+
+
+def test_metres_mode_links_along_a_parallel_at_high_latitude():
+    # 0.0015 degrees of longitude at 64N is ~73 m: one hotspot at 100 m, two in degree mode
+    metres, degrees = HotspotEngine(eps_meters=100.0), HotspotEngine(eps=0.001)
+    for engine in (metres, degrees):
+        engine.add(1, "W", "Roads", 64.0, -21.0, 5.0)
+        engine.add(2, "W", "Roads", 64.0, -21.0015, 8.0)
+    assert [c["count"] for c in metres.clusters()] == [2]
+    assert sorted(c["count"] for c in degrees.clusters()) == [1, 1]
+
+
+def test_remove_splits_a_chain_and_filters_apply():
+    engine = HotspotEngine(eps=0.001)
+    for i in range(3):
+        engine.add(i, "Ward A", "Water Supply", 18.5 + i * 0.0009, 73.8, float(i))
+    engine.add(9, "Ward B", "Electricity/Power", 18.5, 73.8, 9.0)
+    assert sorted(c["count"] for c in engine.clusters(ward="Ward A")) == [3]
+    generation = engine.generation
+    engine.remove(1)  # Middle link gone: the chain falls apart
+    assert engine.generation > generation
+    assert sorted(c["count"] for c in engine.clusters(ward="Ward A")) == [1, 1]
+    assert [c["severity"] for c in engine.clusters(category_like="electricity")] == [9.0]
+    engine.remove(1)  # Unknown ids are ignored
+    engine.add(5, "Ward A", "Water Supply", None, None, 1.0)  # No coordinates: not on the map
+    assert len(engine.clusters()) == 3
+
+
+def test_city_wide_map_merges_across_ward_boundaries():
+    engine = HotspotEngine(eps=0.001)
+    engine.add(1, "Ward A", "Roads", 18.5, 73.8, 3.0)
+    engine.add(2, "Ward B", "Roads", 18.5004, 73.8, 8.0)  # ~45 m away, other side of the boundary
+    assert [(c["count"], c["severity"]) for c in engine.clusters()] == [(2, 8.0)]
+    assert [(c["count"], c["severity"]) for c in engine.clusters(ward="Ward A")] == [(1, 3.0)]
+    engine.remove(2)
+    assert [(c["count"], c["severity"]) for c in engine.clusters()] == [(1, 3.0)]
+    engine.remove(1)
+    assert engine.clusters() == [] and engine._shards == {}
+
+
+def test_apply_follows_current_rows():
+    engine = HotspotEngine(eps=0.001)
+    engine.add(1, "W", "Roads", 18.5, 73.8, 5.0)
+    engine.add(2, "W", "Roads", 18.5005, 73.8, 5.0)
+    generation = engine.generation
+    engine.apply([1], [(1, "assigned", "W", "Roads", 18.5, 73.8, 5.0)])
+    assert engine.generation == generation  # Unchanged row: no cache invalidation
+
+    engine.apply([1, 2, 3], [
+        (1, "resolved", "W", "Roads", 18.5, 73.8, 5.0),
+        (3, "escalated", "W", "Roads", 18.6, 73.8, 9.0),
+    ])  # 2 was deleted
+    assert sorted((c["count"], c["severity"]) for c in engine.clusters()) == [(1, 9.0)]
@@ -0,0 +1,129 @@
+# tests/test_job_queue.py
+import time
+
+import pytest
+
+import job_queue
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(job_queue, "DATABASE_PATH", str(tmp_path / "queue.db"))
+    conn = job_queue.connect()
+    conn.execute("CREATE TABLE complaints (id INTEGER PRIMARY KEY, status TEXT)")
+    job_queue.init_job_queue(conn.cursor())
+    yield conn
+    conn.close()
+
+
+def _submit(conn, complaint_id, status="pending"):
+    conn.execute("INSERT INTO complaints (id, status) VALUES (?, ?)", (complaint_id, status))
+    return job_queue.enqueue(conn.cursor(), complaint_id)
+
+
+def _expire_leases(conn):
+    conn.execute("UPDATE triage_jobs SET lease_expires_at = ? WHERE state = 'leased'", (time.time() - 1,))
+
+
+def test_claim_leases_each_job_once(conn):
+    ids = [_submit(conn, i) for i in (1, 2, 3)]
+    first = job_queue.claim(conn, "a", limit=2)
+    second = job_queue.claim(conn, "b", limit=2)
+    assert [j["id"] for j in first] == ids[:2]
+    assert [j["id"] for j in second] == ids[2:]
+    assert job_queue.claim(conn, "c", limit=5) == []
+    assert all(j["attempts"] == 1 for j in first + second)
+
+
+def test_enqueue_is_idempotent_per_complaint(conn):
+    job_id = _submit(conn, 1)
+    assert job_queue.enqueue(conn.cursor(), 1) == job_id
+    assert job_queue.stats(conn) == {"queued": 1}
+
+
+def test_expired_lease_is_claimed_again(conn):
+    job_id = _submit(conn, 1)
+    assert [j["id"] for j in job_queue.claim(conn, "crashed-worker")] == [job_id]
+    assert job_queue.claim(conn, "other") == []   # Lease still valid
+
+    _expire_leases(conn)
+    reclaimed = job_queue.claim(conn, "other")
+    assert [(j["id"], j["attempts"]) for j in reclaimed] == [(job_id, 2)]
+    owner = conn.execute("SELECT lease_owner FROM triage_jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    assert owner == "other"
+
+    job_queue.complete(conn, job_id)
+    _expire_leases(conn)
+    assert job_queue.claim(conn, "late") == []
+    assert job_queue.stats(conn) == {"done": 1}
+
+
+def test_claim_specific_job(conn):
+    _submit(conn, 1)
+    wanted = _submit(conn, 2)
+    assert [j["id"] for j in job_queue.claim(conn, "api", job_id=wanted)] == [wanted]
+    assert job_queue.claim(conn, "api", job_id=wanted) == []
+
+
+def test_failures_back_off_then_die_at_max_attempts(conn, monkeypatch):
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(job_queue, "RETRY_BASE_SECONDS", 10)
+    job_id = _submit(conn, 1)
+
+    delays = []
+    for attempt in range(1, 4):
+        conn.execute("UPDATE triage_jobs SET available_at = 0 WHERE id = ?", (job_id,))  # Skip the wait
+        assert [(j["id"], j["attempts"]) for j in job_queue.claim(conn, "w")] == [(job_id, attempt)]
+        delays.append(job_queue.fail(conn, job_id, f"boom {attempt}"))
+        if delays[-1] is not None:
+            assert job_queue.claim(conn, "w") == []  # Backing off: not due yet
+
+    assert delays == [10, 20, job_queue.DEAD]
+    state, error = conn.execute("SELECT state, last_error FROM triage_jobs WHERE id = ?", (job_id,)).fetchone()
+    assert (state, error) == ("dead", "boom 3")
+    conn.execute("UPDATE triage_jobs SET available_at = 0")
+    assert job_queue.claim(conn, "w") == []
+    assert job_queue.runnable_job_ids(conn) == []
+
+
+def test_recover_requeues_orphans_without_duplicates(conn):
+    queued = _submit(conn, 1)                            # Has a job already
+    leased = _submit(conn, 2)
+    job_queue.claim(conn, "crashed", job_id=leased)
+    conn.execute("INSERT INTO complaints (id, status) VALUES (3, 'pending')")   # Lost BackgroundTask
+    conn.execute("INSERT INTO complaints (id, status) VALUES (4, 'verified')")  # Nothing to do
+    _expire_leases(conn)
+
+    assert job_queue.recover(conn) == 1
+    assert job_queue.recover(conn) == 0  # Second startup: nothing new
+    rows = conn.execute("SELECT complaint_id, state, lease_owner FROM triage_jobs ORDER BY complaint_id").fetchall()
+    assert [tuple(r) for r in rows] == [(1, "queued", None), (2, "queued", None), (3, "queued", None)]
+    assert job_queue.runnable_job_ids(conn)[:2] == [queued, leased]
+    assert len(job_queue.runnable_job_ids(conn)) == 3
+
+
+def test_recover_keeps_live_leases(conn):
+    job_id = _submit(conn, 1)
+    job_queue.claim(conn, "busy-worker")
+    assert job_queue.recover(conn) == 0
+    assert conn.execute("SELECT state FROM triage_jobs WHERE id = ?", (job_id,)).fetchone()[0] == "leased"
+
+
+def test_dead_jobs_are_listed_and_can_be_requeued(conn, monkeypatch):
+    monkeypatch.setattr(job_queue, "MAX_ATTEMPTS", 1)
+    dead = _submit(conn, 1)
+    alive = _submit(conn, 2)
+    job_queue.claim(conn, "w", job_id=dead)
+    assert job_queue.fail(conn, dead, "detector unavailable") == job_queue.DEAD
+
+    assert job_queue.dead_jobs(conn) == [
+        {"id": dead, "complaint_id": 1, "attempts": 1, "last_error": "detector unavailable"}
+    ]
+    assert job_queue.recover(conn) == 0  # Startup recovery does not resurrect it by itself
+    assert job_queue.runnable_job_ids(conn) == [alive]
+
+    assert job_queue.requeue_dead(conn, []) == []
+    assert job_queue.requeue_dead(conn, [alive]) == []  # Not dead: untouched
+    assert job_queue.requeue_dead(conn) == [dead]
+    assert job_queue.dead_jobs(conn) == []
+    assert [(j["id"], j["attempts"]) for j in job_queue.claim(conn, "w", job_id=dead)] == [(dead, 1)]
@@ -0,0 +1,95 @@
+# tests/test_keywords.py
+import json
+
+import pytest
+
+from keywords import KeywordMatcher, load_vocabulary, DEFAULT_VOCABULARY, URGENCY_SHIFT
+
+ROADS, WATER, POWER, WASTE = (c["name"] for c in DEFAULT_VOCABULARY["categories"])
+GENERAL = DEFAULT_VOCABULARY["fallback_category"]
+DANGEROUS, MODERATE, NEUTRAL = ("Dangerous", 7), ("Moderate", 4), ("Neutral", 1)
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    return KeywordMatcher(load_vocabulary(""))
+
+
+@pytest.mark.parametrize("description, ai_label, category, urgency", [
+    # English vocabulary, plurals and prefixes
+    ("Huge pothole near the school", "", ROADS, NEUTRAL),
+    ("Potholes everywhere", "", ROADS, NEUTRAL),
+    ("Roads are broken after the rain", "", ROADS, NEUTRAL),
+    ("No electricity since morning", "", POWER, NEUTRAL),
+    ("Streetlights not working, very dark", "", POWER, MODERATE),
+    ("Garbage not collected, terrible smell", "", WASTE, MODERATE),
+    ("Open wire caused a shock", "", POWER, DANGEROUS),
+    ("Child injured in an accident", "", GENERAL, DANGEROUS),
+    # Word boundaries: no matches inside other words
+    ("My flight was delayed", "", GENERAL, NEUTRAL),
+    ("Badminton court booking", "", GENERAL, NEUTRAL),
+    ("Please pull the cart away", "", GENERAL, NEUTRAL),
+    # Punctuation inside a whitespace chunk
+    ("road/bridge, both damaged!", "", ROADS, NEUTRAL),
+    ("LEAKAGE... WATER!!!", "", WATER, MODERATE),
+    # Precedence: first category / urgency level in vocabulary order wins
+    ("Pipe burst and water flooding the road", "", ROADS, NEUTRAL),
+    ("Bad smell after the accident", "", WASTE, DANGEROUS),
+    # Marathi / Hindi transliterations
+    ("Rastyavar mothe khadde aahet", "", ROADS, NEUTRAL),
+    ("Sadak par durghatna hui", "", ROADS, DANGEROUS),
+    ("Paani nahi aa raha, badi samasya", "", WATER, MODERATE),
+    ("Gatar overflow", "", WATER, NEUTRAL),
+    ("Bijli gayi, sab taraf andhera", "", POWER, MODERATE),
+    ("Vij nahi, khatra aahe", "", POWER, DANGEROUS),
+    ("Kachra aur durgandh", "", WASTE, NEUTRAL),
+    ("Safai nahi hui, vaas yete", "", WASTE, MODERATE),
+    ("Jakhmi zala", "", GENERAL, DANGEROUS),
+    # The vision label feeds the category, never the urgency
+    ("Please help quickly", "pothole", ROADS, NEUTRAL),
+    ("Please help quickly", "street_light", POWER, NEUTRAL),
+    ("Please help quickly", "accident", GENERAL, NEUTRAL),
+    ("Garbage dumped here", "pothole", ROADS, NEUTRAL),
+    ("", "none", GENERAL, NEUTRAL),
+])
+def test_classify(matcher, description, ai_label, category, urgency):
+    assert matcher.classify(description, ai_label) == (category, *urgency)
+
+
+def test_memo_does_not_change_results(matcher):
+    first = [matcher.classify(text) for text in ("dark road", "road dark", "dark")]
+    assert [matcher.classify(text) for text in ("dark road", "road dark", "dark")] == first
+
+
+def _write_config(tmp_path, config):
+    path = tmp_path / "keywords.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return str(path)
+
+
+def test_config_extends_categories_and_urgency(tmp_path):
+    path = _write_config(tmp_path, {"extra_keywords": {WATER: ["nalla"], "Dangerous": ["collapse*"]}})
+    matcher = KeywordMatcher(load_vocabulary(path))
+    assert matcher.classify("Nalla overflowing") == (WATER, *NEUTRAL)
+    assert matcher.classify("Wall collapsed on the footpath") == (GENERAL, *DANGEROUS)
+    # Defaults are kept, and the shared default vocabulary is not mutated
+    assert matcher.classify("pothole") == (ROADS, *NEUTRAL)
+    assert "nalla" not in DEFAULT_VOCABULARY["categories"][1]["keywords"]
+
+
+def test_config_replaces_a_section(tmp_path):
+    path = _write_config(tmp_path, {
+        "categories": [{"name": "Trees", "keywords": ["tree*", "jhad"]}],
+        "fallback_category": "Other",
+    })
+    matcher = KeywordMatcher(load_vocabulary(path))
+    assert matcher.classify("Fallen tree blocking the way") == ("Trees", *NEUTRAL)
+    assert matcher.classify("Huge pothole") == ("Other", *NEUTRAL)
+    assert matcher.classify("Jhad padla, accident zala") == ("Trees", *DANGEROUS)
+
+
+def test_too_many_categories_rejected():
+    vocabulary = load_vocabulary("")
+    vocabulary["categories"] = [{"name": f"c{i}", "keywords": [f"w{i}"]} for i in range(URGENCY_SHIFT + 1)]
+    with pytest.raises(ValueError):
+        KeywordMatcher(vocabulary)
@@ -0,0 +1,58 @@
+# tests/test_mailer.py
+import smtplib
+import threading
+
+from mailer import Mailer
+
+
+class FakeServer:
+    def __init__(self):
+        self.sent = []
+
+    def send_message(self, msg):
+        self.sent.append(msg["To"])
+
+    def quit(self):
+        pass
+
+
+def test_one_connection_for_many_mails():
+    mailer = Mailer("desk@example.org")
+    server = FakeServer()
+    logins = []
+    mailer._connect = lambda: logins.append(1) or server
+    for i in range(20):
+        assert mailer.send(f"citizen{i}@example.org", "OTP", "123456")
+    assert mailer.flush(5)
+    assert len(server.sent) == 20
+    assert len(logins) == 1
+    assert mailer.stats()["sent"] == 20
+
+
+def test_rejected_login_is_fatal_and_not_retried(capsys):
+    mailer = Mailer("desk@example.org", "user", "wrong-password")
+    logins = []
+    queued = threading.Event()
+
+    def reject():
+        queued.wait(5)  # Every mail is queued before the login fails
+        logins.append(1)
+        raise smtplib.SMTPAuthenticationError(535, b"5.7.8 Username and Password not accepted")
+
+    mailer._connect = reject
+    for i in range(5):
+        mailer.send(f"citizen{i}@example.org", "OTP", "123456")
+    queued.set()
+    assert mailer.flush(5)
+
+    assert len(logins) == 1
+    stats = mailer.stats()
+    assert stats["auth_failed"] is True
+    assert stats["failed"] == 5 and stats["retried"] == 0
+    assert stats["queued"] == 0 and stats["retry_pending"] == 0
+    assert capsys.readouterr().out.count("SMTP Authentication Failed") == 1
+
+    # Refused up front from now on: no queueing, no further login attempts
+    assert mailer.send("late@example.org", "OTP", "123456") is False
+    assert mailer.flush(1)
+    assert len(logins) == 1 and mailer.stats()["rejected"] == 1
@@ -0,0 +1,112 @@
+# tests/test_pagination.py
+import base64
+import random
+import sqlite3
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import fetch_page, encode_cursor, decode_cursor, parse_fields, filter_clause
+
+COLUMNS = ["id", "ai_score", "status"]
+WHERE, PARAMS = "ward_zone = ?", ["Ward A"]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE complaints (id INTEGER PRIMARY KEY, ward_zone TEXT, ai_score REAL, status TEXT, created_at TEXT)")
+    rng = random.Random(7)
+    rows = []
+    for cid in range(1, 401):
+        # Heavy ties (few distinct scores), ~15% untriaged, another ward interleaved
+        score = None if rng.random() < 0.15 else rng.choice([1.0, 4.5, 4.5, 7.0, 9.5, 10])
+        rows.append((cid, rng.choice(["Ward A", "Ward A", "Ward B"]), score, "verified", "2026-01-01"))
+    conn.executemany("INSERT INTO complaints VALUES (?, ?, ?, ?, ?)", rows)
+    return conn
+
+
+def _expected(conn):
+    scored = conn.execute(
+        "SELECT id FROM complaints WHERE ward_zone = 'Ward A' AND ai_score IS NOT NULL ORDER BY ai_score DESC, id DESC"
+    ).fetchall()
+    untriaged = conn.execute(
+        "SELECT id FROM complaints WHERE ward_zone = 'Ward A' AND ai_score IS NULL ORDER BY id DESC"
+    ).fetchall()
+    return [r[0] for r in scored + untriaged]
+
+
+@pytest.mark.parametrize("limit", [1, 2, 7, 50, 100, 1000])
+def test_walking_every_page_returns_each_row_once_in_order(conn, limit):
+    seen, cursor, pages = [], None, 0
+    while True:
+        rows, cursor = fetch_page(conn, COLUMNS, WHERE, PARAMS, limit, cursor)
+        assert len(rows) <= limit
+        seen += [r[0] for r in rows]
+        pages += 1
+        if cursor is None:
+            break
+        assert len(rows) == limit  # Only full pages hand out a cursor
+    expected = _expected(conn)
+    assert seen == expected
+    assert pages == max(1, -(-len(expected) // limit))
+
+
+def test_page_boundary_on_the_last_scored_row(conn):
+    scored = conn.execute(
+        "SELECT COUNT(*) FROM complaints WHERE ward_zone = 'Ward A' AND ai_score IS NOT NULL"
+    ).fetchone()[0]
+    rows, cursor = fetch_page(conn, COLUMNS, WHERE, PARAMS, scored)
+    assert all(r[1] is not None for r in rows)
+    rest, _ = fetch_page(conn, COLUMNS, WHERE, PARAMS, 1000, cursor)
+    assert rest and all(r[1] is None for r in rest)
+    assert [r[0] for r in rows + rest] == _expected(conn)
+
+
+def test_filters_and_empty_result(conn):
+    rows, cursor = fetch_page(conn, COLUMNS, "ward_zone = ?", ["Nowhere"], 10)
+    assert (rows, cursor) == ([], None)
+    clause, params = filter_clause("verified", ("verified", "assigned"), "2026-01-01", "2026-01-01")
+    rows, _ = fetch_page(conn, COLUMNS, WHERE + clause, PARAMS + params, 1000)
+    assert [r[0] for r in rows] == _expected(conn)
+
+
+@pytest.mark.parametrize("score, row_id", [(9.5, 12), (10, 3), (None, 77)])
+def test_cursor_round_trip(score, row_id):
+    assert decode_cursor(encode_cursor(score, row_id)) == (score, row_id)
+
+
+def _b64(raw):
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+@pytest.mark.parametrize("token", [
+    "not-a-cursor",
+    "%%%",
+    _b64("not json"),
+    _b64('{"score": 1, "id": 2}'),
+    _b64("[1, 2, 3]"),
+    _b64('[1.5, "12"]'),
+    _b64('["high", 12]'),
+    _b64("[1.5, 12.0]"),
+    _b64("[]"),
+    encode_cursor(9.5, 12)[:-3],   # Truncated
+])
+def test_invalid_or_tampered_cursor_is_a_400(conn, token):
+    with pytest.raises(HTTPException) as error:
+        fetch_page(conn, COLUMNS, WHERE, PARAMS, 10, token)
+    assert error.value.status_code == 400
+
+
+def test_parse_fields_always_keeps_the_cursor_columns():
+    assert parse_fields("status", ("id", "ai_score", "status"), ()) == ["id", "ai_score", "status"]
+    with pytest.raises(HTTPException) as error:
+        parse_fields("status,phone_number", ("id", "ai_score", "status"), ())
+    assert error.value.status_code == 400
+
+
+def test_tampered_cursor_over_http_is_a_400(api):
+    _, client, _ = api
+    response = client.get("/api/v1/desk/inbox", params={"ward": "Ward A", "domain": "Roads", "cursor": _b64('["x", 1]')})
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor."
@@ -0,0 +1,60 @@
+# tests/test_rescore.py
+import pytest
+
+from rescore import rescore_chunk, _deadline
+
+VERIFIED_AT = "2026-01-01 10:00:00"        # CURRENT_TIMESTAMP (UTC)
+OLD_DEADLINE = "2026-01-02T10:00:00"
+DISPATCH_DEADLINE = "2026-01-05T08:30:00"  # issue_job_card: now + 2h at dispatch time
+RULES = (True, 24, {"Roads & Infrastructure": "Roads_Contractor"})
+
+
+def _row(cid, status, deadline_at, description="Huge pothole caused an accident", priority="Neutral", level=0):
+    return (cid, description, 18.52, 73.85, "Ward A", "Ward A", status,
+            priority, "General Inquiry", 2.0, "pothole", 0.9, None, VERIFIED_AT, deadline_at, "General_Desk", level)
+
+
+def _updates_by_id(rows):
+    # (priority, category, score, ward, label, confidence, deadline_at, contractor_id, id)
+    return {update[-1]: update for update in rescore_chunk(rows, RULES)}
+
+
+def test_deadline_recomputed_for_verified_rows():
+    update = _updates_by_id([_row(1, "verified", OLD_DEADLINE)])[1]
+    assert update[0] == "Dangerous" and update[1] == "Roads & Infrastructure"
+    assert update[6] == _deadline(VERIFIED_AT, "Dangerous", 24) != OLD_DEADLINE
+    assert update[7] == "Roads_Contractor"
+
+
+@pytest.mark.parametrize("status", ["assigned", "escalated", "resolved"])
+def test_dispatched_and_closed_rows_keep_their_deadline(status):
+    update = _updates_by_id([_row(1, status, DISPATCH_DEADLINE)])[1]
+    assert update[0] == "Dangerous"
+    assert update[6] == DISPATCH_DEADLINE
+    # Contractor mapping still follows the new category while the complaint is open
+    assert update[7] == ("General_Desk" if status == "resolved" else "Roads_Contractor")
+
+
+@pytest.mark.parametrize("description, level, expected", [
+    ("Pothole, very bad", 1, "Dangerous"),          # Moderate base + 1 rung
+    ("Pothole near the market", 1, "Moderate"),     # Neutral base + 1 rung
+    ("Pothole near the market", 2, "Dangerous"),
+    ("Pothole near the market", 3, "Dangerous"),    # Capped at the top rung
+    ("Pothole, child injured", 1, "Dangerous"),
+])
+def test_escalated_rows_keep_their_escalation_rungs(description, level, expected):
+    update = _updates_by_id([_row(1, "escalated", DISPATCH_DEADLINE, description, "Dangerous", level)])[1]
+    assert update[0] == expected
+    assert update[6] == DISPATCH_DEADLINE
+
+
+@pytest.mark.parametrize("status", ["assigned", "resolved"])
+def test_rungs_stay_after_re_dispatch_or_resolution(status):
+    # issue_job_card / resolve_grievance keep escalation_level, and so the bumped priority
+    update = _updates_by_id([_row(1, status, DISPATCH_DEADLINE, "Pothole near the market", "Dangerous", 1)])[1]
+    assert update[0] == "Moderate"
+
+
+def test_never_escalated_rows_take_the_new_base_priority():
+    update = _updates_by_id([_row(1, "verified", OLD_DEADLINE, "Pothole near the market", "Dangerous", 0)])[1]
+    assert update[0] == "Neutral"
@@ -0,0 +1,173 @@
+# tests/test_sla_scheduler.py
+import time
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+import sla_scheduler
+from sla_scheduler import SlaScheduler, escalate, fire_time, init_sla_columns
+from events import init_event_outbox
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "sla.db")
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE complaints (
+            id INTEGER PRIMARY KEY, status TEXT, priority TEXT, deadline_at TIMESTAMP,
+            ward_zone TEXT, ai_category TEXT, category_code TEXT, ai_score REAL
+        )
+    ''')
+    init_sla_columns(conn.cursor())
+    init_event_outbox(conn.cursor())
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _ago(hours):
+    return (datetime.now() - timedelta(hours=hours)).isoformat()
+
+
+def _insert(path, cid, deadline_at, status="assigned", priority="Neutral", level=0, escalated_at=None):
+    with sqlite3.connect(path) as conn:
+        conn.execute(
+            "INSERT INTO complaints (id, status, priority, deadline_at, ward_zone, ai_category, escalation_level, escalated_at) "
+            "VALUES (?, ?, ?, ?, 'Ward A', 'Roads & Infrastructure', ?, ?)",
+            (cid, status, priority, deadline_at, level, escalated_at)
+        )
+    return cid
+
+
+def _row(path, cid):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(
+            "SELECT status, priority, escalation_level FROM complaints WHERE id = ?", (cid,)
+        ).fetchone()
+
+
+def _escalate(path, cid, level):
+    with sqlite3.connect(path) as conn:
+        return escalate(conn.cursor(), cid, level, datetime.now().isoformat())
+
+
+def _events(path):
+    with sqlite3.connect(path) as conn:
+        return conn.execute("SELECT complaint_id, type, status FROM complaint_events ORDER BY id").fetchall()
+
+
+def _wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return predicate()
+
+
+# --- GUARDED UPDATE ---
+def test_escalation_bumps_status_level_and_priority_once(path):
+    _insert(path, 1, _ago(1), priority="Neutral")
+    assert _escalate(path, 1, 0) is True
+    assert _row(path, 1) == ("escalated", "Moderate", 1)
+    assert _events(path) == [(1, "escalated", "escalated")]
+    # A second heap entry for the same level (e.g. schedule() + sweep) is stale
+    assert _escalate(path, 1, 0) is False
+    assert _row(path, 1) == ("escalated", "Moderate", 1)
+    assert len(_events(path)) == 1
+
+
+@pytest.mark.parametrize("status, deadline_hours_ago", [
+    ("resolved", 1),    # Closed before the entry fired
+    ("rejected", 1),
+    ("assigned", -1),   # Re-dispatched: new deadline still ahead
+])
+def test_stale_entries_are_rejected(path, status, deadline_hours_ago):
+    _insert(path, 1, _ago(deadline_hours_ago), status=status)
+    assert _escalate(path, 1, 0) is False
+    assert _row(path, 1)[2] == 0
+    assert _events(path) == []
+
+
+def test_priority_ladder_tops_out(path):
+    _insert(path, 1, _ago(1), priority="Dangerous")
+    _insert(path, 2, _ago(1), priority=None)
+    assert _escalate(path, 1, 0) and _escalate(path, 2, 0)
+    assert _row(path, 1)[1] == "Dangerous"
+    assert _row(path, 2)[1] == "Dangerous"  # Unknown priority: straight to the top rung
+
+
+def test_fire_time(monkeypatch):
+    monkeypatch.setattr(sla_scheduler, "SLA_ESCALATION_HOURS", 2)
+    monkeypatch.setattr(sla_scheduler, "SLA_MAX_ESCALATIONS", 3)
+    deadline = datetime(2026, 1, 1, 10, 0)
+    escalated = deadline + timedelta(minutes=5)
+    assert fire_time(deadline.isoformat()) == deadline.timestamp()
+    assert fire_time(deadline.isoformat(), 1, escalated.isoformat()) == escalated.timestamp() + 2 * 3600
+    # Re-dispatched after the escalation: the new deadline wins
+    assert fire_time((escalated + timedelta(hours=5)).isoformat(), 1, escalated.isoformat()) == \
+        (escalated + timedelta(hours=5)).timestamp()
+    assert fire_time(deadline.isoformat(), 3, escalated.isoformat()) is None
+    assert fire_time(None) is None and fire_time("not a date") is None
+
+
+# --- SCHEDULER ---
+def test_load_skips_the_historical_backlog(path, monkeypatch):
+    monkeypatch.setattr(sla_scheduler, "SLA_BACKLOG_HOURS", 24)
+    recent = _insert(path, 1, _ago(2))
+    ancient = _insert(path, 2, _ago(24 * 400))
+    ladder = _insert(path, 3, _ago(24 * 30), status="escalated", level=1, escalated_at=_ago(1))
+    future = _insert(path, 4, _ago(-5), status="verified")
+    _insert(path, 5, _ago(2), status="resolved")
+    _insert(path, 6, _ago(2), status="escalated", level=3, escalated_at=_ago(1))
+
+    scheduler = SlaScheduler()
+    assert scheduler.load(path) == 3
+    assert sorted(cid for _, cid, _ in scheduler._heap) == [recent, ladder, future]
+    assert ancient not in {cid for _, cid, _ in scheduler._heap}
+
+    monkeypatch.setattr(sla_scheduler, "SLA_BACKLOG_HOURS", 0)  # Opt in to the whole backlog
+    assert scheduler.load(path) == 4
+
+
+def test_scheduler_escalates_repeatedly_up_to_the_max_and_sends_one_digest(path, monkeypatch):
+    monkeypatch.setattr(sla_scheduler, "SLA_ESCALATION_HOURS", 0.3 / 3600)  # 0.3 s between rungs
+    monkeypatch.setattr(sla_scheduler, "SLA_MAX_ESCALATIONS", 3)
+    for cid in (1, 2, 3):
+        _insert(path, cid, _ago(0.01))
+    digests = []
+    scheduler = SlaScheduler()
+    scheduler.load(path)
+    scheduler.start(path, notify=lambda count, lines: digests.append((count, lines)))
+
+    assert _wait_for(lambda: all(_row(path, cid) == ("escalated", "Dangerous", 3) for cid in (1, 2, 3)))
+    time.sleep(0.5)  # No fourth rung
+    assert all(_row(path, cid)[2] == 3 for cid in (1, 2, 3))
+    assert scheduler.stats()["escalated"] == 9
+    assert scheduler.stats()["scheduled"] == 0
+    assert len([e for e in _events(path) if e[1] == "escalated"]) == 9
+    # The first backlog of 3 is reported in one mail, not three
+    assert _wait_for(lambda: digests)
+    assert digests[0][0] == 3 and len(digests[0][1]) == 3
+    assert "#1 level 1: Roads & Infrastructure in Ward A (priority Moderate)" in digests[0][1]
+
+
+def test_sweep_picks_up_deadlines_set_by_other_processes(path, monkeypatch):
+    monkeypatch.setattr(sla_scheduler, "SLA_SWEEP_SECONDS", 0.2)
+    monkeypatch.setattr(sla_scheduler, "SLA_BACKLOG_HOURS", 24)
+    scheduler = SlaScheduler()
+    scheduler.load(path)  # Empty heap
+    scheduler.start(path)
+    _insert(path, 1, _ago(1), status="verified")       # e.g. triage_worker.py
+    _insert(path, 2, _ago(24 * 10), status="verified")  # Beyond the backlog horizon
+    assert _wait_for(lambda: _row(path, 1)[2] == 1)
+    time.sleep(0.5)
+    assert _row(path, 2)[2] == 0
+
+
+def test_schedule_is_a_noop_until_started():
+    scheduler = SlaScheduler()
+    scheduler.schedule(1, _ago(1))
+    assert scheduler.stats()["scheduled"] == 0
@@ -0,0 +1,118 @@
+# tiles.py
+# --- SLIPPY-MAP HEATMAP TILES (/tiles/{z}/{x}/{y}) ---
+# /get-heatmap returns one JSON list per ward; zoomed-out city views and pan / zoom refetch
+# everything. Tiles are clustered independently and cached:
+#   - a tile's points come from the R*Tree (bbox_clause) over its Web-Mercator bounds
+#   - clustering radius follows the zoom: TILE_CLUSTER_PX screen pixels, never finer than
+#     get_clusters' 0.001 deg, so z16+ matches /get-heatmap exactly
+#   - get_clusters (DBSCAN) builds the tile; above TILE_DBSCAN_MAX_POINTS points (city-wide
+#     tiles) points are binned on an eps grid and reduced with the same aggregate_clusters
+#   - body = packed little-endian float32 [lat, lon, severity, count] per cluster
+#     (16 bytes vs ~90 bytes of JSON); colour is severity_color(severity) on the client
+#   - tiles are cached on disk under the city-wide heatmap version (heatmap_cache.py):
+#     TILE_CACHE_DIR/<version>/<category>/<z>/<x>/<y>.bin; older versions are pruned
+import os
+import re
+import math
+import shutil
+import threading
+
+import numpy as np
+
+from Clustering import get_clusters, aggregate_clusters, rows_to_columns, CLUSTER_EPS_METERS
+from spatial_index import bbox_clause
+
+TILE_CACHE_DIR = os.getenv("TILE_CACHE_DIR", "tile_cache")
+TILE_CLUSTER_PX = float(os.getenv("TILE_CLUSTER_PX", 24))
+TILE_DBSCAN_MAX_POINTS = int(os.getenv("TILE_DBSCAN_MAX_POINTS", 20000))
+TILE_MAX_ZOOM = 20
+TILE_FORMAT = "f32le:lat,lon,severity,count"
+MIN_EPS_DEGREES = 0.001
+METERS_PER_DEGREE = 111320.0
+
+_prune_lock = threading.Lock()
+_current_version = None
+
+
+def tile_bounds(z, x, y):
+    """(min_lat, min_lon, max_lat, max_lon) of a Web-Mercator tile."""
+    n = 2 ** z
+
+    def lat(row):
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * row / n))))
+    return (lat(y + 1), x / n * 360.0 - 180.0, lat(y), (x + 1) / n * 360.0 - 180.0)
+
+
+def zoom_eps(z):
+    """Clustering radius in degrees: TILE_CLUSTER_PX pixels of a 256 px tile at zoom z."""
+    return max(360.0 / (2 ** z) / 256 * TILE_CLUSTER_PX, MIN_EPS_DEGREES)
+
+
+def _grid_clusters(columns, eps):
+    """Large tiles: one cluster per eps x eps cell, aggregated like DBSCAN labels."""
+    lat, lon, severity = columns["latitude"], columns["longitude"], columns["ai_score"]
+    cells = np.stack((np.floor(lat / eps), np.floor(lon / eps)), axis=1)
+    _, labels = np.unique(cells, axis=0, return_inverse=True)
+    return aggregate_clusters(labels.ravel(), lat, lon, severity)
+
+
+def tile_points(conn, z, x, y, category_term=None):
+    """Open complaints inside the tile (R*Tree range lookup), columnar."""
+    query = "SELECT latitude, longitude, ai_score FROM complaints WHERE status IN ('verified', 'assigned', 'escalated')"
+    params = []
+    if category_term:
+        query += " AND ai_category LIKE ?"
+        params.append(f"%{category_term}%")
+    clause, bbox_params = bbox_clause(*tile_bounds(z, x, y))
+    return rows_to_columns(conn.execute(f"{query} AND {clause}", params + bbox_params).fetchall())
+
+
+def build_tile(columns, z):
+    """Clusters of one tile at zoom-appropriate granularity, packed as float32 bytes."""
+    eps = zoom_eps(z)
+    if len(columns) > TILE_DBSCAN_MAX_POINTS:
+        clusters = _grid_clusters(columns, eps)
+    elif CLUSTER_EPS_METERS:
+        clusters = get_clusters(columns, eps_meters=max(CLUSTER_EPS_METERS, eps * METERS_PER_DEGREE))
+    else:
+        clusters = get_clusters(columns, eps_meters=None, eps_degrees=eps)
+    packed = np.array([(c["lat"], c["lon"], c["severity"], c["count"]) for c in clusters], dtype="<f4")
+    return packed.tobytes()
+
+
+# --- DISK CACHE ---
+def _tile_path(version, category_term, z, x, y):
+    category_dir = re.sub(r"\W", "_", category_term) if category_term else "all"  # "Electricity/Power" is not a path
+    return os.path.join(TILE_CACHE_DIR, str(version), category_dir, str(z), str(x), f"{y}.bin")
+
+
+def read_cached(version, category_term, z, x, y):
+    try:
+        with open(_tile_path(version, category_term, z, x, y), "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def write_cached(version, category_term, z, x, y, data):
+    path = _tile_path(version, category_term, z, x, y)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)  # Readers never see a half-written tile
+    _prune_older(version)
+
+
+def _prune_older(version):
+    """Tiles of older versions are unreachable: drop them once per version change."""
+    global _current_version
+    if _current_version == version:
+        return
+    with _prune_lock:
+        if _current_version == version:
+            return
+        _current_version = version
+        for name in os.listdir(TILE_CACHE_DIR):
+            if name.isdigit() and int(name) < version:
+                shutil.rmtree(os.path.join(TILE_CACHE_DIR, name), ignore_errors=True)
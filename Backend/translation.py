@@ -0,0 +1,216 @@
+# translation.py
+# --- TRANSLATION LAYER: SKIP, CACHE, BATCH ---
+# prioritize_complaint used to build a GoogleTranslator and make one blocking network
+# call for every complaint, even plain English or the hundredth "Kachra jamla ahe".
+#   1. Script / vocabulary check: English text is returned as-is (no network)
+#   2. Two-level cache keyed by normalized text: in-process LRU in front of a
+#      persistent translation_cache table (grievance.db), both with a TTL
+#   3. translate_batch(): misses are joined into as few requests as possible
+import os
+import re
+import time
+import sqlite3
+import threading
+import unicodedata
+from collections import OrderedDict
+from functools import lru_cache
+
+from db import connect as db_connect  # Pooled SQLite Access
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")
+CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", 5000))
+CACHE_TTL_SECONDS = int(os.getenv("TRANSLATION_CACHE_TTL", 30 * 24 * 3600))
+BATCH_CHAR_LIMIT = 4500  # Google's per-request limit is 5000 characters
+
+# Function words + civic vocabulary: enough to recognise English complaints
+# while Marathish / Hinglish ("kachra jamla ahe", "paani nahi aa raha") still gets translated.
+ENGLISH_WORDS = set("""
+a an the and or but if of to in on at by for from with without near into over under out up down
+is are was were be been being am has have had do does did not no nor so very too also just only
+this that these those there here it its i we you he she they me us my our your his her their them
+can could will would should must may might please since for from ago days day week weeks month
+today yesterday morning evening night since still again always never every all any some many much
+more most less few lot lots big huge small large deep long broken damaged open blocked overflowing
+road roads street lane highway bridge footpath pothole potholes crack cracks hole holes
+water leak leaking leakage pipe pipeline flood flooding drain drainage sewage gutter supply tap
+electric electricity power light lights streetlight wire wires current pole transformer outage
+garbage trash waste dump dumped smell smelly bin bins dirty clean cleaning collection
+accident accidents injury injured deadly hospital emergency shock falling fell danger dangerous
+bad problem issue dark stuck urgent people children school area near front behind colony sector
+not working since causing caused vehicle vehicles bike car traffic residents complaint repair fix
+""".split())
+
+_WORD_RE = re.compile(r"[a-z']+")
+_lock = threading.Lock()
+_memory = OrderedDict()  # normalized text -> (translated, stored_at)
+_offline_misses = set()  # Offline lookups known absent from translation_cache
+
+
+def normalize(text: str) -> str:
+    """Cache key: NFKC, lower-case, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFKC", text or "").lower().split())
+
+
+def is_probably_english(text: str) -> bool:
+    """No network: Latin-only script and mostly known English words."""
+    if any(ord(ch) > 127 and ch.isalpha() for ch in text):
+        return False  # Devanagari or other non-Latin script
+    words = _WORD_RE.findall(text.lower())
+    if not words:
+        return True  # Digits / punctuation only: nothing to translate
+    known = sum(1 for w in words if w in ENGLISH_WORDS)
+    return known / len(words) >= 0.6
+
+
+# --- CACHE ---
+def init_translation_cache(cursor):
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS translation_cache (
+            source_key TEXT PRIMARY KEY,
+            translated TEXT,
+            stored_at REAL
+        )
+    ''')
+
+
+_table_ready = False
+
+
+def _connect():
+    """Pooled connection (db.py); the table is ensured on first use. Callers close() it."""
+    global _table_ready
+    conn = db_connect(DATABASE_PATH)
+    if not _table_ready:
+        init_translation_cache(conn.cursor())
+        conn.commit()
+        _table_ready = True
+    return conn
+
+
+def _cache_get_many(keys):
+    """Memory first, then one query per 500 keys against translation_cache."""
+    now = time.time()
+    found = {}
+    missing = []
+    with _lock:
+        for key in keys:
+            hit = _memory.get(key)
+            if hit and now - hit[1] < CACHE_TTL_SECONDS:
+                _memory.move_to_end(key)
+                found[key] = hit[0]
+            else:
+                missing.append(key)
+    if not missing:
+        return found
+    try:
+        conn = _connect()
+        try:
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT source_key, translated, stored_at FROM translation_cache "
+                    f"WHERE source_key IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for key, translated, stored_at in rows:
+                    if now - stored_at < CACHE_TTL_SECONDS:
+                        _memory_put(key, translated, stored_at)
+                        found[key] = translated
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        pass
+    return found
+
+
+def _memory_put(key, translated, stored_at):
+    with _lock:
+        _memory[key] = (translated, stored_at)
+        _memory.move_to_end(key)
+        while len(_memory) > CACHE_SIZE:
+            _memory.popitem(last=False)
+
+
+def _cache_put_many(pairs):
+    now = time.time()
+    for key, translated in pairs:
+        _memory_put(key, translated, now)
+        _offline_misses.discard(key)  # Now cached: offline re-scoring may use it
+    try:
+        conn = _connect()
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_cache (source_key, translated, stored_at) VALUES (?, ?, ?)",
+                [(key, translated, now) for key, translated in pairs]
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"Translation Cache Error: {e}")
+
+
+# --- NETWORK ---
+@lru_cache(maxsize=1)
+def _translator():
+    from deep_translator import GoogleTranslator  # Reliable library for Multi-language support
+    # 'source=auto' allows citizens to write in Marathi, Hindi, or Marathish
+    return GoogleTranslator(source='auto', target='en')
+
+
+def _translate_remote(texts):
+    """Joins texts with newlines into requests under the size limit; one call per chunk."""
+    results = []
+    chunk = []
+    for text in texts + [None]:
+        if text is not None and sum(len(t) + 1 for t in chunk) + len(text) < BATCH_CHAR_LIMIT:
+            chunk.append(text)
+            continue
+        if chunk:
+            joined = _translator().translate("\n".join(chunk)) or ""
+            parts = joined.split("\n")
+            if len(parts) != len(chunk):
+                # The service merged / split lines: fall back to one call per text
+                parts = [_translator().translate(t) or t for t in chunk]
+            results.extend(parts)
+        chunk = [text] if text is not None else []
+    return results
+
+
+# --- PUBLIC API ---
+def translate_batch(texts, offline: bool = False):
+    """
+    Translates many descriptions together. English and cached texts never hit the network;
+    offline=True never does (misses are returned untranslated). Output order matches input.
+    """
+    keys = [normalize(t) for t in texts]
+    resolved = {}
+    foreign = []
+    for key in dict.fromkeys(keys):
+        if is_probably_english(key):
+            resolved[key] = key
+        else:
+            foreign.append(key)
+    if offline:
+        foreign = [key for key in foreign if key not in _offline_misses]
+    if foreign:
+        resolved.update(_cache_get_many(foreign))
+    misses = [key for key in foreign if key not in resolved]
+    if offline:
+        if len(_offline_misses) < CACHE_SIZE * 10:
+            _offline_misses.update(misses)
+        misses = []
+
+    if misses:
+        try:
+            translated = _translate_remote(misses)
+            fresh = list(zip(misses, translated))
+            _cache_put_many(fresh)
+            resolved.update(fresh)
+        except Exception as e:
+            print(f"Translation Error: {e}")
+
+    return [resolved.get(key, key) for key in keys]
+
+
+def translate_to_english(text: str, offline: bool = False) -> str:
+    return translate_batch([text], offline=offline)[0]
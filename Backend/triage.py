@@ -0,0 +1,263 @@
+# triage.py
+# --- AI TRIAGE PIPELINE (shared by the API process and standalone workers) ---
+# Lives outside takeimage.py so triage_worker.py can run it without booting FastAPI.
+import os
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+from dotenv import load_dotenv
+
+from detective import run_ai_detection, run_ai_detection_batch  # AI Verification (Roboflow)
+from priortize import prioritize_complaint  # Categorization & Logic
+from hotspots import hotspot_engine  # Incremental Hotspot Clusters
+from triage_pool import triage_pool  # Bounded AI Triage Executor
+import job_queue
+from db import connect as db_connect  # Pooled SQLite Access
+from image_store import cached_detection, remember_detection  # Dedup Detection Cache
+from translation import translate_batch  # Cached / Batched Translation
+from desk_stats import record_verified  # Daily Severity Rollups
+from heatmap_cache import bump_version  # Heatmap Cache Invalidation
+from events import record_event, event_hub  # Complaint Event Stream (outbox)
+from sla_scheduler import sla_scheduler  # SLA Deadline Escalations
+
+load_dotenv()
+
+DATABASE_PATH = os.getenv("DATABASE_PATH", "grievance.db")   # Complaints & core data
+GOVT_DB = os.getenv("GOVT_DB_PATH", "government.db")          # Officers, auth, system_config
+
+# inline: the API process triages its own submissions on triage_pool
+# worker: the API only enqueues; `python triage_worker.py` processes the queue
+TRIAGE_MODE = os.getenv("TRIAGE_MODE", "inline")
+
+
+def run_task_back(complaint_id: int, file_loc: str, description: str, location: str, latitude: float, longitude: float, ai_result: dict = None):
+    """
+    Revolutionary Developer AI Pipeline:
+    Executes YOLOv11 and prioritization logic for one pending complaint.
+    ai_result may be supplied when the image was already scanned in a batch.
+    """
+    try:
+        if ai_result is None:
+            ai_result = _cached_detection(file_loc)
+        if ai_result is None:
+            with triage_pool.stage("detection"):
+                ai_result = run_ai_detection(file_loc)
+            _remember_detection(file_loc, ai_result)
+        if ai_result.get("label") == "error":
+            # Network / API failure is not a verdict: let the job queue retry it
+            raise RuntimeError(f"AI detection unavailable for complaint {complaint_id}")
+        if not ai_result.get("detected"):
+            conn = db_connect(DATABASE_PATH)
+            cursor = conn.cursor()
+            cursor.execute("UPDATE complaints SET status='rejected' WHERE id=?", (complaint_id,))
+            record_event(cursor, complaint_id, "rejected")
+            conn.commit()
+            conn.close()
+            event_hub.poke()
+            return
+
+        with triage_pool.stage("prioritize"):
+            logic_result = prioritize_complaint(description, ai_result, latitude, longitude, location)
+
+        db_started = time.perf_counter()
+        # --- FETCH SYSTEM CONFIG FOR AUTO-ASSIGNMENT ---
+        conn = db_connect(DATABASE_PATH)
+        cursor = conn.cursor()
+        
+        gconn = db_connect(GOVT_DB)
+        gcursor = gconn.cursor()
+        gcursor.execute("SELECT category_mapping, sla_hours FROM system_config LIMIT 1")
+        config = gcursor.fetchone()
+        gconn.close()
+        
+        contractor_id = "Default_Contractor"
+        deadline_timestamp = None
+        sla_hours = 24
+        
+        if config:
+            category_mapping = json.loads(config[0]) if config[0] else {}
+            sla_hours = config[1] or 24
+            contractor_id = category_mapping.get(logic_result['category'], "General_Desk")
+            deadline_timestamp = (datetime.now() + timedelta(hours=sla_hours)).isoformat()
+
+        # --- UPDATE DATABASE WITH AI RESULTS & AUTO-ASSIGNMENT ---
+        # HIGH PRIORITY TRIAGE: 2-Hour Deadline for Dangerous road failures
+        deadline_hours = 2 if logic_result['priority'] == 'Dangerous' else (sla_hours or 24)
+        deadline_timestamp = (datetime.now() + timedelta(hours=deadline_hours)).isoformat()
+
+        # A retried job (lease expired after commit) must not count twice in daily_rollup
+        previous = conn.execute("SELECT status FROM complaints WHERE id=?", (complaint_id,)).fetchone()
+
+        conn.execute('''
+        UPDATE complaints SET 
+        status='verified', 
+        priority=?, 
+        ai_category=?, 
+        ai_score=?, 
+        ward_zone=?,
+        ai_label=?,
+        ai_confidence=?,
+        verified_at=CURRENT_TIMESTAMP,
+        assigned_at=CURRENT_TIMESTAMP,
+        deadline_at=?,
+        contractor_id=?
+        WHERE id=?
+        ''', (
+            logic_result['priority'], 
+            logic_result['category'], 
+            logic_result['score'], 
+            logic_result['jurisdiction'], 
+            ai_result.get('label'),
+            ai_result.get('confidence', 0),
+            deadline_timestamp,
+            contractor_id,
+            complaint_id
+        ))
+        if previous and previous[0] == 'pending':
+            record_verified(cursor, complaint_id)  # Same transaction as the verification
+        bump_version(cursor, logic_result['jurisdiction'])  # New heatmap point in this ward
+        record_event(cursor, complaint_id, "verified")
+
+        conn.commit()
+        conn.close()
+        event_hub.poke()  # Relayed at once in this process; others see it on their next poll
+        sla_scheduler.schedule(complaint_id, deadline_timestamp)
+        triage_pool.record_stage("database", time.perf_counter() - db_started)
+
+        # Incremental hotspot update (no full DBSCAN refit on the next heatmap poll)
+        hotspot_engine.add(
+            complaint_id, logic_result['jurisdiction'], logic_result['category'],
+            latitude, longitude, logic_result['score']
+        )
+        print(f"Complaint {complaint_id} Verified & Auto-Assigned with SLA: {deadline_hours}h")
+
+
+    except Exception as e:
+        print(f"Background Task Error: {e}")
+        raise  # Counted as a failure in triage_pool metrics
+
+
+def _cached_detection(file_loc):
+    """Reuses the verdict of an identical / near-duplicate photo instead of re-running inference."""
+    conn = db_connect(DATABASE_PATH)
+    try:
+        with triage_pool.stage("detection_cache"):
+            return cached_detection(conn, file_loc)
+    finally:
+        conn.close()
+
+
+def _remember_detection(file_loc, ai_result):
+    conn = db_connect(DATABASE_PATH)
+    try:
+        remember_detection(conn, file_loc, ai_result)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _load_complaint(conn, complaint_id):
+    return conn.execute('''
+        SELECT id, image_path, description, location, latitude, longitude, status
+        FROM complaints WHERE id = ?
+    ''', (complaint_id,)).fetchone()
+
+
+def process_job(job, ai_result: dict = None):
+    """
+    Runs one leased triage job and records the outcome in triage_jobs.
+    Returns None when done, the retry delay, or job_queue.DEAD once attempts ran out.
+    """
+    conn = job_queue.connect()
+    try:
+        row = _load_complaint(conn, job["complaint_id"])
+        if not row or row["status"] != "pending":
+            job_queue.complete(conn, job["id"])  # Already triaged or deleted
+            return None
+        try:
+            run_task_back(
+                row["id"], row["image_path"], row["description"] or "",
+                row["location"], row["latitude"] or 0.0, row["longitude"] or 0.0,
+                ai_result
+            )
+            job_queue.complete(conn, job["id"])
+            return None
+        except Exception as e:
+            return job_queue.fail(conn, job["id"], str(e))
+    finally:
+        conn.close()
+
+
+def process_job_batch(jobs):
+    """
+    Worker path: scans all leased images in one concurrent batch, then finishes
+    each complaint individually. Returns {job_id: retry_delay or None}.
+    """
+    conn = job_queue.connect()
+    try:
+        paths = {}
+        descriptions = []
+        for job in jobs:
+            row = _load_complaint(conn, job["complaint_id"])
+            if row and row["status"] == "pending":
+                paths[job["id"]] = row["image_path"]
+                descriptions.append(row["description"] or "")
+    finally:
+        conn.close()
+
+    # One translation request for the whole batch; prioritize_complaint then hits the cache
+    with triage_pool.stage("translation_batch"):
+        translate_batch(descriptions)
+
+    # Cache hits (same or near-duplicate photo) skip the detector entirely
+    detections = {}
+    for job_id, path in list(paths.items()):
+        cached = _cached_detection(path)
+        if cached is not None:
+            detections[job_id] = cached
+            del paths[job_id]
+
+    with triage_pool.stage("detection_batch"):
+        scanned = dict(zip(paths, run_ai_detection_batch(list(paths.values()))))
+    for job_id, ai_result in scanned.items():
+        _remember_detection(paths[job_id], ai_result)
+    detections.update(scanned)
+    return {job["id"]: process_job(job, detections.get(job["id"])) for job in jobs}
+
+
+def run_inline_job(job_id: int):
+    """TRIAGE_MODE=inline: claim a specific job on a triage_pool thread and run it."""
+    conn = job_queue.connect()
+    try:
+        jobs = job_queue.claim(conn, owner=f"api-{os.getpid()}", job_id=job_id)
+    finally:
+        conn.close()
+    for job in jobs:
+        retry_in = process_job(job)
+        if retry_in == job_queue.DEAD:
+            # Complaint stays 'pending': listed at /api/v1/admin/triage/dead-jobs until requeued
+            print(f"Triage job {job_id} (complaint {job['complaint_id']}) is DEAD after {job['attempts']} attempts")
+            raise RuntimeError(f"Triage job {job_id} is dead")
+        if retry_in is not None:
+            # Retry with backoff inside the API process (a worker may also pick it up)
+            timer = threading.Timer(retry_in, triage_pool.submit, (run_inline_job, job_id))
+            timer.daemon = True
+            timer.start()
+            raise RuntimeError(f"Triage job {job_id} failed, retrying in {retry_in}s")
+
+
+def recover_jobs():
+    """Startup recovery: requeue orphaned 'pending' complaints and, inline, resubmit the queue."""
+    conn = job_queue.connect()
+    try:
+        orphans = job_queue.recover(conn)
+        job_ids = job_queue.runnable_job_ids(conn) if TRIAGE_MODE == "inline" else []
+        dead = job_queue.stats(conn).get("dead", 0)
+    finally:
+        conn.close()
+    for job_id in job_ids:
+        triage_pool.submit(run_inline_job, job_id)
+    print(f"Triage Recovery: {orphans} orphaned complaints requeued, {len(job_ids)} jobs resubmitted")
+    if dead:
+        print(f"⚠️ {dead} dead triage jobs: see /api/v1/admin/triage/dead-jobs")
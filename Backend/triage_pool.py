@@ -0,0 +1,120 @@
+# triage_pool.py
+# --- BOUNDED TRIAGE EXECUTOR ---
+# run_ai_detection (Roboflow HTTP), prioritize_complaint (Translate + Nominatim HTTP)
+# and sqlite3 are all blocking. Running them inside an async BackgroundTask froze the
+# uvicorn event loop for seconds per complaint. This pool moves the whole pipeline
+# onto a fixed number of worker threads and applies back-pressure at intake.
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+TRIAGE_WORKERS = int(os.getenv("TRIAGE_WORKERS", 4))          # Parallel triage pipelines
+TRIAGE_QUEUE_LIMIT = int(os.getenv("TRIAGE_QUEUE_LIMIT", 200))  # Max queued + running jobs
+
+
+class StageStats:
+    """Running latency aggregate for one pipeline stage (count, avg, max, last)."""
+
+    __slots__ = ("count", "total", "max", "last")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.last = 0.0
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        self.last = seconds
+
+    def as_dict(self):
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count * 1000, 1) if self.count else 0.0,
+            "max_ms": round(self.max * 1000, 1),
+            "last_ms": round(self.last * 1000, 1)
+        }
+
+
+class TriagePool:
+    def __init__(self, workers=TRIAGE_WORKERS, queue_limit=TRIAGE_QUEUE_LIMIT):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="triage")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._stages = {}
+
+    # --- BACK-PRESSURE ---
+    def saturated(self) -> bool:
+        """True when intake should be refused (queued + running jobs at the limit)."""
+        with self._lock:
+            full = self._queued + self._running >= self.queue_limit
+            if full:
+                self._rejected += 1
+            return full
+
+    def submit(self, fn, *args):
+        with self._lock:
+            self._queued += 1
+        return self._executor.submit(self._run, fn, *args)
+
+    def _run(self, fn, *args):
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        start = time.perf_counter()
+        try:
+            fn(*args)
+            ok = True
+        except Exception:
+            ok = False  # The pipeline logs its own error
+        with self._lock:
+            self._running -= 1
+            if ok:
+                self._completed += 1
+            else:
+                self._failed += 1
+        self.record_stage("total", time.perf_counter() - start)
+
+    # --- METRICS ---
+    def record_stage(self, name, seconds):
+        with self._lock:
+            self._stages.setdefault(name, StageStats()).record(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        """Times one pipeline stage: `with triage_pool.stage("detection"): ...`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(name, time.perf_counter() - start)
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "queue_depth": self._queued,
+                "in_flight": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+                "stages": {name: s.as_dict() for name, s in self._stages.items()}
+            }
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+
+# Shared process-wide pool
+triage_pool = TriagePool()
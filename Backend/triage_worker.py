@@ -0,0 +1,90 @@
+# triage_worker.py
+# --- STANDALONE TRIAGE WORKERS ---
+# Scales AI triage independently of the API:
+#   TRIAGE_MODE=worker uvicorn takeimage:app ...      (API only enqueues)
+#   python triage_worker.py --workers 4               (N processes drain triage_jobs)
+#   python triage_worker.py --requeue-dead            (retry jobs that ran out of attempts first)
+import argparse
+import multiprocessing
+import os
+import socket
+import time
+
+POLL_SECONDS = float(os.getenv("TRIAGE_POLL_SECONDS", 1.0))
+
+
+def worker_loop(index: int, poll_seconds: float, batch_size: int):
+    # Imported inside the child so every process builds its own model/DB handles
+    import job_queue
+    from triage import process_job_batch
+
+    owner = f"{socket.gethostname()}-{os.getpid()}-w{index}"
+    print(f"🛠️ Triage worker {owner} started")
+    while True:
+        conn = job_queue.connect()
+        try:
+            jobs = job_queue.claim(conn, owner, limit=batch_size)
+        except Exception as e:
+            print(f"[{owner}] Queue Error: {e}")
+            jobs = []
+        finally:
+            conn.close()
+
+        if not jobs:
+            time.sleep(poll_seconds)
+            continue
+
+        # Images of all claimed jobs are scanned together (run_ai_detection_batch)
+        started = time.perf_counter()
+        outcomes = process_job_batch(jobs)
+        elapsed = time.perf_counter() - started
+        for job in jobs:
+            retry_in = outcomes[job["id"]]
+            if retry_in == job_queue.DEAD:
+                outcome = f"DEAD after {job['attempts']} attempts (requeue: python triage_worker.py --requeue-dead)"
+            else:
+                outcome = "done" if retry_in is None else f"retry in {retry_in}s"
+            print(f"[{owner}] job {job['id']} (complaint {job['complaint_id']}) {outcome}")
+        print(f"[{owner}] batch of {len(jobs)} triaged in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nivaran AI triage workers")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("TRIAGE_WORKER_PROCESSES", 2)))
+    parser.add_argument("--poll", type=float, default=POLL_SECONDS, help="Idle poll interval (seconds)")
+    parser.add_argument("--batch", type=int, default=int(os.getenv("TRIAGE_BATCH_SIZE", 8)),
+                        help="Jobs claimed (and images scanned) per batch")
+    parser.add_argument("--requeue-dead", action="store_true",
+                        help="Give dead jobs (e.g. after a detector outage) a fresh set of attempts")
+    args = parser.parse_args()
+
+    # Startup recovery: orphaned 'pending' complaints go back on the queue
+    import job_queue
+    conn = job_queue.connect()
+    try:
+        print(f"Triage Recovery: {job_queue.recover(conn)} orphaned complaints requeued")
+        if args.requeue_dead:
+            print(f"Triage Recovery: {len(job_queue.requeue_dead(conn))} dead jobs requeued")
+        dead = job_queue.stats(conn).get("dead", 0)
+        if dead:
+            print(f"⚠️ {dead} dead triage jobs: their complaints stay 'pending' (--requeue-dead to retry)")
+    finally:
+        conn.close()
+
+    procs = [
+        multiprocessing.Process(target=worker_loop, args=(i, args.poll, args.batch), daemon=True)
+        for i in range(args.workers)
+    ]
+    for p in procs:
+        p.start()
+    try:
+        for p in procs:
+            p.join()
+    except KeyboardInterrupt:
+        print("Stopping triage workers (leased jobs are released when their lease expires)")
+        for p in procs:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,24 @@ import sqlite3
 import os
 import hashlib
 import random
-import smtplib
-from email.mime.text import MIMEText
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import HTTPException, Form, UploadFile, File
 
+from mailer import Mailer  # Background SMTP Dispatcher
+
 # --- CONFIG ---
 DATABASE_PATH = os.getenv("GOVT_DB_PATH", "government.db")   # Officers & auth tables
 SMTP_EMAIL = "rajeedandge444@gmail.com" 
 SMTP_PASSWORD = "zkpm slsj txnh bclm" 
 
+# One persistent SMTP session, batched sends + retries (MAIL_SMTP_* settings in mailer.py)
+mailer = Mailer(
+    SMTP_EMAIL,
+    user=os.getenv("MAIL_SMTP_USER", SMTP_EMAIL),
+    password=os.getenv("MAIL_SMTP_PASSWORD", SMTP_PASSWORD)
+)
+
 # Stores OTPs and verification status: { email: { "code": "...", "verified": False, "role": "..." } }
 auth_context = {}
 
@@ -23,33 +30,10 @@ def hash_password(password: str) -> str:
 
 def send_email(target, subject, body):
     """
-    Sovereign Mail Engine: Secure SMTP Pipeline.
-    Refactored to SMTP_SSL (Port 465) for industrial-grade stability.
+    Sovereign Mail Engine: queued for the background dispatcher (see mailer.py).
+    Returns at once; False only when the mail queue is full.
     """
-    from email.mime.multipart import MIMEMultipart
-    
-    msg = MIMEMultipart()
-    msg['Subject'] = subject
-    msg['From'] = SMTP_EMAIL
-    msg['To'] = target
-    msg.attach(MIMEText(body, 'plain'))
-    
-    try:
-        # SYSTEMS ARCHITECT: Switching to Port 465 (Implicit SSL) to bypass STARTTLS read timeouts
-        server = smtplib.SMTP_SSL('smtp.gmail.com', 465, timeout=30)
-        # server.set_debuglevel(1) # Enable only for low-level protocol debugging
-        
-        server.login(SMTP_EMAIL, SMTP_PASSWORD)
-        server.send_message(msg)
-        server.quit()
-        return True
-    except smtplib.SMTPAuthenticationError:
-        print("CRITICAL: SMTP Authentication Failed. Check App Password.")
-        return False
-    except Exception as e:
-        print(f"Nivaran Mail Engine Error: {e}")
-        # FAIL-OVER: Log the error and allow the pipeline to continue (Non-Blocking)
-        return False
+    return mailer.send(target, subject, body)
 
 # --- MODELS ---
 class OTPRequest(BaseModel):